@@ -0,0 +1,80 @@
+"""Throughput of the automation API (`game.automation.GameEnv`).
+
+Records one full game per seed with an oracle player that knows the mines,
+then replays the recorded actions through `apply_actions` in batches and
+reports actions per second. Run from the `minesweeper` directory:
+
+    python -m benchmarks.automation --games 200 --batch 1,16,256
+"""
+import argparse
+import random
+import time
+from game.automation import GameEnv, REVEAL, FLAG, CHORD, HIDDEN
+from game.minesweeper_game import DIFFICULTIES
+
+
+def record_game(env, seed, rng):
+    """Plays a game to a win: reveals every safe cell, flags every mine, chords now and then."""
+    env.reset(seed)
+    game = env.game
+    cols = game.cols
+    first = rng.randrange(len(game.cells))
+    actions = [(REVEAL, *divmod(first, cols))]
+    env.apply_actions(actions)
+    order = list(range(len(game.cells)))
+    rng.shuffle(order)
+    for i in order:
+        if env.done:
+            break
+        row, col = divmod(i, cols)
+        if game.cells[i]['mine']:
+            action = (FLAG, row, col)
+        elif env.grid[i] == HIDDEN:
+            action = (REVEAL, row, col)
+        else:
+            action = (CHORD, row, col)  # Opens nothing new unless the flags around are complete
+        actions.append(action)
+        env.apply_actions((action,))
+    return actions, env.won
+
+
+def replay(env, games, batch_size):
+    """Replays recorded games; returns (actions applied, seconds, games that ended as recorded)."""
+    count = matched = 0
+    start = time.perf_counter()
+    for seed, actions, won in games:
+        env.reset(seed)
+        for i in range(0, len(actions), batch_size):
+            env.apply_actions(actions[i:i + batch_size])
+        count += len(actions)
+        matched += env.won == won
+    return count, time.perf_counter() - start, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch', default='1,16,256', help="comma separated batch sizes")
+    args = parser.parse_args()
+
+    rows, cols, mines = DIFFICULTIES[args.difficulty]
+    env = GameEnv(rows, cols, mines)
+    rng = random.Random(args.seed)
+    games = []
+    for seed in range(args.seed, args.seed + args.games):
+        actions, won = record_game(env, seed, rng)
+        games.append((seed, actions, won))
+    print(f"{args.games} {args.difficulty} games, {sum(len(g[1]) for g in games)} actions, "
+          f"{sum(g[2] for g in games)} won")
+
+    for batch_size in (int(size) for size in args.batch.split(',')):
+        count, elapsed, matched = replay(env, games, batch_size)
+        print(f"batch {batch_size:4d}: {count / elapsed:10.0f} actions/s ({elapsed:.3f}s)")
+        if matched != len(games):
+            raise SystemExit(f"{len(games) - matched} replays diverged from the recorded games")
+
+
+if __name__ == '__main__':
+    main()
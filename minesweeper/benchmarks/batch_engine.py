@@ -0,0 +1,100 @@
+"""Throughput of the NumPy batch engine, with a parity check against MinesweeperGame.
+
+Every board takes a random action per step and finished boards are reset.
+With --check, each board is mirrored by a MinesweeperGame given the same
+mines and actions, and the visible states are compared after every step.
+Run from the `minesweeper` directory:
+
+    python -m benchmarks.batch_engine --boards 1024 --steps 200
+    python -m benchmarks.batch_engine --boards 64 --steps 2000 --check
+"""
+import argparse
+import time
+import numpy as np
+from game.automation import REVEAL, FLAG, CHORD, visible_code
+from game.batch_engine import BatchEngine
+from game.minesweeper_game import MinesweeperGame, DIFFICULTIES
+
+
+class ScalarMirror:
+    """A MinesweeperGame per board, created once the batch engine has placed that board's mines."""
+    def __init__(self, engine):
+        self.engine = engine
+        self.games = [None] * engine.boards
+        self.pending = [[] for _ in range(engine.boards)]  # Actions taken before the mines were placed
+
+    def step(self, actions, rows, cols):
+        engine = self.engine
+        handlers = ('reveal_cell', 'toggle_flag', 'reveal_adjacent')
+        for b in range(engine.boards):
+            self.pending[b].append((actions[b], rows[b], cols[b]))
+            if self.games[b] is None:
+                if not engine.placed[b]:
+                    continue
+                self.games[b] = MinesweeperGame(engine.rows, engine.cols, engine.mines)
+                self.games[b].set_mines(engine.mine_indices(b))
+            for action, row, col in self.pending[b]:
+                getattr(self.games[b], handlers[action])(int(row), int(col))
+            self.pending[b].clear()
+
+    def compare(self, observation):
+        engine = self.engine
+        for b, game in enumerate(self.games):
+            if game is None:
+                continue
+            expected = [visible_code(cell) for cell in game.cells]
+            state = (game.game_over, game.game_over and game.check_win(), game.mines_left, game.clicks)
+            batched = (engine.game_over[b], engine.won[b], engine.mines_left[b], engine.clicks[b])
+            if observation[b].reshape(-1).tolist() != expected or state != tuple(batched):
+                raise SystemExit(f"Board {b} diverged from MinesweeperGame: {state} != {batched}")
+
+    def reset(self, boards):
+        for b in boards:
+            self.games[b] = None
+            self.pending[b].clear()
+
+
+def random_actions(rng, engine):
+    """Mostly reveals, some flags and chords, on random cells."""
+    actions = rng.choice((REVEAL, FLAG, CHORD), size=engine.boards, p=(0.6, 0.2, 0.2))
+    return actions, rng.integers(0, engine.rows, engine.boards), rng.integers(0, engine.cols, engine.boards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert')
+    parser.add_argument('--boards', type=int, default=1024)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', action='store_true', help="compare every step against MinesweeperGame")
+    args = parser.parse_args()
+
+    rows, cols, mines = DIFFICULTIES[args.difficulty]
+    engine = BatchEngine(args.boards, rows, cols, mines, seed=args.seed)
+    mirror = ScalarMirror(engine) if args.check else None
+    rng = np.random.default_rng(args.seed + 1)
+    finished = 0
+    elapsed = 0.0
+    for _ in range(args.steps):
+        actions, action_rows, action_cols = random_actions(rng, engine)
+        start = time.perf_counter()
+        observation = engine.step(actions, action_rows, action_cols)
+        elapsed += time.perf_counter() - start
+        if mirror:
+            mirror.step(actions, action_rows, action_cols)
+            mirror.compare(observation)
+        done = np.flatnonzero(engine.game_over)
+        finished += len(done)
+        engine.reset(done)
+        if mirror:
+            mirror.reset(done)
+
+    steps = args.boards * args.steps
+    print(f"{steps} {args.difficulty} board steps in {elapsed:.3f}s ({steps / elapsed:.0f} steps/s), "
+          f"{finished} games finished")
+    if mirror:
+        print("parity check passed")
+
+
+if __name__ == '__main__':
+    main()
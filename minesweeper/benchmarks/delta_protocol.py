@@ -0,0 +1,141 @@
+"""Encode/decode throughput of the binary sync protocol, with a fuzz check.
+
+Records oracle-played seeded games, then times encoding every action's
+delta and applying the frames to a replica, and compares the bytes with
+JSON deltas and with sending the whole board after every move. With
+--fuzz, random games on random board sizes are streamed to replicas that
+must match MinesweeperGame after every action, late joiners catch up from
+keyframes, and corrupted frames applied to a replica must be rejected
+with ValueError.
+Run from the `minesweeper` directory:
+
+    python -m benchmarks.delta_protocol --games 200
+    python -m benchmarks.delta_protocol --fuzz 2000
+"""
+import argparse
+import copy
+import json
+import random
+import time
+from benchmarks.automation import record_game
+from game.automation import GameEnv, visible_code, REVEAL, FLAG, CHORD
+from game.minesweeper_game import DIFFICULTIES
+from game.serialization import encode_game
+from server.protocol import DeltaStream, BoardReplica, OutOfSync, encode_delta, encode_keyframe
+
+
+def record_deltas(env, games, seed):
+    """Replays oracle games and returns every action's (cells, mines_left, game_over, won)."""
+    rng = random.Random(seed)
+    deltas = []
+    for game_seed in range(seed, seed + games):
+        actions, _ = record_game(env, game_seed, rng)
+        env.reset(game_seed)
+        for action in actions:
+            deltas.append((env.apply_actions((action,)), env.game.mines_left, env.done, env.won))
+    return deltas
+
+
+def benchmark(difficulty, games, seed):
+    rows, cols, mines = DIFFICULTIES[difficulty]
+    env = GameEnv(rows, cols, mines)
+    deltas = record_deltas(env, games, seed)
+    size = rows * cols
+
+    start = time.perf_counter()
+    frames = [encode_delta(1, seq, cells, size, mines_left, game_over, won)
+              for seq, (cells, mines_left, game_over, won) in enumerate(deltas, 1)]
+    encode_time = time.perf_counter() - start
+
+    replica = BoardReplica()
+    replica.apply(encode_keyframe(1, 0, rows, cols, bytes([9]) * size, mines))
+    start = time.perf_counter()
+    for frame in frames:
+        replica.apply(frame)
+    decode_time = time.perf_counter() - start
+
+    binary = sum(len(frame) for frame in frames)
+    as_json = sum(len(json.dumps({"op": "delta", "game": 1, "seq": seq, "cells": cells, "game_over": game_over,
+                                  "won": won, "mines_left": mines_left}, separators=(',', ':')))
+                  for seq, (cells, mines_left, game_over, won) in enumerate(deltas, 1))
+    keyframe = len(encode_keyframe(1, 0, rows, cols, bytes(size), mines))
+    full_board = len(json.dumps(encode_game(env.game), separators=(',', ':')))  # What export_game writes
+    print(f"{len(frames)} {difficulty} deltas: encode {len(frames) / encode_time:.0f} frames/s "
+          f"({binary / encode_time / 1e6:.1f} MB/s), decode+apply {len(frames) / decode_time:.0f} frames/s")
+    print(f"bytes per action: binary {binary / len(frames):.1f}, JSON {as_json / len(frames):.1f}, "
+          f"binary keyframe {keyframe}, full JSON board {full_board}")
+
+
+def expect_state(replica, env, where):
+    truth = [visible_code(cell) for cell in env.game.cells]
+    state = (env.game.mines_left, env.done, env.won)
+    if list(replica.grid) != truth or (replica.mines_left, replica.game_over, replica.won) != state:
+        raise SystemExit(f"Replica diverged from MinesweeperGame {where}")
+
+
+def fuzz(runs, seed):
+    rng = random.Random(seed)
+    frames_checked = 0
+    for run in range(runs):
+        rows, cols = rng.randint(1, 30), rng.randint(1, 30)
+        if rows * cols < 2:
+            cols = 2
+        env = GameEnv(rows, cols, rng.randint(1, rows * cols - 1), seed=rng.getrandbits(32))
+        stream = DeltaStream(run, env, keyframe_interval=rng.randint(1, 12))
+        replica = BoardReplica()
+        for frame in stream.catch_up():
+            replica.apply(frame)
+        while not env.done:
+            action = (rng.choice((REVEAL, REVEAL, FLAG, CHORD)), rng.randrange(rows), rng.randrange(cols))
+            frame = stream.delta(env.apply_actions((action,)))
+            damaged = bytearray(frame)  # Corruption must only ever raise ValueError, even when applied
+            if rng.random() < 0.5:
+                del damaged[rng.randrange(len(damaged)):]
+            else:
+                damaged[rng.randrange(len(damaged))] ^= 1 << rng.randrange(8)
+            corrupted = [damaged]
+            if rng.random() < 0.05:  # Now and then every single-bit flip of the frame
+                corrupted += [bytes(byte ^ (1 << bit) if i == position else byte for i, byte in enumerate(frame))
+                              for position in range(len(frame)) for bit in range(8)]
+            for damaged in corrupted:
+                try:
+                    copy.deepcopy(replica).apply(bytes(damaged))
+                except ValueError:
+                    pass
+
+            replica.apply(frame)
+            frames_checked += 1
+            expect_state(replica, env, f"in run {run}")
+
+            if rng.random() < 0.1:  # A late joiner catches up from the last keyframe
+                joiner = BoardReplica()
+                for caught_up in stream.catch_up():
+                    joiner.apply(caught_up)
+                expect_state(joiner, env, f"for a late joiner in run {run}")
+
+        skipped = BoardReplica()  # A missing delta is detected
+        skipped.apply(encode_keyframe(run, 0, rows, cols, bytes([9]) * (rows * cols), env.game.mines))
+        try:
+            skipped.apply(encode_delta(run, 2, [], rows * cols, 0))
+        except OutOfSync:
+            pass
+        else:
+            raise SystemExit("A gap in the sequence was not detected")
+    print(f"fuzz passed: {runs} games, {frames_checked} frames")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fuzz', type=int, default=0, metavar='GAMES', help="run the fuzz check instead")
+    args = parser.parse_args()
+    if args.fuzz:
+        fuzz(args.fuzz, args.seed)
+    else:
+        benchmark(args.difficulty, args.games, args.seed)
+
+
+if __name__ == '__main__':
+    main()
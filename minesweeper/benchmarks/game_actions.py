@@ -0,0 +1,49 @@
+"""Headless benchmark of the core game actions.
+
+Run from the `minesweeper` directory:
+
+    python -m benchmarks.game_actions --games 200 --profile stdout
+"""
+import argparse
+import random
+import time
+from game.minesweeper_game import MinesweeperGame, DIFFICULTIES
+from game.profiling import profiler, configure as configure_profiling
+
+
+def play_random_game(game, rng):
+    """Clicks random unrevealed cells until the game ends or no safe click is left."""
+    cells = [(r, c) for r in range(game.rows) for c in range(game.cols)]
+    rng.shuffle(cells)
+    for r, c in cells:
+        if game.game_over:
+            break
+        if not game.board[r][c]['revealed']:
+            game.reveal_cell(r, c)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', default='', help="profiling sinks, e.g. stdout,jsonl:run.jsonl,pstats:run.prof")
+    args = parser.parse_args()
+
+    if args.profile:
+        configure_profiling(args.profile)
+
+    rows, cols, mines = DIFFICULTIES[args.difficulty]
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    game = MinesweeperGame(rows, cols, mines)
+    for seed in range(args.seed, args.seed + args.games):
+        game.reset_board(seed)  # Restart in place, as New Game does; seeded so runs replay the same boards
+        play_random_game(game, rng)
+    elapsed = time.perf_counter() - start
+    profiler.disable()
+    print(f"{args.games} {args.difficulty} games in {elapsed:.3f}s ({args.games / elapsed:.1f} games/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Latency of New Game (F2) and difficulty switches in the real main window.
+
+Runs on the offscreen Qt platform and includes the repaint of the window.
+With --check, it instead fails if `MinesweeperGame.reset_board` keeps
+any block it allocated, if restarting in the window keeps memory,
+allocates more than a few small objects or writes the autosave journal,
+and it then idles a running game for a few timer ticks and fails
+if anything repaints outside the timer counter and the status bar.
+Run from the `minesweeper` directory:
+
+    python -m benchmarks.new_game --runs 200
+    python -m benchmarks.new_game --check
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6 import QtWidgets, QtGui, QtCore
+from game import minesweeper_game
+from gui.main_window import MainWindow, DIFFICULTIES
+
+# The window's restart also runs Qt and status bar code that makes small temporaries and keeps the
+# journal's newest change tracker, so it gets an allowance; the game reset itself must keep no block
+MAX_KEPT_BYTES = 1024  # Memory all the checked restarts together may keep, e.g. the last change tracker
+MAX_PEAK_BYTES = 16 * 1024  # Temporaries of one restart; a journal keyframe of an Expert board is several times this
+
+
+class PaintWatcher(QtCore.QObject):
+    """Counts paint events delivered to the watched widgets and keeps their regions."""
+    def __init__(self):
+        super().__init__()
+        self.paints = 0
+        self.regions = []  # (widget, painted region in its own coordinates)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Type.Paint:
+            self.paints += 1
+            self.regions.append((obj, QtGui.QRegion(event.region())))
+        return False
+
+
+def measure(app, window, action, runs):
+    """Returns per-call latencies in milliseconds for `action`, up to the board's next paint."""
+    watcher = PaintWatcher()
+    window.board_widget.installEventFilter(watcher)
+    samples = []
+    for i in range(runs):
+        painted = watcher.paints
+        start = time.perf_counter()
+        action(i)
+        while watcher.paints == painted:  # A rebuilt widget tree may only paint after layout events
+            app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    window.board_widget.removeEventFilter(watcher)
+    return samples
+
+
+def check_reset(runs):
+    """Plays and resets an Expert board `runs` times; exits if `reset_board` keeps any block it allocated."""
+    game = minesweeper_game.MinesweeperGame(*DIFFICULTIES["Expert"])
+    game.reset_board()
+    seed = game.seed  # Reused: drawing a fresh one is the single int a real restart keeps
+    tracemalloc.start(16)
+    for _ in range(runs):
+        game.reveal_cell(game.rows // 2, game.cols // 2)  # Gives the reset something to clear
+        tracemalloc.clear_traces()  # From here only blocks the reset allocates are traced
+        game.reset_board(seed)
+        kept, _ = tracemalloc.get_traced_memory()
+        if kept:
+            stats = tracemalloc.take_snapshot().statistics('lineno')
+            raise SystemExit("reset_board kept allocated blocks:\n" + "\n".join(str(stat) for stat in stats[:10]))
+    tracemalloc.stop()
+    print(f"reset check passed: {runs} resets of a played Expert board kept no allocated block")
+
+
+def check_restarts(app, window, runs):
+    """Restarts an Expert game `runs` times in the window; exits if restarts keep or make much, or touch the journal."""
+    window.set_difficulty(*DIFFICULTIES["Expert"])
+    for _ in range(10):  # Warm up caches and Qt's event queues
+        window.new_game()
+        app.processEvents()
+    journal = Path(window.autosave.path)
+
+    tracemalloc.start()  # Also starts the peak from here
+    start, _ = tracemalloc.get_traced_memory()
+    for _ in range(runs):
+        window.new_game()
+        app.processEvents()
+    end, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if end - start > MAX_KEPT_BYTES or peak - start > MAX_PEAK_BYTES:
+        raise SystemExit(f"{runs} restarts kept {end - start} bytes, peaking at {peak - start} bytes")
+    if journal.exists():
+        raise SystemExit("Restarting wrote the autosave journal")
+    window.game.reveal_cell(0, 0)
+    if not journal.exists():
+        raise SystemExit("The first action of a game did not open the autosave journal")
+    print(f"restart check passed: {runs} restarts kept {end - start} bytes, peaking at {peak - start} bytes")
+
+
+def check_idle(app, window, ticks):
+    """Idles a started Expert game for `ticks` timer ticks; exits if anything but the timer and status repaint."""
+    window.set_difficulty(*DIFFICULTIES["Expert"])
+    window.game.reveal_cell(window.game.rows // 2, window.game.cols // 2)  # Mines go around it, so the game runs
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(500, loop.quit)  # The resize and the click repaint the window once
+    loop.exec()
+
+    watcher = PaintWatcher()
+    app.installEventFilter(watcher)
+    remaining = ticks
+
+    def tick():
+        nonlocal remaining
+        remaining -= 1
+        if remaining < 0:  # Once the last tick's repaint has been delivered
+            loop.quit()
+
+    window.timer.timeout.connect(tick)
+    loop.exec()
+    app.removeEventFilter(watcher)
+
+    def in_window(widget, region):
+        return region if widget is window else region.translated(widget.mapTo(window, QtCore.QPoint(0, 0)))
+
+    allowed = QtGui.QRegion()
+    for widget in (window.timer_counter, window.statusBar()):
+        allowed = allowed.united(in_window(widget, QtGui.QRegion(widget.rect())))
+    painted = [(widget, in_window(widget, region)) for widget, region in watcher.regions
+               if isinstance(widget, QtWidgets.QWidget) and widget.window() is window]
+    if not any(widget is window.timer_counter for widget, _ in painted):
+        raise SystemExit(f"The timer did not repaint in {ticks} ticks")
+    for widget, region in painted:
+        outside = region.subtracted(allowed)
+        if not outside.isEmpty():
+            raise SystemExit(f"{type(widget).__name__} repainted {outside.boundingRect()} while idle")
+    print(f"idle check passed: {len(watcher.regions)} paints in {ticks} timer ticks, all of the timer or status bar")
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<24} median {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--check', action='store_true', help="run the restart and idle repaint checks instead")
+    parser.add_argument('--ticks', type=int, default=3, help="timer ticks the idle check waits")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication([])
+    data_directory = tempfile.TemporaryDirectory()  # Keeps the player's statistics and journal out of it
+    window = MainWindow(data_directory.name)
+    window.show()
+    app.processEvents()
+
+    if args.check:
+        loop = QtCore.QEventLoop()
+        QtCore.QTimer.singleShot(100, loop.quit)  # Opens the statistics store and the autosave journal
+        loop.exec()
+        check_reset(args.runs)
+        check_restarts(app, window, args.runs)
+        check_idle(app, window, args.ticks)
+        window.close()
+        data_directory.cleanup()
+        return
+    for label in DIFFICULTIES:
+        window.set_difficulty(*DIFFICULTIES[label])
+        report(f"new game ({label})", measure(app, window, lambda i: window.new_game(), args.runs))
+
+    settings = list(DIFFICULTIES.values())
+    report("difficulty switch", measure(app, window, lambda i: window.set_difficulty(*settings[i % len(settings)]), args.runs))
+    window.close()
+    data_directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Throughput of the replay verifier, with a check that it catches tampering.
+
+Records oracle-played games as replays with human-like timing, tampers
+with some of them (a false outcome or time, a click on a revealed cell,
+inhuman input speed), then verifies them all in this process and with the
+worker pool of `tournament.verify`. Every honest replay must be accepted
+and every tampered one rejected. Run from the `minesweeper` directory:
+
+    python -m benchmarks.replay_verify --replays 5000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from benchmarks.automation import record_game
+from game.automation import GameEnv, REVEAL
+from game.board_code import encode_seed_code
+from game.minesweeper_game import DIFFICULTIES
+from game.replay import REPLAY_VERSION, HUMAN_LIMITS, ReplayError, game_time, verify_replay
+from tournament.verify import verify_files
+
+TAMPERINGS = ("outcome", "time", "revealed", "speed")
+
+
+def make_replays(difficulty, count, seed):
+    """Returns (replay, tampering or None) pairs; a quarter of the replays are tampered with."""
+    rows, cols, mines = DIFFICULTIES[difficulty]
+    env = GameEnv(rows, cols, mines)
+    rng = random.Random(seed)
+    replays = []
+    for game_seed in range(seed, seed + count):
+        actions, won = record_game(env, game_seed, rng)
+        timed = []
+        now = 0
+        for action, row, col in actions:
+            timed.append([now, action, row, col])
+            now += rng.randint(60, 400)
+        replay = {"version": REPLAY_VERSION, "player": f"player{game_seed % 100}",
+                  "board": encode_seed_code(rows, cols, mines, game_seed), "actions": timed, "won": won,
+                  "time_ms": game_time(timed)}
+        tampering = rng.choice(TAMPERINGS) if rng.random() < 0.25 else None
+        if tampering == "outcome":
+            replay["won"] = not won
+        elif tampering == "time":
+            replay["time_ms"] -= rng.randint(1, 1000)
+        elif tampering == "revealed":  # Opens the first cell again
+            first = timed[0]
+            timed.insert(1, [first[0] + 100, REVEAL, first[2], first[3]])
+            for action in timed[2:]:
+                action[0] += 100
+            replay["time_ms"] = game_time(timed)
+        elif tampering == "speed":  # A burst no hand can click
+            start = rng.randrange(len(timed))
+            for number in range(start, len(timed)):
+                timed[number][0] = timed[start][0] + (timed[number][0] - timed[start][0]) // 20
+            replay["time_ms"] = game_time(timed)
+        replays.append((replay, tampering))
+    return replays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert')
+    parser.add_argument('--replays', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, help="worker pool size; default: one per CPU")
+    args = parser.parse_args()
+
+    replays = make_replays(args.difficulty, args.replays, args.seed)
+    actions = sum(len(replay["actions"]) for replay, _ in replays)
+    print(f"{len(replays)} {args.difficulty} replays, {actions} actions, "
+          f"{sum(tampering is not None for _, tampering in replays)} tampered with")
+
+    games = {}
+    start = time.perf_counter()
+    for replay, tampering in replays:
+        try:
+            verify_replay(replay, games, HUMAN_LIMITS)
+            if tampering:
+                raise SystemExit(f"Tampered replay accepted ({tampering}): {replay['board']}")
+        except ReplayError as e:
+            if not tampering:
+                raise SystemExit(f"Honest replay rejected: {replay['board']}: {e}")
+    elapsed = time.perf_counter() - start
+    print(f"in process: {len(replays) / elapsed * 60:.0f} replays/min ({actions / elapsed:.0f} actions/s)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "replays.jsonl")
+        with open(path, 'w') as f:
+            for replay, _ in replays:
+                f.write(json.dumps(replay, separators=(',', ':')) + "\n")
+        start = time.perf_counter()
+        counts, _ = verify_files([path], os.path.join(directory, "verified.jsonl"), args.processes)
+        elapsed = time.perf_counter() - start
+    tampered = sum(tampering is not None for _, tampering in replays)
+    if (counts["accepted"], counts["rejected"]) != (len(replays) - tampered, tampered):
+        raise SystemExit(f"Worker pool disagrees: {dict(counts)}")
+    print(f"worker pool ({args.processes or os.cpu_count()} processes, parsing included): "
+          f"{len(replays) / elapsed * 60:.0f} replays/min")
+    print("every honest replay accepted, every tampered one rejected")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Load generator for the game server.
+
+Opens --connections TCP connections that each play --games games at once,
+revealing random hidden cells and starting a new game whenever one ends.
+Starts a server in a subprocess unless --port is given. Run from the
+`minesweeper` directory:
+
+    python -m benchmarks.server_load --connections 50 --games 40 --duration 10
+    python -m benchmarks.server_load --binary
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from game.automation import HIDDEN
+from game.minesweeper_game import DIFFICULTIES
+from server.protocol import decode_frame, LENGTH, DELTA, MESSAGE
+
+
+class LoadClient:
+    """One connection; replies are matched to the game that is waiting for them."""
+    def __init__(self, reader, writer, size):
+        self.reader = reader
+        self.writer = writer
+        self.size = size  # Cells per board, to decode binary deltas
+        self.created = []  # Futures for "new" requests, answered in order
+        self.waiting = {}  # Game id -> future for its next delta
+        self.latencies = []
+        self.received = 0  # Bytes
+        self.actions = 0
+        self.games = 0
+
+    def send(self, message):
+        self.writer.write(json.dumps(message, separators=(',', ':')).encode() + b"\n")
+
+    async def read_replies(self):
+        async for line in self.reader:
+            self.received += len(line)
+            self.dispatch(json.loads(line))
+
+    async def read_frames(self):
+        while True:
+            frame = await self.reader.readexactly(LENGTH.unpack(await self.reader.readexactly(LENGTH.size))[0])
+            self.received += LENGTH.size + len(frame)
+            decoded = decode_frame(frame, self.size)
+            if decoded["kind"] == MESSAGE:
+                self.dispatch(decoded["message"])
+            elif decoded["kind"] == DELTA:
+                self.dispatch(dict(decoded, op="delta"))
+
+    def dispatch(self, message):
+        if message["op"] == "created":
+            self.created.pop(0).set_result(message)
+        elif message["op"] == "delta":
+            self.waiting.pop(message["game"]).set_result(message)
+        elif message["op"] == "error":
+            raise RuntimeError(message["error"])
+
+    async def request(self, message, futures, key=None):
+        future = asyncio.get_running_loop().create_future()
+        if key is None:
+            futures.append(future)
+        else:
+            futures[key] = future
+        self.send(message)
+        return await future
+
+    async def play(self, rows, cols, mines, rng, deadline):
+        """Plays games back to back until the deadline."""
+        while time.perf_counter() < deadline:
+            created = await self.request({"op": "new", "rows": rows, "cols": cols, "mines": mines}, self.created)
+            game_id = created["game"]
+            grid = [HIDDEN] * (rows * cols)
+            game_over = False
+            while not game_over and time.perf_counter() < deadline:
+                index = rng.randrange(rows * cols)
+                while grid[index] != HIDDEN:
+                    index = rng.randrange(rows * cols)
+                start = time.perf_counter()
+                delta = await self.request({"op": "action", "game": game_id, "action": "reveal",
+                                            "row": index // cols, "col": index % cols}, self.waiting, game_id)
+                self.latencies.append(time.perf_counter() - start)
+                self.actions += 1
+                for cell, code in delta["cells"]:
+                    grid[cell] = code
+                game_over = delta["game_over"]
+            self.send({"op": "leave", "game": game_id})
+            self.games += 1
+
+
+async def run(host, port, connections, games, difficulty, duration, seed, binary):
+    rows, cols, mines = DIFFICULTIES[difficulty]
+    clients = []
+    for _ in range(connections):
+        client = LoadClient(*await asyncio.open_connection(host, port), rows * cols)
+        if binary:
+            client.send({"op": "hello", "format": "binary"})
+        clients.append(client)
+    readers = [asyncio.create_task(client.read_frames() if binary else client.read_replies()) for client in clients]
+
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(client.play(rows, cols, mines, random.Random(rng.random()), deadline)
+                           for client in clients for _ in range(games)))
+    elapsed = time.perf_counter() - start
+    for reader in readers:
+        reader.cancel()
+    for client in clients:
+        client.writer.close()
+
+    latencies = sorted(latency for client in clients for latency in client.latencies)
+    actions = sum(client.actions for client in clients)
+    print(f"{connections * games} concurrent {difficulty} games, {sum(c.games for c in clients)} played, "
+          f"{actions} actions in {elapsed:.1f}s ({actions / elapsed:.0f} actions/s)")
+    print(f"latency median {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms, "
+          f"{sum(client.received for client in clients) / actions:.1f} bytes received per action")
+    return actions / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="an already running server; by default one is started")
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--games', type=int, default=40, help="concurrent games per connection")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--binary', action='store_true', help="receive binary frames instead of JSON lines")
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    if port is None:
+        server = subprocess.Popen([sys.executable, '-m', 'server', '--host', args.host, '--port', '0'],
+                                  stdout=subprocess.PIPE, text=True)
+        port = int(server.stdout.readline().rsplit(':', 1)[1])  # "Listening on host:port"
+    try:
+        asyncio.run(run(args.host, port, args.connections, args.games, args.difficulty, args.duration, args.seed,
+                        args.binary))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Throughput of the sharded server as the number of worker processes grows.
+
+Starts `python -m server.router` with each --workers count in turn and runs
+the `server_load` generator against it. With --restart, the workers are
+restarted one at a time halfway through each run, so games migrate through
+snapshots under load. Run from the `minesweeper` directory:
+
+    python -m benchmarks.sharding --workers 1 2 4 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+from benchmarks.server_load import run
+from game.minesweeper_game import DIFFICULTIES
+
+
+async def run_with_restart(router, duration, *args):
+    async def restart():
+        await asyncio.sleep(duration / 2)
+        router.send_signal(signal.SIGHUP)
+    restarting = asyncio.create_task(restart())
+    rate = await run(*args)
+    await restarting
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--games', type=int, default=40, help="concurrent games per connection")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--binary', action='store_true', help="receive binary frames instead of JSON lines")
+    parser.add_argument('--restart', action='store_true', help="restart the workers halfway through each run")
+    args = parser.parse_args()
+
+    rates = {}
+    for workers in args.workers:
+        print(f"--- {workers} workers ---")
+        router = subprocess.Popen([sys.executable, '-m', 'server.router', '--workers', str(workers), '--port', '0'],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            line = router.stdout.readline()
+            while not line.startswith("Listening on"):
+                line = router.stdout.readline()
+            port = int(line.rsplit(':', 1)[1])
+            load = (args.connections, args.games, args.difficulty, args.duration, args.seed, args.binary)
+            if args.restart:
+                rates[workers] = asyncio.run(run_with_restart(router, args.duration, '127.0.0.1', port, *load))
+            else:
+                rates[workers] = asyncio.run(run('127.0.0.1', port, *load))
+        finally:
+            router.terminate()
+            router.wait()
+    base = rates[args.workers[0]]
+    print(f"--- {os.cpu_count()} CPUs ---")
+    for workers, rate in rates.items():
+        print(f"{workers} workers: {rate:.0f} actions/s ({rate / base:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Cold-start timing harness: measures time-to-first-paint of the main window.
+
+Every run starts a fresh interpreter on the offscreen Qt platform. Run from
+the `minesweeper` directory:
+
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD = r'''
+import sys, time
+start_ns = int(sys.argv[1])
+from PyQt6 import QtWidgets, QtCore
+from gui.main_window import MainWindow
+imported_ns = time.monotonic_ns()
+
+class FirstPaint(QtCore.QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Type.Paint:
+            painted_ns = time.monotonic_ns()
+            QtCore.QTimer.singleShot(0, lambda: report(painted_ns))
+            obj.removeEventFilter(self)
+        return False
+
+def report(painted_ns):
+    print((imported_ns - start_ns) / 1e6, (constructed_ns - start_ns) / 1e6, (painted_ns - start_ns) / 1e6)
+    app.quit()
+
+app = QtWidgets.QApplication(sys.argv[:1])
+window = MainWindow(sys.argv[2])
+constructed_ns = time.monotonic_ns()
+paint_filter = FirstPaint()
+window.board_widget.installEventFilter(paint_filter)
+window.show()
+app.exec()
+'''
+
+
+def run_once():
+    """Returns (imports, constructed, first paint) in milliseconds since process spawn."""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    with tempfile.TemporaryDirectory() as data_directory:  # A first start, away from the player's data
+        start_ns = time.monotonic_ns()  # CLOCK_MONOTONIC is shared between processes
+        output = subprocess.run([sys.executable, '-c', CHILD, str(start_ns), data_directory], env=env,
+                                cwd=os.getcwd(), capture_output=True, text=True, check=True).stdout
+    return tuple(float(value) for value in output.split()[-3:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    for label, values in zip(("imports", "window built", "first paint"), zip(*results)):
+        print(f"{label:<14} median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
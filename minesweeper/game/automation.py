@@ -0,0 +1,109 @@
+"""Programmatic access to the game for bots, fuzzers and load tests.
+
+Runs the same `MinesweeperGame` logic as the window, without Qt:
+
+    env = GameEnv(16, 30, 99, seed=1)
+    delta = env.apply_actions([(REVEAL, 8, 15), (FLAG, 0, 0)])
+    grid = env.observation()  # bytearray, one code per cell
+"""
+from game.minesweeper_game import MinesweeperGame
+
+# Actions
+REVEAL = 0
+FLAG = 1  # Toggles the flag
+CHORD = 2
+ACTION_NAMES = {'reveal': REVEAL, 'flag': FLAG, 'chord': CHORD}
+
+# Observation codes; 0-8 are revealed numbers
+HIDDEN = 9
+FLAGGED = 10
+MINE = 11  # Revealed at the end of a lost game
+BLASTED = 12
+FALSE_FLAG = 13
+
+
+def visible_code(cell):
+    """Returns the observation code of a cell as the player sees it."""
+    if cell['revealed']:
+        if cell['mine']:
+            return BLASTED if cell['blasted'] else MINE
+        return cell['neighbor']
+    if cell['false_flagged']:
+        return FALSE_FLAG
+    return FLAGGED if cell['flagged'] else HIDDEN
+
+
+class GameEnv:
+    """Drives one game with batches of actions and reports what changed."""
+    def __init__(self, rows, cols, mines, seed=None):
+        self._wrap(MinesweeperGame(rows, cols, mines, seed=seed))
+
+    @classmethod
+    def from_game(cls, game):
+        """Wraps an existing game, e.g. one restored by `game.serialization`."""
+        env = cls.__new__(cls)
+        env._wrap(game)
+        return env
+
+    def _wrap(self, game):
+        self.game = game
+        self.changes = game.add_change_tracker()
+        self.grid = bytearray(visible_code(cell) for cell in game.cells)
+        self.handlers = (game.reveal_cell, game.toggle_flag, game.reveal_adjacent)
+
+    def reset(self, seed=None):
+        """Starts a new game on the same board, from `seed` or a fresh one. Returns the observation."""
+        self.game.reset_board(seed)
+        self.changes.clear()
+        self.grid[:] = bytes([HIDDEN]) * len(self.grid)
+        return self.observation()
+
+    @property
+    def done(self):
+        return self.game.game_over
+
+    @property
+    def won(self):
+        return self.game.game_over and self.game.check_win()
+
+    def apply_actions(self, actions):
+        """Applies (action, row, col) tuples in order and returns the changed cells.
+
+        The delta is a list of (flat index, observation code) pairs sorted by index.
+        Actions after the game has ended are ignored, as clicks are in the window.
+        Raises ValueError for an unknown action or a cell off the board.
+        """
+        rows, cols, handlers = self.game.rows, self.game.cols, self.handlers
+        for action, row, col in actions:
+            if not (0 <= row < rows and 0 <= col < cols):
+                raise ValueError(f"Cell ({row}, {col}) is off the {rows}x{cols} board")
+            if action.__class__ is str:
+                name, action = action, ACTION_NAMES.get(action)
+                if action is None:
+                    raise ValueError(f"Unknown action: {name!r}")
+            if not 0 <= action < 3:
+                raise ValueError(f"Unknown action: {action!r}")
+            handlers[action](row, col)
+        return self.delta()
+
+    def delta(self):
+        """Drains the changed cells into the observation and returns them as (index, code) pairs."""
+        if not self.changes:
+            return []
+        cells, grid = self.game.cells, self.grid
+        delta = []
+        for i in sorted(self.changes):
+            code = visible_code(cells[i])
+            if grid[i] != code:
+                grid[i] = code
+                delta.append((i, code))
+        self.changes.clear()
+        return delta
+
+    def observation(self):
+        """Returns the visible state as a copy of the rows * cols grid of observation codes."""
+        return bytearray(self.grid)
+
+    def legal_reveals(self):
+        """Flat indices of the cells a reveal would open."""
+        return [i for i, code in enumerate(self.grid) if code == HIDDEN]
@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import threading
+from game.serialization import encode_cell, encode_game
+
+
+class AutosaveJournal:
+    """Append-only journal of a game in progress, for crash recovery.
+
+    The first line is a keyframe holding the full game; every snapshot after
+    it appends only the cells changed since the previous one. A game that has
+    not started gets its keyframe with the first snapshot that has changes,
+    so restarting a game does not touch the journal file. Once enough
+    deltas pile up, a background thread rewrites the journal as a single
+    keyframe while new deltas keep being appended.
+    """
+    def __init__(self, path, compact_after=200):
+        self.path = str(path)
+        self.compact_after = compact_after
+        self.lock = threading.Lock()  # Guards the file handle against the compaction thread
+        self.file = None
+        self.game = None
+        self.changes = None
+        self.extra = {}
+        self.deltas = 0  # Deltas written since the last keyframe
+        self.compacting = False
+        self.tail = []  # Deltas written while a compaction is running
+        self.generation = 0  # Bumped whenever the journal is restarted, invalidating running compactions
+
+    def attach(self, game, **extra):
+        """Starts journaling `game`: a started game is written as a keyframe now, a new one by its first snapshot."""
+        self.detach()
+        self.game = game
+        self.extra = extra
+        self.changes = game.add_change_tracker()
+        with self.lock:
+            self.generation += 1
+            self.compacting = False
+            if self.file:
+                self.file.close()
+                self.file = None
+            if game.game_started:
+                self.file = open(self.path, 'w')
+                self._write(self._keyframe())
+            elif os.path.exists(self.path):
+                os.remove(self.path)  # An earlier game must not be offered for recovery
+        self.deltas = 0
+
+    @property
+    def opened(self):
+        """Whether the journal holds a keyframe of the current game."""
+        return self.file is not None
+
+    def detach(self):
+        if self.game is not None:
+            self.game.remove_change_tracker(self.changes)
+            self.game = None
+
+    def _keyframe(self):
+        return json.dumps({"keyframe": encode_game(self.game, **self.extra)}, separators=(',', ':')) + "\n"
+
+    def _write(self, line):
+        self.file.write(line)
+        self.file.flush()  # Survives a crash of the application, not of the OS
+        if self.compacting:
+            self.tail.append(line)
+
+    def snapshot(self):
+        """Appends the cells changed since the last snapshot. Costs nothing if nothing changed."""
+        if self.game is None or not self.changes:
+            return
+        if self.file is None:  # The first snapshot of a new game: its keyframe holds the changes
+            self.changes.clear()
+            with self.lock:
+                self.file = open(self.path, 'w')
+                self._write(self._keyframe())
+            return
+        board, cols = self.game.board, self.game.cols
+        cells = [[index, encode_cell(board[index // cols][index % cols])] for index in sorted(self.changes)]
+        self.changes.clear()
+        game = self.game
+        line = json.dumps({"cells": cells, "game_over": game.game_over, "game_started": game.game_started,
+                           "mines_left": game.mines_left, "clicks": game.clicks,
+                           "elapsed_ms": game.elapsed_ms()}, separators=(',', ':')) + "\n"
+        with self.lock:
+            self._write(line)
+        self.deltas += 1
+        if self.deltas >= self.compact_after and not self.compacting:
+            self.compact()
+
+    def compact(self):
+        """Rewrites the journal as one keyframe on a background thread."""
+        keyframe = self._keyframe()  # Encoded here, so the thread never reads the live board
+        self.compacting = True
+        self.tail = []
+        self.deltas = 0
+        threading.Thread(target=self._compact, args=(keyframe, self.generation),
+                         name="autosave-compaction", daemon=True).start()
+
+    def _compact(self, keyframe, generation):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".autosave-", suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            f.write(keyframe)
+            f.flush()
+            os.fsync(f.fileno())
+        with self.lock:
+            if generation != self.generation or self.file is None:
+                os.unlink(temp_path)  # The journal was restarted or closed meanwhile
+                return
+            # Deltas appended after the keyframe was taken still belong in the new journal
+            with open(temp_path, 'a') as f:
+                f.writelines(self.tail)
+            self.file.close()
+            os.replace(temp_path, self.path)
+            self.file = open(self.path, 'a')
+            self.deltas = len(self.tail)
+            self.compacting = False
+            self.tail = []
+
+    def clear(self):
+        """Stops journaling and removes the journal, e.g. once the game is won or lost."""
+        self.detach()
+        with self.lock:
+            self.generation += 1
+            if self.file:
+                self.file.close()
+                self.file = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def close(self):
+        """Writes a final snapshot and closes the journal, keeping it for the next start."""
+        self.snapshot()
+        self.detach()
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+def load_journal(path):
+    """Rebuilds the last journaled game state, or returns None if there is no usable journal."""
+    state = None
+    board = None
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            break  # A line cut short by a crash ends the journal
+        if "keyframe" in entry:
+            state = entry["keyframe"]
+            board = [list(row) for row in state["board"]]
+        elif state is not None:
+            cols = state["cols"]
+            for index, symbol in entry.pop("cells"):
+                board[index // cols][index % cols] = symbol
+            state.update(entry)
+
+    if state is None:
+        return None
+    state["board"] = ["".join(row) for row in board]
+    return state
@@ -0,0 +1,209 @@
+"""Many boards of one size stepped together with NumPy, for training agents.
+
+The rules follow `MinesweeperGame`: mines are placed on the first reveal
+away from the clicked cell, reveals cascade through empty cells, a chord
+opens the unflagged neighbors in order and stops at the first mine, and a
+game is won once every safe cell is revealed and every mine flagged.
+Time is not tracked.
+"""
+import numpy as np
+from game.automation import REVEAL, FLAG, CHORD, HIDDEN, FLAGGED, MINE, BLASTED, FALSE_FLAG
+
+NOOP = -1  # Leaves a board untouched for this step
+# Neighbor offsets in the order MinesweeperGame visits them
+OFFSETS = np.array([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+
+
+def dilate(mask):
+    """Grows a (boards, rows, cols) mask by one cell in all eight directions."""
+    grown = mask.copy()
+    grown[:, 1:, :] |= mask[:, :-1, :]
+    grown[:, :-1, :] |= mask[:, 1:, :]
+    wide = grown.copy()
+    wide[:, :, 1:] |= grown[:, :, :-1]
+    wide[:, :, :-1] |= grown[:, :, 1:]
+    return wide
+
+
+class BatchEngine:
+    """`boards` games of rows x cols with `mines` mines each, held in stacked arrays."""
+    def __init__(self, boards, rows, cols, mines, seed=None):
+        if not 0 < mines < rows * cols:
+            raise ValueError(f"{mines} mines do not fit a {rows}x{cols} board with a safe first click")
+        self.boards, self.rows, self.cols, self.mines = boards, rows, cols, mines
+        self.rng = np.random.default_rng(seed)
+        shape = (boards, rows, cols)
+        self.mine = np.zeros(shape, bool)
+        self.revealed = np.zeros(shape, bool)
+        self.flagged = np.zeros(shape, bool)
+        self.blasted = np.zeros(shape, bool)
+        self.false_flagged = np.zeros(shape, bool)
+        self.neighbor = np.zeros(shape, np.int8)
+        self.placed = np.zeros(boards, bool)
+        self.started = np.zeros(boards, bool)
+        self.game_over = np.zeros(boards, bool)
+        self.won = np.zeros(boards, bool)
+        self.mines_left = np.full(boards, mines, np.int32)
+        self.hidden_safe = np.full(boards, rows * cols - mines, np.int32)
+        self.clicks = np.zeros(boards, np.int32)
+
+    def reset(self, boards=None):
+        """Clears the given board indices (all by default) for new games."""
+        selection = slice(None) if boards is None else boards
+        for array in (self.mine, self.revealed, self.flagged, self.blasted, self.false_flagged,
+                      self.placed, self.started, self.game_over, self.won):
+            array[selection] = False
+        self.neighbor[selection] = 0
+        self.mines_left[selection] = self.mines
+        self.hidden_safe[selection] = self.rows * self.cols - self.mines
+        self.clicks[selection] = 0
+
+    def set_mines(self, board, indices):
+        """Places mines on one board at the given flat indices, like `MinesweeperGame.set_mines`."""
+        self.mine[board] = False
+        self.mine[board].reshape(-1)[list(indices)] = True
+        self.placed[board] = True
+        self._count_neighbors(np.array([board]))
+
+    def mine_indices(self, board):
+        """Flat indices of the mines on one board."""
+        return np.flatnonzero(self.mine[board]).tolist()
+
+    def _place(self, boards, starts):
+        """Places mines uniformly at random on each board, never on its flat `starts` cell."""
+        cells = self.rows * self.cols
+        keys = self.rng.random((len(boards), cells))
+        keys[np.arange(len(boards)), starts] = 2.0  # Sorts after every other cell
+        chosen = np.argpartition(keys, self.mines - 1, axis=1)[:, :self.mines]
+        flat = self.mine.reshape(self.boards, cells)
+        flat[boards[:, None], chosen] = True
+        self.placed[boards] = True
+        self._count_neighbors(boards)
+
+    def _count_neighbors(self, boards):
+        mines = np.pad(self.mine[boards].astype(np.int8), ((0, 0), (1, 1), (1, 1)))
+        rows, cols = self.rows, self.cols
+        counts = sum(mines[:, 1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols] for dr, dc in OFFSETS)
+        counts[self.mine[boards]] = 0  # Mines keep 0, as in MinesweeperGame
+        self.neighbor[boards] = counts
+
+    def _cascade(self, boards, seeds):
+        """Opens the seed cells of each board and floods through the empty cells they reach."""
+        if not len(boards):
+            return
+        empty = (self.neighbor[boards] == 0) & ~self.mine[boards]
+        blocked = self.revealed[boards] | self.flagged[boards]
+        opened = seeds & ~blocked
+        front = opened & empty
+        while front.any():
+            grown = dilate(front) & ~opened & ~blocked
+            opened |= grown
+            front = grown & empty
+        self.revealed[boards] |= opened
+        self.hidden_safe[boards] -= opened.sum(axis=(1, 2), dtype=np.int32)
+
+    def _explode(self, boards, rows, cols):
+        """Ends the games lost by opening the mine at (rows, cols), revealing every mine."""
+        if not len(boards):
+            return
+        self.game_over[boards] = True
+        self.blasted[boards, rows, cols] = True
+        self.revealed[boards] |= self.mine[boards]
+        self.false_flagged[boards] = self.flagged[boards] & ~self.mine[boards]
+
+    def _check_win(self, boards):
+        won = boards[(self.hidden_safe[boards] == 0) & (self.mines_left[boards] == 0)]
+        self.game_over[won] = True
+        self.won[won] = True
+
+    def step(self, actions, rows, cols):
+        """Applies one action per board (REVEAL, FLAG, CHORD or NOOP at rows[i], cols[i]).
+
+        Returns the observation after the step.
+        """
+        actions = np.asarray(actions)
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        if (rows < 0).any() or (rows >= self.rows).any() or (cols < 0).any() or (cols >= self.cols).any():
+            raise ValueError("Action off the board")
+
+        reveal = actions == REVEAL
+        first = reveal & ~self.started
+        if first.any():
+            self.started[first] = True
+            place = np.flatnonzero(first & ~self.placed)
+            if len(place):
+                self._place(place, rows[place] * self.cols + cols[place])
+        self._reveal(np.flatnonzero(reveal & ~self.game_over), rows, cols)
+        self._flag(np.flatnonzero((actions == FLAG) & ~self.game_over), rows, cols)
+        self._chord(np.flatnonzero((actions == CHORD) & ~self.game_over), rows, cols)
+        return self.observation()
+
+    def _reveal(self, boards, rows, cols):
+        self.clicks[boards] += 1
+        r, c = rows[boards], cols[boards]
+        closed = ~self.revealed[boards, r, c] & ~self.flagged[boards, r, c]
+        boards, r, c = boards[closed], r[closed], c[closed]
+        hit = self.mine[boards, r, c]
+        safe, r_safe, c_safe = boards[~hit], r[~hit], c[~hit]
+        seeds = np.zeros((len(safe), self.rows, self.cols), bool)
+        seeds[np.arange(len(safe)), r_safe, c_safe] = True
+        self._cascade(safe, seeds)
+        self._check_win(safe)
+        self.revealed[boards[hit], r[hit], c[hit]] = True
+        self._explode(boards[hit], r[hit], c[hit])
+
+    def _flag(self, boards, rows, cols):
+        r, c = rows[boards], cols[boards]
+        closed = ~self.revealed[boards, r, c]
+        boards, r, c = boards[closed], r[closed], c[closed]
+        self.clicks[boards] += 1
+        flagged = self.flagged[boards, r, c]
+        self.flagged[boards[flagged], r[flagged], c[flagged]] = False
+        self.mines_left[boards[flagged]] += 1
+        add = ~flagged & (self.mines_left[boards] > 0)
+        self.flagged[boards[add], r[add], c[add]] = True
+        self.mines_left[boards[add]] -= 1
+        self._check_win(boards)
+
+    def _chord(self, boards, rows, cols):
+        r, c = rows[boards], cols[boards]
+        numbered = self.revealed[boards, r, c] & (self.neighbor[boards, r, c] > 0)
+        boards, r, c = boards[numbered], r[numbered], c[numbered]
+        self.clicks[boards] += 1
+
+        # The eight neighbors of each chorded cell, in MinesweeperGame's order
+        nr = r[:, None] + OFFSETS[:, 0]
+        nc = c[:, None] + OFFSETS[:, 1]
+        inside = (nr >= 0) & (nr < self.rows) & (nc >= 0) & (nc < self.cols)
+        nr, nc = nr.clip(0, self.rows - 1), nc.clip(0, self.cols - 1)
+        at = boards[:, None]
+        flagged = self.flagged[at, nr, nc] & inside
+        chord = flagged.sum(axis=1) == self.neighbor[boards, r, c]
+
+        closed = inside & ~flagged & ~self.revealed[at, nr, nc] & chord[:, None]
+        mines = closed & self.mine[at, nr, nc]
+        hit = mines.any(axis=1)
+        first_mine = np.where(hit, mines.argmax(axis=1), len(OFFSETS))
+        opens = closed & (np.arange(len(OFFSETS)) < first_mine[:, None]) & ~mines
+        seeds = np.zeros((len(boards), self.rows, self.cols), bool)
+        which, k = np.nonzero(opens)
+        seeds[which, nr[which, k], nc[which, k]] = True
+        self._cascade(boards, seeds)
+
+        lost = np.flatnonzero(hit)
+        mine_r, mine_c = nr[lost, first_mine[lost]], nc[lost, first_mine[lost]]
+        self.revealed[boards[lost], mine_r, mine_c] = True
+        self._explode(boards[lost], mine_r, mine_c)
+        self._check_win(boards[~hit])
+
+    def observation(self):
+        """Returns the visible boards as uint8 codes, as `game.automation` encodes them."""
+        observation = np.full((self.boards, self.rows, self.cols), HIDDEN, np.uint8)
+        observation[self.flagged] = FLAGGED
+        observation[self.false_flagged] = FALSE_FLAG
+        numbers = self.revealed & ~self.mine
+        observation[numbers] = self.neighbor[numbers]
+        observation[self.revealed & self.mine] = MINE
+        observation[self.blasted] = BLASTED
+        return observation
@@ -0,0 +1,83 @@
+"""Short text codes for sharing boards.
+
+A seed code, "16x30x99-s1x2b3c", names the dimensions and the seed; the
+mines are placed from the seed around the first click, so everyone who
+starts on the same cell plays the same board. A mine code,
+"16x30x99-m<base64>", carries the mine bitmap itself and fixes the board
+regardless of the first click.
+"""
+import base64
+import re
+from game.minesweeper_game import MinesweeperGame
+
+CODE_PATTERN = re.compile(r'^(\d+)x(\d+)x(\d+)-([sm])([0-9A-Za-z_-]+)$')
+MAX_SIZE = 100  # Larger boards are not playable in the window
+
+
+def encode_seed_code(rows, cols, mines, seed):
+    return f"{rows}x{cols}x{mines}-s{to_base36(seed)}"
+
+
+def encode_mine_code(rows, cols, mines, indices):
+    bits = 0
+    for i in indices:
+        bits |= 1 << i
+    data = bits.to_bytes((rows * cols + 7) // 8, 'little')
+    return f"{rows}x{cols}x{mines}-m{base64.urlsafe_b64encode(data).rstrip(b'=').decode()}"
+
+
+def board_code(game):
+    """Returns the code of a game: its mine bitmap once the mines are placed, its seed before."""
+    if not game.mines_placed:
+        return encode_seed_code(game.rows, game.cols, game.mines, game.seed)
+    indices = [r * game.cols + c for r, row in enumerate(game.board) for c, cell in enumerate(row) if cell['mine']]
+    return encode_mine_code(game.rows, game.cols, game.mines, indices)
+
+
+def parse_board_code(code):
+    """Parses a board code into (rows, cols, mines, seed, mine_indices).
+
+    Exactly one of seed and mine_indices is set. Raises ValueError for a malformed code.
+    """
+    match = CODE_PATTERN.match(code.strip())
+    if not match:
+        raise ValueError(f"Not a board code: {code!r}")
+    rows, cols, mines = (int(group) for group in match.group(1, 2, 3))
+    if not (1 <= rows <= MAX_SIZE and 1 <= cols <= MAX_SIZE and 0 < mines < rows * cols):
+        raise ValueError(f"Invalid board size in code: {rows}x{cols} with {mines} mines")
+
+    kind, payload = match.group(4, 5)
+    if kind == 's':
+        return rows, cols, mines, int(payload, 36), None
+
+    try:
+        data = base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+    except ValueError:
+        raise ValueError(f"Corrupt mine bitmap in code: {code!r}")
+    bits = int.from_bytes(data, 'little')
+    if len(data) != (rows * cols + 7) // 8 or bits >> (rows * cols):
+        raise ValueError(f"Mine bitmap does not fit a {rows}x{cols} board")
+    indices = [i for i in range(rows * cols) if bits >> i & 1]
+    if len(indices) != mines:
+        raise ValueError(f"Mine bitmap has {len(indices)} mines, the code says {mines}")
+    return rows, cols, mines, None, indices
+
+
+def game_from_code(code, main_window=None):
+    """Builds an unstarted game for a board code."""
+    rows, cols, mines, seed, indices = parse_board_code(code)
+    game = MinesweeperGame(rows, cols, mines, main_window, seed)
+    if indices is not None:
+        game.set_mines(indices)
+        game.seed = None  # The bitmap, not a seed, decided this board
+    return game
+
+
+def to_base36(number):
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    text = ""
+    while True:
+        number, digit = divmod(number, 36)
+        text = digits[digit] + text
+        if not number:
+            return text
@@ -1,152 +1,437 @@
 import random
+import time
+from functools import lru_cache
+from game.profiling import profiled, board_cells
+
+SEED_BITS = 32  # Short enough for a board code, plenty of distinct boards
+DIFFICULTIES = {  # (rows, cols, mines) of the standard boards, by the names the command-line tools take
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+}
+EMPTY_CELL = {'mine': False, 'revealed': False, 'flagged': False, 'neighbor': 0, 'blasted': False, 'false_flagged': False}
+
+@lru_cache(maxsize=None)
+def neighbor_table(rows, cols):
+    """Flat indices of the up to eight neighbors of every cell, computed once per board size."""
+    return tuple(
+        tuple(nr * cols + nc
+              for nr in range(max(r - 1, 0), min(r + 2, rows))
+              for nc in range(max(c - 1, 0), min(c + 2, cols))
+              if (nr, nc) != (r, c))
+        for r in range(rows) for c in range(cols)
+    )
+
+
+@lru_cache(maxsize=None)
+def neighbor_degrees(rows, cols):
+    """Number of neighbors of every cell: 3 in the corners, 5 on the edges, 8 inside."""
+    return tuple(len(neighbors) for neighbors in neighbor_table(rows, cols))
+
+
+def new_seed():
+    """Draws a fresh seed for a game."""
+    return random.getrandbits(SEED_BITS)
+
 
 class MinesweeperGame:
-    def __init__(self, rows, cols, mines, main_window=None):
+    def __init__(self, rows, cols, mines, main_window=None, seed=None):
         self.rows = rows
         self.cols = cols
         self.mines = mines
         self.board = self._create_board(rows, cols)
+        self.cells = [cell for row in self.board for cell in row]  # Flat view, indexed by row * cols + col
+        self.neighbors = neighbor_table(rows, cols)
+        self._degrees = neighbor_degrees(rows, cols)
+        self._no_flags = (0,) * (rows * cols)
+        self.adjacent_flags = [0] * (rows * cols)  # Flagged neighbors per cell
+        self.adjacent_hidden = list(self._degrees)  # Unrevealed neighbors per cell, flagged ones included
+        self.frontier = set()  # Unrevealed, unflagged cells next to a revealed cell
+        self._safe_cells = rows * cols - mines  # Kept so a reset does not make a new int
+        self.hidden_safe = self._safe_cells  # Safe cells still to reveal; the game is won at zero
+        self.seed = new_seed() if seed is None else seed  # With the first click, decides where the mines go
+        self.mines_placed = False
         self.game_over = False
         self.game_started = False
         self.mines_left = mines
+        self.start_time_ns = None  # Monotonic clock at the first reveal
+        self.end_time_ns = None  # Monotonic clock when the game was won or lost
+        self.clicks = 0  # Left, right and chord clicks that reached the board
+        self.bbbv = 0  # 3BV: minimum number of clicks needed to clear the board
+        self.bbbv_solved = 0
+        self.openings = 0
+        self._bbbv_group = [None] * (rows * cols)  # Flat index -> 3BV unit that revealing it solves
+        self._solved_groups = set()
+        self._bbbv_stale = False  # Mines placed but 3BV not computed yet; stats() computes it on demand
+        self._change_trackers = []  # Sets collecting the flat indices of changed cells
         self.main_window = main_window  # Reference to the MainWindow for callbacks
 
     def _create_board(self, rows, cols):
         """Creates the initial game board with empty cells."""
-        return [
-            [
-                {'mine': False, 'revealed': False, 'flagged': False, 'neighbor': 0, 'blasted': False, 'false_flagged': False}
-                for _ in range(cols)
-            ]
-            for _ in range(rows)
-        ]
+        return [[dict(EMPTY_CELL) for _ in range(cols)] for _ in range(rows)]
 
     def initialize_board(self):
         """Initializes the board (used for resetting)."""
         self.reset_board()
         self.calculate_neighbors()
 
-    def reset_board(self):
-        """Resets the board to the initial state."""
+    def reset_board(self, seed=None):
+        """Resets the board to the initial state in place, reusing the existing cell dicts.
+
+        The next game uses `seed`, or a fresh one if it is None.
+        """
+        self.seed = new_seed() if seed is None else seed
+        self.mines_placed = False
         self.game_over = False
         self.game_started = False
         self.mines_left = self.mines
-        for r in range(self.rows):
-            for c in range(self.cols):
-                self.board[r][c] = {'mine': False, 'revealed': False, 'flagged': False, 'neighbor': 0, 'blasted': False, 'false_flagged': False}
+        self.start_time_ns = None
+        self.end_time_ns = None
+        self.clicks = 0
+        self.bbbv = 0
+        self.bbbv_solved = 0
+        self.openings = 0
+        self._solved_groups.clear()
+        self._bbbv_stale = False
+        for cell in self.cells:
+            cell.update(EMPTY_CELL)
+        self.adjacent_flags[:] = self._no_flags
+        self.adjacent_hidden[:] = self._degrees
+        self.frontier.clear()
+        self.hidden_safe = self._safe_cells
+        if self._change_trackers:
+            self._mark_changed(range(self.rows * self.cols))
+
+    def add_change_tracker(self):
+        """Returns a set that collects the flat index (row * cols + col) of every cell changed from now on.
+
+        Consumers drain the set themselves; the game costs nothing extra while no tracker is registered.
+        """
+        changes = set()
+        self._change_trackers.append(changes)
+        return changes
+
+    def remove_change_tracker(self, changes):
+        if changes in self._change_trackers:
+            self._change_trackers.remove(changes)
 
+    def _mark_changed(self, indices):
+        for changes in self._change_trackers:
+            changes.update(indices)
 
+    def rebuild_queries(self):
+        """Recomputes the neighbor counts and the frontier after the cells were set directly, e.g. by a load."""
+        cells, neighbors = self.cells, self.neighbors
+        self.frontier.clear()
+        self.hidden_safe = sum(1 for cell in cells if not cell['mine'] and not cell['revealed'])
+        for i, cell in enumerate(cells):
+            self.adjacent_flags[i] = sum(1 for j in neighbors[i] if cells[j]['flagged'])
+            self.adjacent_hidden[i] = sum(1 for j in neighbors[i] if not cells[j]['revealed'])
+            if (not cell['revealed'] and not cell['flagged']
+                    and self.adjacent_hidden[i] < self._degrees[i]):
+                self.frontier.add(i)
+
+    def _note_revealed(self, indices):
+        """Updates the neighbor counts and the frontier for newly revealed cells."""
+        cells, neighbors, hidden, frontier = self.cells, self.neighbors, self.adjacent_hidden, self.frontier
+        for i in indices:
+            frontier.discard(i)
+            for j in neighbors[i]:
+                hidden[j] -= 1
+                cell = cells[j]
+                if not cell['revealed'] and not cell['flagged']:
+                    frontier.add(j)
+
+    def neighbor_indices(self, row, col):
+        """Flat indices of the cells around (row, col)."""
+        return self.neighbors[row * self.cols + col]
+
+    def hidden_neighbors(self, row, col):
+        """Flat indices of the unrevealed, unflagged cells around (row, col)."""
+        cells = self.cells
+        return [j for j in self.neighbors[row * self.cols + col] if not cells[j]['revealed'] and not cells[j]['flagged']]
+
+    def flagged_neighbors(self, row, col):
+        """Flat indices of the flagged cells around (row, col)."""
+        cells = self.cells
+        return [j for j in self.neighbors[row * self.cols + col] if cells[j]['flagged']]
+
+    def unknown_count(self, row, col):
+        """Number of unrevealed, unflagged cells around (row, col)."""
+        index = row * self.cols + col
+        return self.adjacent_hidden[index] - self.adjacent_flags[index]
+
+    def mines_unaccounted(self, row, col):
+        """Mines around a revealed number that are not flagged yet (negative if overflagged)."""
+        index = row * self.cols + col
+        return self.cells[index]['neighbor'] - self.adjacent_flags[index]
+
+    def can_chord(self, row, col):
+        """Whether a chord click on (row, col) would open its neighbors: a revealed number with as many flags around it."""
+        index = row * self.cols + col
+        cell = self.cells[index]
+        return cell['revealed'] and cell['neighbor'] > 0 and self.adjacent_flags[index] == cell['neighbor']
+
+    @profiled('place_mines', cells=board_cells)
     def place_mines(self, start_row, start_col):
-        """Places mines randomly, avoiding the starting cell."""
-        positions = [(r, c) for r in range(self.rows) for c in range(self.cols) if (r, c) != (start_row, start_col)]
-        mine_positions = random.sample(positions, self.mines)
-        for r, c in mine_positions:
-            self.board[r][c]['mine'] = True
+        """Places mines from the game's seed, avoiding the starting cell.
+
+        The same seed and starting cell always give the same board.
+        """
+        start = start_row * self.cols + start_col
+        positions = [i for i in range(self.rows * self.cols) if i != start]
+        self.set_mines(random.Random(self.seed).sample(positions, self.mines))
+
+    def set_mines(self, indices):
+        """Places mines on the given flat indices, e.g. from a shared board code."""
+        for i in indices:
+            self.cells[i]['mine'] = True
+        if self._change_trackers:
+            self._mark_changed(indices)
+        self.mines_placed = True
         self.calculate_neighbors()
+        self._bbbv_stale = True  # Headless players may never ask for it
 
+    @profiled('calculate_neighbors', cells=board_cells)
     def calculate_neighbors(self):
         """Calculates the number of neighboring mines for each cell."""
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.board[r][c]['mine']:
-                    continue
-                count = sum(
-                    1 for dr in (-1, 0, 1) for dc in (-1, 0, 1)
-                    if 0 <= r + dr < self.rows and 0 <= c + dc < self.cols and self.board[r + dr][c + dc]['mine']
-                )
-                self.board[r][c]['neighbor'] = count
+        neighbors = self.neighbors
+        counts = [0] * len(self.cells)
+        for i, cell in enumerate(self.cells):
+            if cell['mine']:
+                for j in neighbors[i]:
+                    counts[j] += 1
+        for cell, count in zip(self.cells, counts):
+            cell['neighbor'] = 0 if cell['mine'] else count
+
+    @profiled('compute_bbbv', cells=board_cells)
+    def compute_bbbv(self):
+        """Computes 3BV with a union-find over the zero cells, and the part already solved.
+
+        Each opening (8-connected zero cells plus their numbered border) counts
+        once, as does every numbered cell that does not border an opening.
+        """
+        rows, cols = self.rows, self.cols
+        cells = self.cells
+        zero = [not cell['mine'] and cell['neighbor'] == 0 for cell in cells]
+        parent = list(range(rows * cols))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]  # Path halving
+                i = parent[i]
+            return i
+
+        # Union each zero cell with the zero cells after it (right, and the three below)
+        for i, is_zero in enumerate(zero):
+            if not is_zero:
+                continue
+            for j in self.neighbors[i]:
+                if j > i and zero[j]:
+                    root_a, root_b = find(i), find(j)
+                    if root_a != root_b:
+                        parent[root_b] = root_a
+
+        # Zero cells map to their opening; numbers bordering an opening are solved by it and map to nothing
+        group = self._bbbv_group = [None] * (rows * cols)
+        bordered = [False] * (rows * cols)
+        for i, is_zero in enumerate(zero):
+            if not is_zero:
+                continue
+            group[i] = find(i)
+            for j in self.neighbors[i]:
+                bordered[j] = True
+        self.openings = len(set(group) - {None})
+
+        for i, cell in enumerate(cells):
+            if not zero[i] and not bordered[i] and not cell['mine']:
+                group[i] = i  # A numbered cell outside every opening needs its own click
+        self.bbbv = len(set(group) - {None})
+
+        self._bbbv_stale = False
+        self._solved_groups.clear()
+        self.bbbv_solved = 0
+        for i, cell in enumerate(cells):
+            if cell['revealed'] and not cell['mine']:
+                self._mark_solved(i)
+
+    def _mark_solved(self, index):
+        """Counts the 3BV unit of a newly revealed cell as solved."""
+        unit = self._bbbv_group[index]
+        if unit is not None and unit not in self._solved_groups:
+            self._solved_groups.add(unit)
+            self.bbbv_solved += 1
+
+    def stats(self):
+        """Returns the efficiency metrics of the current game."""
+        if self._bbbv_stale:
+            self.compute_bbbv()  # Also counts what the reveals so far solved
+        seconds = self.elapsed_ms() / 1000
+        return {
+            'bbbv': self.bbbv,
+            'bbbv_solved': self.bbbv_solved,
+            'openings': self.openings,
+            'clicks': self.clicks,
+            'efficiency': self.bbbv_solved / self.clicks if self.clicks else 0.0,
+            'bbbv_per_second': self.bbbv_solved / seconds if seconds else 0.0,
+        }
+
+    def _notify_board_changed(self):
+        if self.main_window:
+            self.main_window.board_changed_callback()
 
     def reveal_cell(self, row, col):
         """Reveals a cell and handles game logic."""
         if not self.game_started:
             self.game_started = True
-            self.place_mines(row, col)  # Place mines after the first click
+            self.start_time_ns = time.perf_counter_ns()
+            if not self.mines_placed:
+                self.place_mines(row, col)  # Place mines after the first click
             if self.main_window:
                 self.main_window.start_timer()
 
         if self.game_over:
             return
 
-        cell = self.board[row][col]
+        self.clicks += 1
+        if self._open_cell(row, col) and not self.game_over:
+            self.check_win_and_callback()
+        self._notify_board_changed()
+
+    @profiled('reveal_cascade', cells=lambda result, *args, **kwargs: len(result))
+    def _open_cell(self, row, col):
+        """Reveals a cell, cascading through empty regions. Returns the flat indices of the revealed cells."""
+        start = row * self.cols + col
+        cell = self.cells[start]
         if cell['revealed'] or cell['flagged']:
-            return
+            return []
 
         cell['revealed'] = True
 
         if cell['mine']:
             self.game_over = True
+            self.end_time_ns = time.perf_counter_ns()
             cell['blasted'] = True
+            self._note_revealed((start,))
+            if self._change_trackers:
+                self._mark_changed((start,))
             self.reveal_all_mines()
             if self.main_window:
                 self.main_window.game_over_callback() # Notify MainWindow
-            return
+            return [start]
 
-        if cell['neighbor'] == 0:
-            for dr in (-1, 0, 1):
-                for dc in (-1, 0, 1):
-                    nr, nc = row + dr, col + dc
-                    if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                        self.reveal_cell(nr, nc)
+        # Iterative flood fill; a cell with no neighboring mines never borders a mine
+        cells, neighbors = self.cells, self.neighbors
+        revealed = [start]
+        stack = [start] if cell['neighbor'] == 0 else []
+        while stack:
+            for j in neighbors[stack.pop()]:
+                neighbor = cells[j]
+                if neighbor['revealed'] or neighbor['flagged']:
+                    continue
+                neighbor['revealed'] = True
+                revealed.append(j)
+                if neighbor['neighbor'] == 0:
+                    stack.append(j)
 
-        self.check_win_and_callback()
+        if not self._bbbv_stale:
+            for i in revealed:
+                self._mark_solved(i)
+        self.hidden_safe -= len(revealed)
+        self._note_revealed(revealed)
+        if self._change_trackers:
+            self._mark_changed(revealed)
+        return revealed
+
+    def elapsed_ms(self):
+        """Milliseconds since the first reveal, frozen once the game is won or lost."""
+        if self.start_time_ns is None:
+            return 0
+        end = self.end_time_ns if self.end_time_ns is not None else time.perf_counter_ns()
+        return (end - self.start_time_ns) // 1_000_000
+
+    def set_elapsed_ms(self, elapsed_ms):
+        """Restores the elapsed time of a loaded game; a running game keeps counting from there."""
+        now = time.perf_counter_ns()
+        self.start_time_ns = now - elapsed_ms * 1_000_000 if self.game_started else None
+        self.end_time_ns = now if self.game_started and self.game_over else None
 
     def reveal_all_mines(self):
         """Reveals all mines and marks false flags."""
-        for r in range(self.rows):
-            for c in range(self.cols):
-                cell = self.board[r][c]
-                if cell['mine']:
-                    if not cell.get('blasted', False):
-                        cell['revealed'] = True
-                elif cell['flagged']:
-                    cell['false_flagged'] = True
+        changed = []
+        newly_revealed = []
+        for i, cell in enumerate(self.cells):
+            if cell['mine']:
+                if not cell['revealed']:
+                    cell['revealed'] = True
+                    newly_revealed.append(i)
+            elif cell['flagged']:
+                cell['false_flagged'] = True
+            else:
+                continue
+            changed.append(i)
+        self._note_revealed(newly_revealed)
+        if self._change_trackers:
+            self._mark_changed(changed)
 
     def toggle_flag(self, row, col):
         """Toggles the flag state of a cell."""
         if self.game_over or self.board[row][col]['revealed']:
             return
 
-        cell = self.board[row][col]
+        self.clicks += 1
+        index = row * self.cols + col
+        cell = self.cells[index]
         if cell['flagged']:
             cell['flagged'] = False
             self.mines_left += 1
+            self._note_flag(index, -1)
         elif self.mines_left > 0:
             cell['flagged'] = True
             self.mines_left -= 1
+            self._note_flag(index, 1)
+        if self._change_trackers:
+            self._mark_changed((index,))
 
         self.check_win_and_callback()
+        self._notify_board_changed()
 
+    def _note_flag(self, index, delta):
+        """Updates the flag counts around a cell and its place in the frontier."""
+        for j in self.neighbors[index]:
+            self.adjacent_flags[j] += delta
+        if delta > 0:
+            self.frontier.discard(index)
+        elif self.adjacent_hidden[index] < self._degrees[index]:
+            self.frontier.add(index)  # Unflagged next to a revealed cell
+
+    @profiled('check_win')
     def check_win(self):
-        """Checks if the game has been won."""
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if not self.board[r][c]['mine'] and not self.board[r][c]['revealed']:
-                    return False
-        return self.mines_left == 0
+        """Checks if the game has been won: every safe cell revealed and every flag placed."""
+        return self.hidden_safe == 0 and self.mines_left == 0
 
     def check_win_and_callback(self):
         """Checks for a win and triggers the callback if necessary."""
         if self.check_win():
             self.game_over = True
+            self.end_time_ns = time.perf_counter_ns()
             if self.main_window:
                 self.main_window.win_game_callback()  # Notify MainWindow
 
     def reveal_adjacent(self, row, col):
         """Reveals adjacent cells if the correct number of flags are placed."""
         cell = self.board[row][col]
-        if not cell['revealed'] or cell['neighbor'] == 0:
+        if self.game_over or not cell['revealed'] or cell['neighbor'] == 0:
             return
 
-        flag_count = sum(
-            1 for dr in (-1, 0, 1) for dc in (-1, 0, 1)
-            if 0 <= row + dr < self.rows and 0 <= col + dc < self.cols and self.board[row + dr][col + dc]['flagged']
-        )
+        self.clicks += 1
+        if self.can_chord(row, col):
+            for j in self.hidden_neighbors(row, col):
+                self._open_cell(*divmod(j, self.cols))
+                if self.game_over:
+                    self._notify_board_changed()
+                    return
 
-        if flag_count == cell['neighbor']:
-            for dr in (-1, 0, 1):
-                for dc in (-1, 0, 1):
-                    nr, nc = row + dr, col + dc
-                    if 0 <= nr < self.rows and 0 <= nc < self.cols and not self.board[nr][nc]['flagged']:
-                        self.reveal_cell(nr, nc)
+        self.check_win_and_callback()
+        self._notify_board_changed()
 
-        self.check_win_and_callback()
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""Exact win probabilities under optimal play, for boards small enough to enumerate.
+
+The mines are placed as `MinesweeperGame.place_mines` places them: uniformly
+among the cells other than the first click. Every such layout is held as a
+bitmask, and a visible board stands for the layouts that agree with it. A
+player wins a layout by opening all its safe cells; flagging the rest is
+then free. The number of layouts an optimal player wins from a visible
+board is the best, over the cells it could open, of the wins summed over
+what opening the cell can show. Visible boards are memoized up to the
+symmetries of the board, so positions reached in different ways, or
+mirrored, are solved once.
+"""
+import itertools
+import math
+import operator
+from game.minesweeper_game import neighbor_table
+
+HIDDEN = 255  # Visible board entry for a closed cell; open cells hold their number
+MAX_LAYOUTS = 3_000_000  # More layouts than this take too long and too much memory in Python
+
+
+def symmetries(rows, cols):
+    """The symmetries of the board as permutations of flat indices: 8 for a square, 4 otherwise."""
+    transforms = [lambda r, c: (r, c), lambda r, c: (r, cols - 1 - c),
+                  lambda r, c: (rows - 1 - r, c), lambda r, c: (rows - 1 - r, cols - 1 - c)]
+    if rows == cols:
+        transforms += [lambda r, c: (c, r), lambda r, c: (c, rows - 1 - r),
+                       lambda r, c: (cols - 1 - c, r), lambda r, c: (cols - 1 - c, rows - 1 - r)]
+    permutations = []
+    for transform in transforms:
+        permutation = [0] * (rows * cols)
+        for i in range(rows * cols):
+            r, c = transform(*divmod(i, cols))
+            permutation[i] = r * cols + c
+        permutations.append(tuple(permutation))
+    return permutations
+
+
+def first_clicks(rows, cols):
+    """{cell: cells it stands for}: one first click from each set of symmetric cells."""
+    orbits = {}
+    for i in range(rows * cols):
+        orbit = {permutation[i] for permutation in symmetries(rows, cols)}
+        orbits.setdefault(min(orbit), sorted(orbit))
+    return orbits
+
+
+def layout_count(rows, cols, mines):
+    """Number of mine layouts for one first click."""
+    return math.comb(rows * cols - 1, mines)
+
+
+class OptimalPlayer:
+    """Counts the layouts an optimal player wins on one board size; keeps its memo between first clicks."""
+    def __init__(self, rows, cols, mines):
+        if layout_count(rows, cols, mines) > MAX_LAYOUTS:
+            raise ValueError(f"{rows}x{cols} with {mines} mines has {layout_count(rows, cols, mines)} layouts "
+                             f"per first click, more than {MAX_LAYOUTS} can be enumerated")
+        self.rows, self.cols, self.mines = rows, cols, mines
+        self.neighbors = neighbor_table(rows, cols)
+        self.neighbor_masks = [sum(1 << j for j in neighbors) for neighbors in self.neighbors]
+        # Each picks the cells of a board in the order a symmetry moves them to
+        self.transforms = [operator.itemgetter(*sorted(range(rows * cols), key=permutation.__getitem__))
+                           for permutation in symmetries(rows, cols)]
+        self.memo = {}  # Canonical visible board -> layouts won
+
+    def layouts(self, start):
+        """Every mine layout with the first click on `start`, as bitmasks."""
+        cells = [i for i in range(self.rows * self.cols) if i != start]
+        return [sum(1 << i for i in combination) for combination in itertools.combinations(cells, self.mines)]
+
+    def open(self, layout, cells, board):
+        """What opening safe cells shows: ((index, number), ...) of the cells they open, cascading through zeros."""
+        neighbors, masks = self.neighbors, self.neighbor_masks
+        shown = tuple((cell, bin(layout & masks[cell]).count("1")) for cell in cells)
+        if all(number for _, number in shown):  # Nothing cascades
+            return shown
+        shown = []
+        seen = set(cells)
+        stack = list(cells)
+        while stack:
+            i = stack.pop()
+            number = bin(layout & masks[i]).count("1")
+            shown.append((i, number))
+            if number == 0:
+                for j in neighbors[i]:
+                    if board[j] == HIDDEN and j not in seen:
+                        seen.add(j)
+                        stack.append(j)
+        return tuple(shown)
+
+    def wins_after(self, board, layouts, cells):
+        """Layouts won by opening `cells` now and playing optimally after: one cell, or only certainly safe ones."""
+        outcomes = {}
+        bits = sum(1 << cell for cell in cells)
+        for layout in layouts:
+            if not layout & bits:
+                outcomes.setdefault(self.open(layout, cells, board), []).append(layout)
+        wins = 0
+        for shown, matching in outcomes.items():
+            after = bytearray(board)
+            for i, number in shown:
+                after[i] = number
+            wins += self.wins(after, matching)
+        return wins
+
+    def wins(self, board, layouts):
+        """Layouts won from a visible board by an optimal player; `layouts` are those that agree with it."""
+        key = min(bytes(transform(board)) for transform in self.transforms)
+        wins = self.memo.get(key)
+        if wins is not None:
+            return wins
+        hidden = [i for i, value in enumerate(board) if value == HIDDEN]
+        anywhere = always = layouts[0]
+        for layout in layouts:
+            anywhere |= layout
+            always &= layout
+        safe = [i for i in hidden if not anywhere >> i & 1]
+        if len(hidden) == self.mines:
+            wins = len(layouts)  # Only mines are left
+        elif safe:  # Opening certainly safe cells never loses anything
+            wins = self.wins_after(board, layouts, safe)
+        else:
+            mines_on = {i: sum(layout >> i & 1 for layout in layouts) for i in hidden if not always >> i & 1}
+            wins = 0
+            for cell in sorted(mines_on, key=mines_on.get):
+                if len(layouts) - mines_on[cell] <= wins:  # No later cell can do better
+                    break
+                wins = max(wins, self.wins_after(board, layouts, (cell,)))
+        self.memo[key] = wins
+        return wins
+
+    def first_click_wins(self, start):
+        """Layouts won with the first click on `start`, out of `layout_count` of them."""
+        return self.wins_after(bytearray([HIDDEN]) * (self.rows * self.cols), self.layouts(start), (start,))
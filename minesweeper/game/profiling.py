@@ -0,0 +1,184 @@
+import functools
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class ProfileRecord:
+    """A single timed game action."""
+    __slots__ = ('name', 'elapsed_ns', 'cells', 'timestamp_ns')
+
+    def __init__(self, name, elapsed_ns, cells, timestamp_ns):
+        self.name = name
+        self.elapsed_ns = elapsed_ns
+        self.cells = cells
+        self.timestamp_ns = timestamp_ns
+
+    def to_dict(self):
+        return {'name': self.name, 'elapsed_ns': self.elapsed_ns, 'cells': self.cells, 'timestamp_ns': self.timestamp_ns}
+
+
+class StdoutSink:
+    """Prints a per-action summary (calls, cells touched, wall time)."""
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def open(self):
+        pass
+
+    def write(self, records):
+        summary = {}
+        for record in records:
+            calls, cells, elapsed = summary.get(record.name, (0, 0, 0))
+            summary[record.name] = (calls + 1, cells + record.cells, elapsed + record.elapsed_ns)
+
+        self.stream.write(f"{'action':<22}{'calls':>8}{'cells':>10}{'total ms':>12}{'mean us':>10}\n")
+        for name, (calls, cells, elapsed) in sorted(summary.items()):
+            self.stream.write(f"{name:<22}{calls:>8}{cells:>10}{elapsed / 1e6:>12.3f}{elapsed / calls / 1e3:>10.1f}\n")
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    """Appends one JSON object per record to a file."""
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def open(self):
+        self.file = open(self.path, 'a')
+
+    def write(self, records):
+        import json  # Sinks are optional, keep their imports off the startup path
+
+        if self.file is None:
+            self.open()
+        for record in records:
+            self.file.write(json.dumps(record.to_dict()) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class PstatsSink:
+    """Runs cProfile while profiling is enabled and dumps pstats data on close."""
+    def __init__(self, path):
+        self.path = path
+        self.profile = None
+
+    def open(self):
+        import cProfile
+
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def write(self, records):
+        pass  # cProfile collects its own data
+
+    def close(self):
+        if self.profile:
+            self.profile.disable()
+            self.profile.dump_stats(self.path)
+            self.profile = None
+
+
+class Profiler:
+    """Collects timed game actions into a fixed-size ring buffer and forwards them to sinks."""
+    def __init__(self, capacity=8192):
+        self.enabled = False
+        self.records = deque(maxlen=capacity)  # record() flushes it to the sinks when full, so nothing is dropped
+        self.sinks = []
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        if self.enabled:
+            sink.open()
+
+    def enable(self):
+        """Starts recording; sinks are opened here so cProfile only covers the enabled window."""
+        if not self.enabled:
+            self.enabled = True
+            for sink in self.sinks:
+                sink.open()
+
+    def disable(self):
+        """Stops recording, flushes the buffer and closes all sinks."""
+        if self.enabled:
+            self.flush()
+            self.enabled = False
+            for sink in self.sinks:
+                sink.close()
+
+    def record(self, name, elapsed_ns, cells=0):
+        if len(self.records) == self.records.maxlen:
+            self.flush()  # Hand a full buffer to the sinks instead of overwriting it
+        self.records.append(ProfileRecord(name, elapsed_ns, cells, time.perf_counter_ns()))
+
+    def flush(self):
+        """Writes the buffered records to every sink and clears the buffer."""
+        records = list(self.records)
+        self.records.clear()
+        if records:
+            for sink in self.sinks:
+                sink.write(records)
+
+    @contextmanager
+    def measure(self, name, cells=0):
+        """Times the enclosed block. Does nothing when profiling is disabled."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - start, cells)
+
+
+profiler = Profiler()  # Shared by the game, the GUI and headless benchmarks
+
+
+def profiled(name, cells=None):
+    """Decorator that records a call to the wrapped function.
+
+    `cells` is an optional callable receiving (result, *args, **kwargs) and
+    returning the number of cells the call touched.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter_ns() - start
+            profiler.record(name, elapsed, cells(result, *args, **kwargs) if cells else 0)
+            return result
+        return wrapper
+    return decorator
+
+
+def board_cells(result, game, *args, **kwargs):
+    """Cell count for actions that walk the whole board."""
+    return game.rows * game.cols
+
+
+def configure(spec):
+    """Enables profiling from a comma separated sink list, e.g. "stdout,jsonl:run.jsonl,pstats:run.prof"."""
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        kind, _, path = entry.partition(':')
+        if kind == 'stdout':
+            profiler.add_sink(StdoutSink())
+        elif kind == 'jsonl':
+            profiler.add_sink(JsonLinesSink(path or 'profile.jsonl'))
+        elif kind == 'pstats':
+            profiler.add_sink(PstatsSink(path or 'profile.prof'))
+        else:
+            raise ValueError(f"Unknown profiling sink: {kind}")
+    profiler.enable()
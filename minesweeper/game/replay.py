@@ -0,0 +1,168 @@
+"""Replay logs: a board and the timed actions played on it.
+
+The engine is deterministic, so a replay is enough to play a game again
+and check what a player claims about it:
+
+    {"version": 1, "player": "alice", "board": "16x30x99-m...",
+     "actions": [[0, 0, 8, 15], [412, 1, 7, 14], ...],
+     "won": true, "time_ms": 48213}
+
+`board` is a code of `game.board_code`; each action is [milliseconds since
+the first action, action, row, col] with the actions of `game.automation`.
+The time of a game runs from its first reveal to its last action.
+"""
+import json
+import time
+from game.automation import GameEnv, REVEAL, FLAG, CHORD
+from game.board_code import parse_board_code
+from game.minesweeper_game import MinesweeperGame
+
+REPLAY_VERSION = 1
+ACTION_WORDS = {REVEAL: 'reveal', FLAG: 'flag', CHORD: 'chord'}
+HUMAN_LIMITS = (20, 20)  # Minimum milliseconds between inputs, most inputs in any one second
+
+
+class ReplayError(ValueError):
+    """A replay is malformed or does not match what replaying it gives."""
+
+
+class ReplayRecorder:
+    """Applies actions to a GameEnv and records them, timed by the wall clock or by the caller."""
+    def __init__(self, env, board, player):
+        self.env = env
+        self.board = board
+        self.player = player
+        self.actions = []
+        self.start_ns = None
+
+    def apply(self, action, row, col, time_ms=None):
+        """Applies one action and returns the changed cells, as `GameEnv.apply_actions` does."""
+        if time_ms is None:
+            now = time.perf_counter_ns()
+            if self.start_ns is None:
+                self.start_ns = now
+            time_ms = (now - self.start_ns) // 1_000_000
+        self.actions.append([time_ms, action, row, col])
+        return self.env.apply_actions(((action, row, col),))
+
+    def replay(self):
+        return {"version": REPLAY_VERSION, "player": self.player, "board": self.board, "actions": self.actions,
+                "won": self.env.won, "time_ms": game_time(self.actions)}
+
+
+def game_time(actions):
+    """Milliseconds from the first reveal to the last action."""
+    for time_ms, action, _, _ in actions:
+        if action == REVEAL:
+            return actions[-1][0] - time_ms
+    return 0
+
+
+def prepare_env(board, envs=None):
+    """Returns a GameEnv ready to play the board of a code, reusing one of `envs` (keyed by size) if given."""
+    rows, cols, mines, seed, indices = parse_board_code(board)
+    env = envs.get((rows, cols, mines)) if envs is not None else None
+    if env is None:
+        env = GameEnv(rows, cols, mines)
+        if envs is not None:
+            envs[(rows, cols, mines)] = env
+    env.reset(seed)
+    if indices is not None:
+        env.game.set_mines(indices)
+    return env
+
+
+def prepare_game(board, games=None):
+    """Returns a freshly seeded MinesweeperGame for the board of a code, reusing one of `games` if given."""
+    rows, cols, mines, seed, indices = parse_board_code(board)
+    game = games.get((rows, cols, mines)) if games is not None else None
+    if game is None:
+        game = MinesweeperGame(rows, cols, mines, seed=seed)
+        if games is not None:
+            games[(rows, cols, mines)] = game
+    else:
+        game.reset_board(seed)
+    if indices is not None:
+        game.set_mines(indices)
+    return game
+
+
+def verify_replay(replay, games=None, limits=None):
+    """Plays a replay again and returns its result; raises ReplayError if it is malformed, cheats or lies.
+
+    Rejects actions no input could make (opening a revealed or flagged cell, flagging a revealed one,
+    chording a hidden one) and, with `limits`, inputs faster than (min_interval_ms, max_actions_per_second).
+    Runs on the game alone, without observation codes or Qt. The result has the player, board, outcome,
+    time, 3BV, clicks, efficiency and 3BV/s.
+    """
+    try:
+        if replay.get("version") != REPLAY_VERSION:
+            raise ReplayError(f"Unsupported replay version {replay.get('version')!r}")
+        game = prepare_game(replay["board"], games)
+        actions = replay["actions"]
+        won, time_ms = replay["won"], replay["time_ms"]
+        if not actions:
+            raise ReplayError("Replay has no actions")
+        if limits:
+            check_limits(actions, *limits)
+        rows, cols, cells = game.rows, game.cols, game.cells
+        handlers = (game.reveal_cell, game.toggle_flag, game.reveal_adjacent)
+        last_time = 0
+        for number, (action_ms, action, row, col) in enumerate(actions):
+            if game.game_over:
+                raise ReplayError(f"Action {number} comes after the end of the game")
+            if action_ms < last_time:
+                raise ReplayError(f"Action {number} is earlier than the one before it")
+            last_time = action_ms
+            if not (0 <= row < rows and 0 <= col < cols) or action not in (REVEAL, FLAG, CHORD):
+                raise ReplayError(f"Action {number} is not a valid input: {[action, row, col]}")
+            cell = cells[row * cols + col]
+            if cell['revealed'] == (action != CHORD) or (action == REVEAL and cell['flagged']):
+                raise ReplayError(f"Action {number} ({ACTION_WORDS[action]} {row},{col}) "
+                                  f"is not possible on a {'revealed' if cell['revealed'] else 'hidden'} cell")
+            handlers[action](row, col)
+    except ReplayError:
+        raise
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ReplayError(f"Malformed replay: {e!r}")
+
+    won_game = game.game_over and game.check_win()
+    if not game.game_over:
+        raise ReplayError("The game does not end with the last action")
+    if won_game != won:
+        raise ReplayError(f"Replay claims a {'win' if won else 'loss'} but the game was {'won' if won_game else 'lost'}")
+    if game_time(actions) != time_ms:
+        raise ReplayError(f"Replay claims {time_ms} ms but its actions take {game_time(actions)} ms")
+
+    stats = game.stats()
+    return {
+        "player": replay.get("player"),
+        "board": replay["board"],
+        "won": won,
+        "time_ms": time_ms,
+        "bbbv": stats['bbbv'],
+        "bbbv_solved": stats['bbbv_solved'],
+        "clicks": stats['clicks'],
+        "efficiency": stats['efficiency'],
+        "bbbv_per_second": stats['bbbv_solved'] * 1000 / time_ms if time_ms else 0.0,
+    }
+
+
+def check_limits(actions, min_interval_ms, max_actions_per_second):
+    """Raises ReplayError for inputs closer together, or more of them in any second, than a person can make."""
+    times = [action[0] for action in actions]
+    for number in range(1, len(times)):
+        if times[number] - times[number - 1] < min_interval_ms:
+            raise ReplayError(f"Action {number} follows the one before it after "
+                              f"{times[number] - times[number - 1]} ms (at least {min_interval_ms} ms)")
+        if number >= max_actions_per_second and times[number] - times[number - max_actions_per_second] < 1000:
+            raise ReplayError(f"Actions {number - max_actions_per_second} to {number} take less than a second "
+                              f"(at most {max_actions_per_second} per second)")
+
+
+def load_replays(path):
+    """Reads the replays of a file: one JSON replay, or one per line for .jsonl files."""
+    with open(path) as f:
+        if str(path).endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return [json.load(f)]
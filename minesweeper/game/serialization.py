@@ -0,0 +1,119 @@
+import json
+import lzma
+import os
+import tempfile
+import zlib
+from game.minesweeper_game import MinesweeperGame
+
+FORMAT_VERSION = 2
+CELL_FLAGS = (('mine', 1), ('revealed', 2), ('flagged', 4), ('blasted', 8), ('false_flagged', 16))
+CELL_DIGITS = "0123456789abcdefghijklmnopqrstuv"  # One character per cell holds all five flags
+COMPRESSIONS = {None: (lambda data: data), 'zlib': zlib.compress, 'lzma': lzma.compress}
+EXTENSION_COMPRESSION = {'.z': 'zlib', '.xz': 'lzma'}
+
+
+def encode_cell(cell):
+    bits = 0
+    for key, bit in CELL_FLAGS:
+        if cell.get(key, False):
+            bits |= bit
+    return CELL_DIGITS[bits]
+
+
+def decode_cell(symbol):
+    bits = CELL_DIGITS.index(symbol)
+    cell = {key: bool(bits & bit) for key, bit in CELL_FLAGS}
+    cell['neighbor'] = 0  # Recalculated from the mines
+    return cell
+
+
+def decode_legacy_cell(symbol):
+    """Decodes the version 1 symbols ("M", "R", "F", "N<n>", "E")."""
+    return {'mine': symbol == "M", 'revealed': symbol == "R", 'flagged': symbol == "F",
+            'neighbor': 0, 'blasted': False, 'false_flagged': False}
+
+
+def encode_game(game, **extra):
+    """Returns a JSON-serializable snapshot of the game. Cheap enough to take on the UI thread."""
+    state = {
+        "version": FORMAT_VERSION,
+        "rows": game.rows,
+        "cols": game.cols,
+        "mines": game.mines,
+        "board": ["".join(encode_cell(cell) for cell in row) for row in game.board],
+        "game_over": game.game_over,
+        "game_started": game.game_started,
+        "mines_left": game.mines_left,
+        "clicks": game.clicks,
+        "seed": game.seed,
+        "elapsed_time": game.elapsed_ms() // 1000,
+        "elapsed_ms": game.elapsed_ms(),
+    }
+    state.update(extra)
+    return state
+
+
+def decode_game(state, main_window=None):
+    """Builds a MinesweeperGame from a snapshot made by encode_game or by the original JSON export."""
+    game = MinesweeperGame(state["rows"], state["cols"], state["mines"], main_window, state.get("seed"))
+    if state.get("version", 1) >= 2:
+        board = [[decode_cell(symbol) for symbol in row] for row in state["board"]]
+    else:
+        board = [[decode_legacy_cell(symbol) for symbol in row] for row in state["board"]]
+    for row, decoded_row in zip(game.board, board):
+        for cell, decoded in zip(row, decoded_row):
+            cell.update(decoded)  # Keep the game's own cell dicts
+
+    game.calculate_neighbors()  # Recalculate
+    game.rebuild_queries()
+    game.mines_placed = any(cell['mine'] for row in game.board for cell in row)
+    game.game_over = state["game_over"]
+    game.game_started = state.get("game_started", False)  # Default
+    game.mines_left = state.get("mines_left", game.mines)
+    if game.mines_placed:
+        game.compute_bbbv()  # Also counts the 3BV already solved
+    game.clicks = state.get("clicks", 0)
+    # Saves before millisecond timing only have whole seconds
+    game.set_elapsed_ms(state.get("elapsed_ms", state.get("elapsed_time", 0) * 1000))
+    return game
+
+
+def compression_for_path(path):
+    """Picks the compression from the file extension: .z for zlib, .xz for lzma, none otherwise."""
+    return EXTENSION_COMPRESSION.get(os.path.splitext(str(path))[1].lower())
+
+
+def dumps(state, compression=None):
+    """Serializes a snapshot to bytes, optionally compressed."""
+    return COMPRESSIONS[compression](json.dumps(state, separators=(',', ':')).encode())
+
+
+def loads(data):
+    """Parses bytes written by dumps, detecting the compression from the header."""
+    if data.startswith(b'\xfd7zXZ\x00'):
+        data = lzma.decompress(data)
+    elif data[:1] == b'\x78':  # zlib header; JSON text never starts with "x"
+        data = zlib.decompress(data)
+    return json.loads(data)
+
+
+def save(path, state, compression=None):
+    """Writes a snapshot atomically: a temporary file in the same directory is renamed over `path`."""
+    data = dumps(state, compression)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".minesweeper-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load(path):
+    """Reads a snapshot written by save or by the original JSON export."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -0,0 +1,308 @@
+"""Mine probabilities and safe cells from what the player can see.
+
+Works on a snapshot of observation codes (see `game.automation`), so it can
+run on another thread while the game goes on. Hidden cells next to
+revealed numbers form the frontier, which splits into components that
+share no number. Each component's mine layouts are enumerated on their
+own, and the components are combined with the hidden cells away from the
+frontier by counting the ways the remaining mines can be spread.
+"""
+import math
+from game.automation import visible_code, HIDDEN, FLAGGED
+from game.minesweeper_game import neighbor_table
+
+MAX_SEARCH_NODES = 200_000  # Per component; a larger search falls back to an estimate
+MAX_EXACT_CELLS = 400  # Larger components are estimated without searching
+CANCEL_CHECK_NODES = 1024  # How often a search asks whether it should give up
+ESTIMATE_SCALE = 1000  # Estimated probabilities are kept as integer tallies out of this many layouts
+
+
+class Cancelled(Exception):
+    """The board changed while it was being analysed."""
+
+
+class _SearchTooLarge(Exception):
+    pass
+
+
+def board_snapshot(game):
+    """The visible state of a game as an immutable grid of observation codes."""
+    return bytes(visible_code(cell) for cell in game.cells)
+
+
+def frontier_components(grid, rows, cols):
+    """Groups the constraints of the revealed numbers into independent components.
+
+    Returns a list of (cells, constraints): the frontier cells of the component and its (cells, mines)
+    constraints, each saying how many of those hidden cells are mines. Returns None if the flags around
+    a number contradict it.
+    """
+    neighbors = neighbor_table(rows, cols)
+    constraints = []
+    parent = {}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, code in enumerate(grid):
+        if code > 8:
+            continue
+        hidden = []
+        mines = code
+        for j in neighbors[i]:
+            if grid[j] == HIDDEN:
+                hidden.append(j)
+            elif grid[j] == FLAGGED:
+                mines -= 1
+        if not hidden:
+            continue
+        if not 0 <= mines <= len(hidden):
+            return None
+        constraints.append((tuple(hidden), mines))
+        for j in hidden:
+            parent.setdefault(j, j)
+        root = find(hidden[0])
+        for j in hidden[1:]:
+            other = find(j)
+            if other != root:
+                parent[other] = root
+
+    components = {}
+    for constraint in constraints:
+        cells, constraint_list = components.setdefault(find(constraint[0][0]), (set(), []))
+        cells.update(constraint[0])
+        constraint_list.append(constraint)
+    return [(sorted(cells), constraint_list) for cells, constraint_list in components.values()]
+
+
+def solve_component(cells, constraints, cancelled=None):
+    """Counts the mine layouts of a component.
+
+    Cells that belong to the same constraints are interchangeable, so they are enumerated together: a
+    group of s cells holding m mines stands for comb(s, m) layouts. Returns (counts, tallies): counts[k]
+    layouts have k mines, and tallies[k][n] of them have a mine on cells[n]. Returns None if the
+    component is too large to enumerate.
+    """
+    if len(cells) > MAX_EXACT_CELLS:
+        return None
+    local = {cell: n for n, cell in enumerate(cells)}
+    targets = [mines for _, mines in constraints]
+    members = [[local[cell] for cell in constraint_cells] for constraint_cells, _ in constraints]
+    cell_constraints = [[] for _ in cells]
+    for c, member_cells in enumerate(members):
+        for n in member_cells:
+            cell_constraints[n].append(c)
+
+    # Visit cells in breadth-first order over shared constraints, so constraints close early
+    order = []
+    seen = [False] * len(cells)
+    for start in range(len(cells)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        queue = [start]
+        for n in queue:
+            order.append(n)
+            for c in cell_constraints[n]:
+                for m in members[c]:
+                    if not seen[m]:
+                        seen[m] = True
+                        queue.append(m)
+
+    groups = {}  # Constraints of a cell -> the cells with exactly those constraints, in visiting order
+    for n in order:
+        groups.setdefault(tuple(cell_constraints[n]), []).append(n)
+    groups = list(groups.items())
+    ways = [[math.comb(len(group_cells), m) for m in range(len(group_cells) + 1)] for _, group_cells in groups]
+
+    placed = [0] * len(constraints)  # Mines assigned in each constraint
+    open_cells = [len(member_cells) for member_cells in members]  # Cells not yet assigned in each
+    assignment = [0] * len(groups)  # Mines in each group
+    counts = {}
+    tallies = {}
+    nodes = 0
+
+    def search(depth, mines, layouts):
+        nonlocal nodes
+        nodes += 1
+        if nodes % CANCEL_CHECK_NODES == 0:
+            if nodes > MAX_SEARCH_NODES:
+                raise _SearchTooLarge
+            if cancelled is not None and cancelled():
+                raise Cancelled
+        if depth == len(groups):
+            counts[mines] = counts.get(mines, 0) + layouts
+            tally = tallies.get(mines)
+            if tally is None:
+                tally = tallies[mines] = [0] * len(cells)
+            for (_, group_cells), group_mines in zip(groups, assignment):
+                if group_mines:
+                    share = layouts * group_mines // len(group_cells)  # Layouts with a mine on any one cell
+                    for n in group_cells:
+                        tally[n] += share
+            return
+        group_constraints, group_cells = groups[depth]
+        size = len(group_cells)
+        for c in group_constraints:
+            open_cells[c] -= size
+        for mine in range(size + 1):
+            for c in group_constraints:
+                if placed[c] + mine > targets[c] or placed[c] + mine + open_cells[c] < targets[c]:
+                    break
+            else:
+                for c in group_constraints:
+                    placed[c] += mine
+                assignment[depth] = mine
+                search(depth + 1, mines + mine, layouts * ways[depth][mine])
+                for c in group_constraints:
+                    placed[c] -= mine
+        for c in group_constraints:
+            open_cells[c] += size
+        assignment[depth] = 0
+
+    try:
+        search(0, 0, 1)
+    except _SearchTooLarge:
+        return None
+    return counts, tallies
+
+
+def estimate_component(cells, constraints, low, high):
+    """A rough stand-in for a component too large to enumerate, from the mean density of each cell's constraints.
+
+    The estimated number of mines is kept between `low` and `high`, the counts the rest of the board allows.
+    Only cells that every layout agrees on get a probability of 0 or 1.
+    """
+    densities = {}
+    for constraint_cells, mines in constraints:
+        for cell in constraint_cells:
+            densities.setdefault(cell, []).append(mines / len(constraint_cells))
+    density = {cell: sum(values) / len(values) for cell, values in densities.items()}
+    total = sum(density.values())
+    expected = min(max(round(total), low, 0), high, len(cells))
+    scale = expected / total if total else 0.0
+    tally = []
+    for cell in cells:
+        if max(densities[cell]) == 1:
+            tally.append(ESTIMATE_SCALE)
+        elif min(densities[cell]) == 0:
+            tally.append(0)
+        else:
+            tally.append(min(max(round(density[cell] * scale * ESTIMATE_SCALE), 1), ESTIMATE_SCALE - 1))
+    return {expected: ESTIMATE_SCALE}, {expected: tally}
+
+
+def mine_probabilities(grid, rows, cols, mines, cancelled=None, cache=None, components=None):
+    """Returns {index: probability of a mine} for every hidden cell, or None if the board is contradictory.
+
+    Flagged cells count as mines. `cancelled`, if given, is called now and then; once it returns True
+    the analysis raises Cancelled. `cache`, a dict kept between calls, holds the solved components of
+    the last call, so that only the components an action changed are enumerated again. `components`
+    saves working out the `frontier_components` of the grid again when the caller has them.
+    """
+    if components is None:
+        components = frontier_components(grid, rows, cols)
+    if components is None:
+        return None
+    remaining = mines - grid.count(FLAGGED)
+    frontier = set()
+    solved = []
+    estimated = []
+    used = set()
+    for cells, constraints in components:
+        frontier.update(cells)
+        if cache is None:
+            solution = solve_component(cells, constraints, cancelled)
+        else:
+            key = tuple(sorted(constraints))  # The constraints determine the cells and the layouts
+            used.add(key)
+            if key in cache:
+                solution = cache[key]
+            else:
+                solution = cache[key] = solve_component(cells, constraints, cancelled)
+        if solution is None:
+            estimated.append((cells, constraints))
+        else:
+            solved.append((cells, *solution))
+    if cache is not None:
+        for key in list(cache):
+            if key not in used:
+                cache.pop(key, None)  # Another analysis may share the cache; every entry stays valid for its key
+    interior = [i for i, code in enumerate(grid) if code == HIDDEN and i not in frontier]
+    fewest = sum(min(counts) for _, counts, _ in solved if counts)
+    most = sum(max(counts) for _, counts, _ in solved if counts) + len(interior)
+    most += sum(len(cells) for cells, _ in estimated)
+    for cells, constraints in estimated:  # Estimates get whatever mine count the rest of the board leaves room for
+        most -= len(cells)
+        solution = estimate_component(cells, constraints, remaining - fewest - most,
+                                      remaining - fewest - min(len(interior), 1))
+        fewest += min(solution[0])
+        most += max(solution[0])
+        solved.append((cells, *solution))
+    return combine(solved, interior, remaining)
+
+
+def combine(solved, interior, remaining):
+    """Weighs each component's layouts by the ways the other mines fit elsewhere and returns the probabilities."""
+    ways_inside = {}
+
+    def interior_ways(count):  # Ways to put `count` mines on the interior cells
+        if count < 0 or count > len(interior):
+            return 0
+        if count not in ways_inside:
+            ways_inside[count] = math.comb(len(interior), count)
+        return ways_inside[count]
+
+    def multiply(a, b):
+        product = {}
+        for i, x in a.items():
+            for j, y in b.items():
+                product[i + j] = product.get(i + j, 0) + x * y
+        return product
+
+    # prefix[i] combines the components before i, suffix[i] those from i on
+    prefix = [{0: 1}]
+    for _, counts, _ in solved:
+        prefix.append(multiply(prefix[-1], counts))
+    suffix = [{0: 1}]
+    for _, counts, _ in reversed(solved):
+        suffix.append(multiply(suffix[-1], counts))
+    suffix.reverse()
+
+    total = sum(ways * interior_ways(remaining - k) for k, ways in prefix[-1].items())
+    if total == 0:
+        return None
+
+    probabilities = {}
+    for i, (cells, counts, tallies) in enumerate(solved):
+        others = multiply(prefix[i], suffix[i + 1])
+        for k, tally in tallies.items():
+            weight = sum(ways * interior_ways(remaining - k - s) for s, ways in others.items())
+            if not weight:
+                continue
+            for cell, mines in zip(cells, tally):
+                probabilities[cell] = probabilities.get(cell, 0) + mines * weight
+        for cell in cells:
+            probabilities[cell] = probabilities.get(cell, 0) / total
+
+    if interior:
+        expected = sum(ways * interior_ways(remaining - k) * (remaining - k) for k, ways in prefix[-1].items())
+        probability = expected / total / len(interior)
+        for cell in interior:
+            probabilities[cell] = probability
+    return probabilities
+
+
+def find_hint(grid, rows, cols, mines, cancelled=None):
+    """Returns (index, probability of a mine) for a safe cell, or the least risky one if none is safe.
+
+    Returns None when there is no hidden cell or the board is contradictory.
+    """
+    probabilities = mine_probabilities(grid, rows, cols, mines, cancelled)
+    if not probabilities:
+        return None
+    index = min(probabilities, key=lambda cell: (probabilities[cell], cell))
+    return index, probabilities[index]
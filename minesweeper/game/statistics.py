@@ -0,0 +1,125 @@
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    difficulty TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    time_ms INTEGER NOT NULL,
+    bbbv INTEGER,
+    clicks INTEGER,
+    efficiency REAL,
+    seed INTEGER
+);
+-- Best times and percentiles walk this index in time order without sorting
+CREATE INDEX IF NOT EXISTS games_by_time ON games (difficulty, won, time_ms);
+-- Rolling win rates read the most recent games straight from this covering index
+CREATE INDEX IF NOT EXISTS games_by_recency ON games (difficulty, finished_at, won);
+"""
+
+INSERT = """
+INSERT INTO games (finished_at, difficulty, rows, cols, mines, won, time_ms, bbbv, clicks, efficiency, seed)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_CLOSE = object()  # Tells the writer thread to stop
+
+
+class StatisticsStore:
+    """Records finished games in SQLite.
+
+    `record` only enqueues; a background thread writes queued results in
+    batches, so callers on the UI thread never wait on the disk.
+    """
+    def __init__(self, path, batch_size=500, flush_interval=1.0):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.reader = self._connect()
+        self.reader.executescript(SCHEMA)
+        self.writer = threading.Thread(target=self._write_loop, name="statistics-writer", daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")  # Readers are not blocked by the writer
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record(self, difficulty, rows, cols, mines, won, time_ms, bbbv=None, clicks=None, seed=None, efficiency=None):
+        """Queues a finished game for writing. Never blocks."""
+        if efficiency is None and bbbv is not None and clicks:
+            efficiency = bbbv / clicks
+        self.queue.put((time.time(), difficulty, rows, cols, mines, int(won), time_ms, bbbv, clicks, efficiency, seed))
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            batch = [self.queue.get()]
+            # Collect whatever else arrives shortly after, up to a full batch
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not _CLOSE and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            rows = [row for row in batch if row is not _CLOSE]
+            if rows:
+                with connection:
+                    connection.executemany(INSERT, rows)
+            for _ in batch:
+                self.queue.task_done()
+            if batch[-1] is _CLOSE:
+                connection.close()
+                return
+
+    def flush(self):
+        """Blocks until every queued result has been written."""
+        self.queue.join()
+
+    def close(self):
+        """Writes the remaining results and stops the writer thread."""
+        if self.writer.is_alive():
+            self.queue.put(_CLOSE)
+            self.writer.join()
+        self.reader.close()
+
+    def best_times(self, difficulty, limit=10):
+        """Returns the fastest wins as (time_ms, bbbv, efficiency, finished_at) rows."""
+        return self.reader.execute(
+            "SELECT time_ms, bbbv, efficiency, finished_at FROM games"
+            " WHERE difficulty = ? AND won = 1 ORDER BY time_ms LIMIT ?",
+            (difficulty, limit)).fetchall()
+
+    def percentile(self, difficulty, percent):
+        """Returns the winning time in ms at the given percentile (0-100), or None without wins."""
+        count = self.reader.execute(
+            "SELECT COUNT(*) FROM games WHERE difficulty = ? AND won = 1", (difficulty,)).fetchone()[0]
+        if not count:
+            return None
+        offset = min(count - 1, int(round(percent / 100 * (count - 1))))
+        return self.reader.execute(
+            "SELECT time_ms FROM games WHERE difficulty = ? AND won = 1 ORDER BY time_ms LIMIT 1 OFFSET ?",
+            (difficulty, offset)).fetchone()[0]
+
+    def win_rate(self, difficulty, last=100):
+        """Returns the fraction of the most recent `last` games that were won, or None without games."""
+        return self.reader.execute(
+            "SELECT AVG(won) FROM (SELECT won FROM games WHERE difficulty = ?"
+            " ORDER BY finished_at DESC LIMIT ?)",
+            (difficulty, last)).fetchone()[0]
+
+    def summary(self, difficulty):
+        """Returns (games played, games won) for a difficulty."""
+        played, won = self.reader.execute(
+            "SELECT COUNT(*), TOTAL(won) FROM games WHERE difficulty = ?", (difficulty,)).fetchone()
+        return played, int(won)
@@ -1,7 +1,33 @@
-import os
-from pathlib import Path
-from PyQt6 import QtWidgets, QtGui, QtCore, QtSvg
+from PyQt6 import QtWidgets, QtGui, QtCore
 from game.minesweeper_game import MinesweeperGame  # Import MinesweeperGame
+from game.automation import HIDDEN
+from gui.resources import LazyRenderers
+
+CELL_FILES = {
+    'unrevealed': "resources/svg/cells/cellup.svg",
+    'flag': "resources/svg/cells/cellflag.svg",
+    'mine': "resources/svg/cells/cellmine.svg",
+    'empty': "resources/svg/cells/celldown.svg",
+    'blast': "resources/svg/cells/blast.svg",
+    'falsemine': "resources/svg/cells/falsemine.svg",
+    **{str(i): f"resources/svg/cells/cell{i}.svg" for i in range(1, 9)},
+}
+
+HINT_SAFE_COLOR = QtGui.QColor(0, 200, 0, 110)
+HINT_RISKY_COLOR = QtGui.QColor(255, 140, 0, 110)
+HEATMAP_ALPHA = 120
+HEATMAP_STEPS = 100
+
+
+def heat_color(probability):
+    """Green for a safe cell through yellow to red for a mine, as premultiplied BGRA bytes."""
+    red = min(1.0, 2 * probability)
+    green = min(1.0, 2 * (1 - probability))
+    return bytes((0, round(green * HEATMAP_ALPHA), round(red * HEATMAP_ALPHA), HEATMAP_ALPHA))
+
+
+HEATMAP_PALETTE = [heat_color(step / HEATMAP_STEPS) for step in range(HEATMAP_STEPS + 1)]
+CLEAR_PIXEL = bytes(4)
 
 class MinesweeperWidget(QtWidgets.QWidget):
     def __init__(self, game: MinesweeperGame, cell_size=32, parent=None):
@@ -14,61 +40,57 @@ class MinesweeperWidget(QtWidgets.QWidget):
         self.setMouseTracking(True)
         self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
         self.temp_revealed_cells = []
+        self.hint = None  # (index, probability of a mine) of the highlighted cell
+        self.probabilities = None  # Mine probabilities shown by the heatmap, and the heatmap itself
+        self.heatmap = None
         self.parent_window = parent  # Store MainWindow reference
         self.set_cell_size(self.cell_size) # Use set_cell_size for fixed sizing
 
-    def load_svg_renderer(self, relative_path):
-        """Loads an SVG renderer from the given path."""
-        # Use pathlib.Path for robust path handling
-        base_path = Path(__file__).resolve().parent.parent.parent  # Key change!
-        full_path = base_path / relative_path
-
-        if not full_path.exists():
-            print(f"Error: {full_path} does not exist.")
-            return None
-        return QtSvg.QSvgRenderer(str(full_path))
-
     def load_resources(self):
-        """Loads SVG resources for the cells."""
-        self.renderers = {}
-        self.renderers['unrevealed'] = self.load_svg_renderer("resources/svg/cells/cellup.svg")
-        self.renderers['flag'] = self.load_svg_renderer("resources/svg/cells/cellflag.svg")
-        self.renderers['mine'] = self.load_svg_renderer("resources/svg/cells/cellmine.svg")
-        self.renderers['empty'] = self.load_svg_renderer("resources/svg/cells/celldown.svg")
-        self.renderers['blast'] = self.load_svg_renderer("resources/svg/cells/blast.svg")
-        self.renderers['falsemine'] = self.load_svg_renderer("resources/svg/cells/falsemine.svg")
-        for i in range(1, 9):
-            self.renderers[str(i)] = self.load_svg_renderer(f"resources/svg/cells/cell{i}.svg")
-        # Filter out any failed loads
-        self.renderers = {k: v for k, v in self.renderers.items() if v is not None}
+        """Loads SVG resources for the cells. The board is the first thing painted, so load eagerly."""
+        self.renderers = LazyRenderers(CELL_FILES)
+        self.renderers.preload()
+
+    def cell_sprite_key(self, r, c):
+        """Returns the sprite key for the cell's current visual state."""
+        cell = self.game.board[r][c]
+        if cell['revealed']:
+            if cell['mine']:
+                return 'blast' if cell.get('blasted', False) else 'mine'
+            return str(cell['neighbor']) if cell['neighbor'] > 0 else 'empty'
+        if cell.get('false_flagged', False):
+            return 'falsemine'
+        if self.mouse_pressed and self.hovered_cell == (r, c):
+            return 'empty'
+        if (r, c) in self.temp_revealed_cells:
+            return 'flag' if cell['flagged'] else 'empty'
+        return 'flag' if cell['flagged'] else 'unrevealed'
 
     def paintEvent(self, event):
-        """Paints the Minesweeper board."""
+        """Paints the cells inside the exposed area from the cached sprites."""
+        size = self.cell_size
+        ratio = self.devicePixelRatioF()
+        scale = size / 32
+        exposed = event.rect()
+        first_row, last_row = max(0, exposed.top() // size), min(self.game.rows - 1, exposed.bottom() // size)
+        first_col, last_col = max(0, exposed.left() // size), min(self.game.cols - 1, exposed.right() // size)
+
         with QtGui.QPainter(self) as painter:
-            for r in range(self.game.rows):
-                for c in range(self.game.cols):
-                    cell = self.game.board[r][c]
-                    x = c * self.cell_size
-                    y = r * self.cell_size
-                    rect = QtCore.QRectF(x, y, self.cell_size, self.cell_size)
-
-                    if cell['revealed']:
-                        if cell['mine']:
-                            renderer = self.renderers.get('blast' if cell.get('blasted', False) else 'mine')
-                        else:
-                            renderer = self.renderers.get(str(cell['neighbor']) if cell['neighbor'] > 0 else 'empty')
-                    elif cell.get('false_flagged', False):
-                        renderer = self.renderers.get('falsemine')
-                    else:
-                        if self.mouse_pressed and self.hovered_cell == (r, c):
-                            renderer = self.renderers.get('empty')
-                        elif (r, c) in self.temp_revealed_cells:
-                            renderer = self.renderers.get('flag' if cell['flagged'] else 'empty')
-                        else:
-                            renderer = self.renderers.get('flag' if cell['flagged'] else 'unrevealed')
-
-                    if renderer:
-                        renderer.render(painter, rect)
+            for r in range(first_row, last_row + 1):
+                for c in range(first_col, last_col + 1):
+                    pixmap = self.renderers.pixmap(self.cell_sprite_key(r, c), size, size, ratio, scale)
+                    if pixmap:
+                        painter.drawPixmap(c * size, r * size, pixmap)
+            if self.heatmap is not None:  # One pixel per cell, stretched over the cells
+                painter.drawPixmap(QtCore.QRect(first_col * size, first_row * size, (last_col - first_col + 1) * size,
+                                               (last_row - first_row + 1) * size),
+                                  self.heatmap, QtCore.QRect(first_col, first_row, last_col - first_col + 1,
+                                                             last_row - first_row + 1))
+            if self.hint is not None:
+                r, c = divmod(self.hint[0], self.game.cols)
+                if first_row <= r <= last_row and first_col <= c <= last_col:
+                    painter.fillRect(c * size, r * size, size, size,
+                                     HINT_SAFE_COLOR if self.hint[1] == 0 else HINT_RISKY_COLOR)
 
     def mousePressEvent(self, event: QtGui.QMouseEvent):
         """Handles mouse press events."""
@@ -161,13 +183,7 @@ class MinesweeperWidget(QtWidgets.QWidget):
     def temp_reveal_adjacent(self, row, col):
         """Temporarily reveals adjacent cells for the chord click."""
         self.temp_revealed_cells = [(row, col)] if not self.game.board[row][col]['flagged'] else []
-        for dr in (-1, 0, 1):
-            for dc in (-1, 0, 1):
-                nr, nc = row + dr, col + dc
-                if 0 <= nr < self.game.rows and 0 <= nc < self.game.cols:
-                    cell = self.game.board[nr][nc]
-                    if not cell['revealed'] and not cell['flagged'] and (nr, nc) != (row, col):
-                        self.temp_revealed_cells.append((nr, nc))
+        self.temp_revealed_cells += [divmod(j, self.game.cols) for j in self.game.hidden_neighbors(row, col)]
         self.update()
 
     def keyPressEvent(self, event: QtGui.QKeyEvent):
@@ -190,9 +206,37 @@ class MinesweeperWidget(QtWidgets.QWidget):
                    self.parent_window.update_mines_display()
             self.update()
 
+    def set_hint(self, index, probability=None):
+        """Highlights the hinted cell, or removes the highlight; repaints only the cells involved."""
+        if self.hint is not None:
+            self.update_cell(self.hint[0])
+        self.hint = (index, probability) if index is not None else None
+        if index is not None:
+            self.update_cell(index)
+
+    def set_probabilities(self, probabilities, grid=None):
+        """Tints the cells that are hidden in `grid` by their probability of a mine; None removes the tint."""
+        self.probabilities = probabilities
+        if probabilities is None:
+            self.heatmap = None
+        else:
+            pixels = b''.join(HEATMAP_PALETTE[round(probabilities[index] * HEATMAP_STEPS)]
+                              if code == HIDDEN and index in probabilities else CLEAR_PIXEL
+                              for index, code in enumerate(grid))
+            image = QtGui.QImage(pixels, self.game.cols, self.game.rows, self.game.cols * 4,
+                                 QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+            self.heatmap = QtGui.QPixmap.fromImage(image)  # Copies the pixels
+        self.update()
+
+    def update_cell(self, index):
+        row, col = divmod(index, self.game.cols)
+        self.update(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+
     def set_cell_size(self, size):
         """Sets the cell size and updates the widget size, locking it."""
         self.cell_size = int(size)
         # Lock Size
         self.setFixedSize(self.game.cols * self.cell_size, (self.game.rows * self.cell_size))
+        # Rasterize this zoom level's sprites now so the first paint only blits
+        self.renderers.prerender(self.cell_size, self.cell_size, self.devicePixelRatioF(), self.cell_size / 32)
         self.update()
\ No newline at end of file
@@ -1,62 +1,76 @@
-import os
-from pathlib import Path
-from PyQt6 import QtWidgets, QtGui, QtCore, QtSvg
+from collections import OrderedDict
+from PyQt6 import QtWidgets, QtGui, QtCore
+from gui.resources import LazyRenderers
+
+BORDER_FILES = {
+    name: f"resources/svg/border/{name}.svg"
+    for name in ("topleft", "top", "topright", "left", "middleleft", "middleright", "right",
+                 "bottomleft", "bottom", "bottomright", "counterleft", "countermiddle", "counterright")
+}
+
+PIXMAP_CACHE_SIZE = 16  # Rendered frames shared by all borders, keyed by type and geometry
+_pixmap_cache = OrderedDict()
 
 class BorderWidget(QtWidgets.QWidget):
     def __init__(self, width, height, border_type, scale_factor=1, parent=None):
         super().__init__(parent)
-        self.cell_size = int(round(16 * scale_factor))
-        self.width_ = width
-        self.height_ = height
         self.type_ = border_type  # Renamed to avoid conflict with built-in type
+        # Keep the unscaled geometry so repeated zooming never accumulates rounding errors
+        self.base_width = width / scale_factor
+        self.base_height = height / scale_factor
         self.load_resources()
-        self.setFixedSize(int(round(self.width_)), int(round(self.height_)))  # Use fixed dimensions
+        self.update_scale(scale_factor)
 
     def update_scale(self, scale_factor):
         """Update the internal rect values when scaling changes."""
-        self.cell_size = int(16 * scale_factor)  # Scale cell size
-        self.width_ = int(self.width_ * scale_factor)
-        self.height_ = int(self.height_ * scale_factor)
-        self.setFixedSize(int(round(self.width_)), int(round(self.height_)))  # Resize widget 
+        self.scale_factor = scale_factor
+        self.cell_size = int(round(16 * scale_factor))  # Scale cell size
+        self.width_ = int(round(self.base_width * scale_factor))
+        self.height_ = int(round(self.base_height * scale_factor))
+        # The bottom border paints its lower edge below the board area
+        extra_height = self.cell_size if self.type_ == "bottom" else 0
+        self.setFixedSize(self.width_, self.height_ + extra_height)  # Resize widget
         self.update()  # Redraw widget
 
-    def load_svg_renderer(self, relative_path):
-        """Loads an SVG renderer from the given path."""
-        # Use pathlib.Path for robust path handling
-        base_path = Path(__file__).resolve().parent.parent.parent  # Key change!
-        full_path = base_path / relative_path
-
-        if not full_path.exists():
-            print(f"Error: {full_path} does not exist.")
-            return None
-        return QtSvg.QSvgRenderer(str(full_path))
+    def set_border_size(self, width, height):
+        """Sets a new geometry, given in pixels at the current scale."""
+        self.base_width = width / self.scale_factor
+        self.base_height = height / self.scale_factor
+        self.update_scale(self.scale_factor)
 
     def load_resources(self):
-        """Loads SVG resources for the border elements."""
-        self.renderers = {}
-        self.renderers["topleft"] = self.load_svg_renderer("resources/svg/border/topleft.svg")
-        self.renderers["top"] = self.load_svg_renderer("resources/svg/border/top.svg")
-        self.renderers["topright"] = self.load_svg_renderer("resources/svg/border/topright.svg")
-        self.renderers["left"] = self.load_svg_renderer("resources/svg/border/left.svg")
-        self.renderers["middleleft"] = self.load_svg_renderer("resources/svg/border/middleleft.svg")
-        self.renderers["middleright"] = self.load_svg_renderer("resources/svg/border/middleright.svg")
-        self.renderers["right"] = self.load_svg_renderer("resources/svg/border/right.svg")
-        self.renderers["bottomleft"] = self.load_svg_renderer("resources/svg/border/bottomleft.svg")
-        self.renderers["bottom"] = self.load_svg_renderer("resources/svg/border/bottom.svg")
-        self.renderers["bottomright"] = self.load_svg_renderer("resources/svg/border/bottomright.svg")
-        self.renderers["counterleft"] = self.load_svg_renderer("resources/svg/border/counterleft.svg")
-        self.renderers["countermiddle"] = self.load_svg_renderer("resources/svg/border/countermiddle.svg")
-        self.renderers["counterright"] = self.load_svg_renderer("resources/svg/border/counterright.svg")
-        self.renderers = {k: v for k, v in self.renderers.items() if v is not None} # Remove fails
+        """Prepares the border elements; only the pieces this border type paints get loaded."""
+        self.renderers = LazyRenderers(BORDER_FILES)
 
-    def paintEvent(self, event):
-        """Paints the appropriate border based on the type."""
-        with QtGui.QPainter(self) as painter:
+    def border_pixmap(self):
+        """Returns the rendered frame for the current geometry, rendering it only on a cache miss."""
+        ratio = self.devicePixelRatioF()
+        key = (self.type_, self.width(), self.height(), self.cell_size, ratio)
+        pixmap = _pixmap_cache.get(key)
+        if pixmap is not None:
+            _pixmap_cache.move_to_end(key)
+            return pixmap
+
+        pixmap = QtGui.QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(QtCore.Qt.GlobalColor.transparent)
+        with QtGui.QPainter(pixmap) as painter:
             if self.type_ == "top":
                 self.draw_top_border(painter)
             elif self.type_ == "bottom":
                 self.draw_bottom_border(painter)
-                self.setFixedSize(int(round(self.width_)), int(round(self.height_)) + int(self.cell_size))  # Use fixed dimensions
+
+        _pixmap_cache[key] = pixmap
+        if len(_pixmap_cache) > PIXMAP_CACHE_SIZE:
+            _pixmap_cache.popitem(last=False)
+        return pixmap
+
+    def paintEvent(self, event):
+        """Blits the cached frame; geometry is never changed while painting."""
+        if self.type_ not in ("top", "bottom"):
+            return
+        with QtGui.QPainter(self) as painter:
+            painter.drawPixmap(0, 0, self.border_pixmap())
 
     def draw_top_border(self, painter):
         """Draws the top border."""
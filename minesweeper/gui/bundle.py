@@ -0,0 +1,106 @@
+"""Packs `resources/svg` into a single indexed bundle file.
+
+Layout: magic (4 bytes), index size (uint32, little endian), JSON index
+mapping resource names to [offset, length] within the data block, data block.
+Optional PNG tiers, pre-rasterized for standard zoom factors, are stored
+under "png/<scale>/<name>.png".
+
+Build it from the `minesweeper` directory:
+
+    python -m gui.bundle --png-scales 1,1.5,2
+"""
+import argparse
+import json
+import mmap
+import struct
+from pathlib import Path
+
+MAGIC = b'MSWB'
+HEADER = struct.Struct('<4sI')
+SVG_ROOT = Path(__file__).resolve().parent.parent.parent / "resources/svg"
+DEFAULT_BUNDLE_PATH = SVG_ROOT.parent / "svg.bundle"
+SVG_UNITS_PER_PIXEL = 5  # The SVGs are drawn at 5x their on-screen size at 100% zoom
+_app = None  # Only keeps the application build_bundle creates for rasterizing alive
+
+
+class ResourceBundle:
+    """Read-only view of a bundle file, memory mapped in one go."""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_size = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a resource bundle")
+        self.base = HEADER.size + index_size
+        self.index = json.loads(self.data[HEADER.size:self.base])
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def get(self, name):
+        """Returns a memoryview over the resource data, or None if it is not bundled."""
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+        offset, length = entry
+        return memoryview(self.data)[self.base + offset:self.base + offset + length]
+
+
+def rasterize(svg_data, scale):
+    """Renders SVG data to PNG bytes at its on-screen size for zoom factor `scale`."""
+    from PyQt6 import QtCore, QtGui, QtSvg
+
+    renderer = QtSvg.QSvgRenderer(QtCore.QByteArray(svg_data))
+    size = renderer.defaultSize() * (scale / SVG_UNITS_PER_PIXEL)
+    image = QtGui.QImage(size, QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(0)
+    with QtGui.QPainter(image) as painter:
+        renderer.render(painter)
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(buffer.data())
+
+
+def build_bundle(output=DEFAULT_BUNDLE_PATH, png_scales=()):
+    """Writes every SVG under resources/svg (and optional PNG tiers) into one bundle file."""
+    entries = {}
+    for path in sorted(SVG_ROOT.rglob("*.svg")):
+        entries[path.relative_to(SVG_ROOT).as_posix()] = path.read_bytes()
+
+    if png_scales:
+        from PyQt6 import QtGui
+        global _app
+        _app = QtGui.QGuiApplication.instance() or QtGui.QGuiApplication([])  # Needed for QImage/QPainter
+        for scale in png_scales:
+            for name, svg_data in list(entries.items()):
+                if name.endswith(".svg"):
+                    entries[f"png/{scale:g}/{name[:-4]}.png"] = rasterize(svg_data, scale)
+
+    index, offset = {}, 0
+    for name, data in entries.items():
+        index[name] = [offset, len(data)]
+        offset += len(data)
+    index_bytes = json.dumps(index, separators=(',', ':')).encode()
+
+    with open(output, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        for data in entries.values():
+            f.write(data)
+    return len(entries), HEADER.size + len(index_bytes) + offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack resources/svg into a single bundle file.")
+    parser.add_argument('--output', default=str(DEFAULT_BUNDLE_PATH))
+    parser.add_argument('--png-scales', default='', help="comma separated raster tiers, e.g. 1,1.5,2")
+    args = parser.parse_args()
+
+    scales = [float(scale) for scale in args.png_scales.split(',') if scale]
+    count, size = build_bundle(args.output, scales)
+    print(f"Wrote {count} resources ({size} bytes) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,10 @@
-import os
-from pathlib import Path
-from PyQt6 import QtWidgets, QtGui, QtCore, QtSvg
+from PyQt6 import QtWidgets, QtGui
+from gui.resources import LazyRenderers
+
+DIGIT_FILES = {
+    **{i: f"resources/svg/counter/counter{i}.svg" for i in range(10)},
+    '-': "resources/svg/counter/counter-.svg",
+}
 
 class CounterWidget(QtWidgets.QWidget):
     def __init__(self, scale_factor=1, initial_value=0, parent=None):
@@ -13,27 +17,14 @@ class CounterWidget(QtWidgets.QWidget):
         self.height_ = int(50 * self.scale_factor)
         self.setFixedSize(3 * self.width_, self.height_)  # Fixed Size
 
-    def load_svg_renderer(self, relative_path):
-        """Loads an SVG renderer from the given path."""
-        # Use pathlib.Path for robust path handling
-        base_path = Path(__file__).resolve().parent.parent.parent  # Key change!
-        full_path = base_path / relative_path
-
-        if not full_path.exists():
-            print(f"Error: {full_path} does not exist.")
-            return None
-        return QtSvg.QSvgRenderer(str(full_path))
-
     def load_resources(self):
-        """Loads SVG resources for the counter digits."""
-        self.renderers = {}
-        for i in range(10):
-            self.renderers[i] = self.load_svg_renderer(f"resources/svg/counter/counter{i}.svg")
-        self.renderers['-'] = self.load_svg_renderer("resources/svg/counter/counter-.svg")
-        self.renderers = {k: v for k, v in self.renderers.items() if v is not None} # Remove fails
+        """Prepares the counter digits; each digit is parsed the first time it is shown."""
+        self.renderers = LazyRenderers(DIGIT_FILES)
 
     def set_value(self, value):
-        """Sets the counter value and updates the display."""
+        """Sets the counter value and updates the display; unchanged values are not repainted."""
+        if value == self.value:
+            return
         self.value = value
         self.update()
 
@@ -44,16 +35,13 @@ class CounterWidget(QtWidgets.QWidget):
             if self.value < 0:
                 value_str = f"-{-self.value:02}"
 
+            ratio = self.devicePixelRatioF()
             for i, digit in enumerate(value_str):
                 x = i * self.width_
-                y = 0
-                rect = QtCore.QRectF(x, y, self.width_, self.height_)
-                if digit == '-':
-                    renderer = self.renderers.get('-')
-                else:
-                    renderer = self.renderers.get(int(digit))
-                if renderer:
-                    renderer.render(painter, rect)
+                key = '-' if digit == '-' else int(digit)
+                pixmap = self.renderers.pixmap(key, self.width_, self.height_, ratio, self.scale_factor)
+                if pixmap:
+                    painter.drawPixmap(x, 0, pixmap)
 
     def set_cell_size(self, scale):
         """Sets the cell size and updates the widget size, locking it."""
@@ -1,6 +1,13 @@
-import os
-from pathlib import Path
-from PyQt6 import QtWidgets, QtGui, QtCore, QtSvg
+from PyQt6 import QtWidgets, QtGui, QtCore
+from gui.resources import LazyRenderers
+
+FACE_FILES = {
+    'smile': "resources/svg/faces/smileface.svg",
+    'click': "resources/svg/faces/clickface.svg",
+    'win': "resources/svg/faces/winface.svg",
+    'lose': "resources/svg/faces/lostface.svg",
+    'smile_down': "resources/svg/faces/smilefacedown.svg",
+}
 
 class FaceButton(QtWidgets.QWidget):
     def __init__(self, parent=None):
@@ -11,37 +18,17 @@ class FaceButton(QtWidgets.QWidget):
         self.setFixedSize(50, 50)  # Fixed size
         self.mouse_pressed = False
 
-    def load_svg_renderer(self, relative_path):
-        """Loads an SVG renderer from the given path."""
-        # Use pathlib.Path for robust path handling
-        base_path = Path(__file__).resolve().parent.parent.parent  # Key change!
-        full_path = base_path / relative_path
-
-        if not full_path.exists():
-            print(f"Error: {full_path} does not exist.")
-            return None
-        return QtSvg.QSvgRenderer(str(full_path))
-
     def load_resources(self):
-        """Loads SVG resources for the face states."""
-        self.renderers = {}
-        self.renderers['smile'] = self.load_svg_renderer("resources/svg/faces/smileface.svg")
-        self.renderers['click'] = self.load_svg_renderer("resources/svg/faces/clickface.svg")
-        self.renderers['win'] = self.load_svg_renderer("resources/svg/faces/winface.svg")
-        self.renderers['lose'] = self.load_svg_renderer("resources/svg/faces/lostface.svg")
-        self.renderers['smile_down'] = self.load_svg_renderer("resources/svg/faces/smilefacedown.svg")
-        self.renderers = {k: v for k, v in self.renderers.items() if v is not None} # Remove fails.
+        """Prepares the face states; only the smile is needed for the first frame."""
+        self.renderers = LazyRenderers(FACE_FILES)
 
     def paintEvent(self, event):
         """Paints the current face state."""
         with QtGui.QPainter(self) as painter:
-            rect = QtCore.QRectF(0, 0, self.width(), self.height())
-            if self.mouse_pressed:
-                renderer = self.renderers.get('smile_down')
-            else:
-                renderer = self.renderers.get(self.state)
-            if renderer:
-                renderer.render(painter, rect)
+            key = 'smile_down' if self.mouse_pressed else self.state
+            pixmap = self.renderers.pixmap(key, self.width(), self.height(), self.devicePixelRatioF(), self.width() / 50)
+            if pixmap:
+                painter.drawPixmap(0, 0, pixmap)
 
     def mousePressEvent(self, event: QtGui.QMouseEvent):
         """Handles mouse press events."""
@@ -58,6 +45,12 @@ class FaceButton(QtWidgets.QWidget):
             if self.main_window:
                 self.main_window.new_game()
 
+    def set_scale(self, scale_factor):
+        """Resizes the button for a zoom level."""
+        size = int(50 * scale_factor)
+        self.setFixedSize(size, size)
+        self.update()
+
     def set_state(self, state):
         """Sets the face state and updates the display."""
         self.state = state
@@ -0,0 +1,26 @@
+from PyQt6 import QtCore
+
+
+class FileTaskSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(object)  # The task's return value
+    failed = QtCore.pyqtSignal(str)
+
+
+class FileTask(QtCore.QRunnable):
+    """Runs a blocking file operation on the global thread pool and reports back on the UI thread."""
+    def __init__(self, func, *args):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.signals = FileTaskSignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:  # Reported to the UI instead of being lost in the worker thread
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+    def start(self):
+        QtCore.QThreadPool.globalInstance().start(self)
@@ -0,0 +1,50 @@
+from PyQt6 import QtCore
+from game.solver import Cancelled, find_hint, mine_probabilities
+
+
+class HintTaskSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(object)  # The task's result
+
+
+class HintTask(QtCore.QRunnable):
+    """Looks for the safest cell of a board snapshot on the global thread pool; can be cancelled."""
+    def __init__(self, grid, rows, cols, mines):
+        super().__init__()
+        self.grid = grid
+        self.rows = rows
+        self.cols = cols
+        self.mines = mines
+        self.cancelled = False
+        self.signals = HintTaskSignals()
+
+    def analyse(self):
+        """(index, probability of a mine), or None."""
+        return find_hint(self.grid, self.rows, self.cols, self.mines, lambda: self.cancelled)
+
+    def run(self):
+        if self.cancelled:  # Superseded while it waited for a thread
+            return
+        try:
+            result = self.analyse()
+        except Cancelled:
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(result)
+
+    def start(self):
+        QtCore.QThreadPool.globalInstance().start(self)
+
+    def cancel(self):
+        """Makes a running search give up at its next check; nothing is reported after this."""
+        self.cancelled = True
+
+
+class ProbabilityTask(HintTask):
+    """Works out the mine probability of every hidden cell, reusing the components solved for earlier snapshots."""
+    def __init__(self, grid, rows, cols, mines, cache):
+        super().__init__(grid, rows, cols, mines)
+        self.cache = cache
+
+    def analyse(self):
+        """{index: probability of a mine}, or None."""
+        return mine_probabilities(self.grid, self.rows, self.cols, self.mines, lambda: self.cancelled, self.cache)
@@ -1,11 +1,12 @@
-import json
 from PyQt6 import QtWidgets, QtGui, QtCore
+from pathlib import Path
 from game.minesweeper_game import MinesweeperGame
 from gui.board_widget import MinesweeperWidget
 from gui.counter_widget import CounterWidget
 from gui.face_button import FaceButton
 from gui.border_widget import BorderWidget
-from gui.custom_game_dialog import CustomGameDialog
+from gui.file_worker import FileTask
+from gui.hint_worker import HintTask, ProbabilityTask
 
 DIFFICULTIES = {
     "Beginner": (9, 9, 10),
@@ -13,19 +14,50 @@ DIFFICULTIES = {
     "Expert": (16, 30, 99)
 }
 
+APPLICATION_NAME = "Minesweeper"  # Names the per-user data directory
+ZOOM_LEVELS = (100, 125, 150, 200)
+MAX_DISPLAYED_TIME = 999  # The counter has three digits
+AUTOSAVE_EVERY_ACTIONS = 10
+AUTOSAVE_INTERVAL_MS = 5000
+SAVE_FILE_FILTER = "Saved Games (*.json *.json.z *.json.xz);;JSON Files (*.json);;zlib Compressed (*.json.z);;LZMA Compressed (*.json.xz)"
+
+def app_data_path(filename, directory=None):
+    """Returns a path in `directory`, by default the per-user application data directory, creating the directory."""
+    if directory is None:
+        location = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.StandardLocation.AppDataLocation)
+        directory = location or Path.home() / ".minesweeper"
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / filename
+
 class MainWindow(QtWidgets.QMainWindow):
     scaleChanged = QtCore.pyqtSignal(float)  # Signal to notify all widgets about scale updates
 
-    def __init__(self):
+    def __init__(self, data_directory=None):
+        """`data_directory` holds the statistics and autosave journal instead of the per-user directory."""
         super().__init__()
+        QtCore.QCoreApplication.setApplicationName(APPLICATION_NAME)  # Also when a benchmark created the application
+        self.data_directory = data_directory
         self.setWindowTitle("Minesweeper")
         self.game = None
         self.board_widget = None
+        self.hint_task = None
+        self.probability_task = None
+        self.probability_cache = {}  # Frontier components solved for the heatmap, reused while they are unchanged
+        # Single-shot ticks re-armed for the next whole second; the time itself comes from the game's monotonic clock
         self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self.update_timer)
-        self.elapsed_time = 0
         self.zoom_level = 100
         self.selected_difficulty = "Beginner" # Initialize
+        self.statistics = None
+        QtCore.QTimer.singleShot(0, self.open_statistics)  # Keep SQLite off the startup path
+        self.autosave = None
+        self.actions_since_autosave = 0
+        self.autosave_timer = QtCore.QTimer(self)
+        self.autosave_timer.timeout.connect(self.autosave_snapshot)
+        QtCore.QTimer.singleShot(0, self.start_autosave)  # Offers to resume after the first frame
         self.create_menu()
         self.set_difficulty(*DIFFICULTIES["Beginner"])  # Initial game
 
@@ -60,19 +92,45 @@ class MainWindow(QtWidgets.QMainWindow):
         game_menu.addAction(custom_action)
         game_menu.addSeparator()
 
+        copy_code_action = QtGui.QAction("&Copy Board Code", self)
+        copy_code_action.setShortcut(QtGui.QKeySequence.StandardKey.Copy)
+        copy_code_action.triggered.connect(self.copy_board_code)
+        game_menu.addAction(copy_code_action)
+        paste_code_action = QtGui.QAction("&Play Board Code...", self)
+        paste_code_action.setShortcut(QtGui.QKeySequence.StandardKey.Paste)
+        paste_code_action.triggered.connect(self.paste_board_code)
+        game_menu.addAction(paste_code_action)
+        game_menu.addSeparator()
+
+        hint_action = QtGui.QAction("&Hint", self)
+        hint_action.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key.Key_H))
+        hint_action.triggered.connect(self.show_hint)
+        game_menu.addAction(hint_action)
+        game_menu.addSeparator()
+
+        statistics_action = QtGui.QAction("&Statistics...", self)
+        statistics_action.triggered.connect(self.show_statistics)
+        game_menu.addAction(statistics_action)
+        game_menu.addSeparator()
+
         exit_action = QtGui.QAction("E&xit", self)
         exit_action.triggered.connect(self.close)
         game_menu.addAction(exit_action)
 
-       # Display Menu
-        # display_menu = menubar.addMenu("&Display")
-        # self.zoom_actions = {}
-        # for zoom in [100, 150, 200]:
-        #     zoom_action = QtGui.QAction(f"{zoom}%", self, checkable=True)
-        #     zoom_action.triggered.connect(lambda checked, z=zoom: self.set_zoom(z))
-        #     self.zoom_actions[zoom] = zoom_action
-        #     display_menu.addAction(zoom_action)
-        # self.zoom_actions[100].setChecked(True)  # Default zoom
+        # Display Menu
+        display_menu = menubar.addMenu("&Display")
+        self.zoom_actions = {}
+        for zoom in ZOOM_LEVELS:
+            zoom_action = QtGui.QAction(f"{zoom}%", self, checkable=True)
+            zoom_action.triggered.connect(lambda checked, z=zoom: self.set_zoom(z))
+            self.zoom_actions[zoom] = zoom_action
+            display_menu.addAction(zoom_action)
+        self.zoom_actions[100].setChecked(True)  # Default zoom
+        display_menu.addSeparator()
+        self.heatmap_action = QtGui.QAction("Mine &Probabilities", self, checkable=True)
+        self.heatmap_action.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key.Key_P))
+        self.heatmap_action.triggered.connect(lambda checked: self.update_heatmap(reset=True))
+        display_menu.addAction(self.heatmap_action)
 
         # Import/Export Menus
         import_menu = menubar.addMenu("&Import")
@@ -109,6 +167,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.mines_counter = CounterWidget(scale_factor, self.game.mines)
         self.timer_counter = CounterWidget(scale_factor)
         self.face_button = FaceButton(self)
+        self.face_button.set_scale(scale_factor)
 
         mines_counter_border = BorderWidget(6 * cell_size + cell_size_double, cell_size * 3, "counter", scale_factor)
         timer_counter_border = BorderWidget(6 * cell_size + cell_size_double, cell_size * 3, "counter", scale_factor)
@@ -136,16 +195,30 @@ class MainWindow(QtWidgets.QMainWindow):
         main_layout.addWidget(self.top_panel_border)
 
         # Game Board (with border)
-        board_border = BorderWidget(int((self.game.cols * cell_size_double) + cell_size_double), int(self.game.rows * cell_size_double), "bottom", scale_factor)
-        board_layout = QtWidgets.QVBoxLayout(board_border)
-        board_layout.addWidget(self.board_widget)
-        board_layout.setContentsMargins(cell_size, 0, cell_size, cell_size)
-        main_layout.addWidget(board_border)
+        self.board_border = BorderWidget(int((self.game.cols * cell_size_double) + cell_size_double), int(self.game.rows * cell_size_double), "bottom", scale_factor)
+        self.board_layout = QtWidgets.QVBoxLayout(self.board_border)
+        self.board_layout.addWidget(self.board_widget)
+        self.board_layout.setContentsMargins(cell_size, 0, cell_size, cell_size)
+        main_layout.addWidget(self.board_border)
 
         self.setCentralWidget(central_widget)
+        self.statusBar().setSizeGripEnabled(False)  # The window has a fixed size
+        self.status_label = QtWidgets.QLabel()  # Hidden while a temporary message is shown
+        self.statusBar().addWidget(self.status_label)
         # Initial sizing (after widgets are created)
         self.resize_geometry()
 
+    def reconfigure_widgets(self):
+        """Fits the existing widgets to the current game instead of rebuilding them."""
+        scale_factor = self.zoom_level / 100
+        cell_size_double = int(int(16 * scale_factor) * 2)
+        border_width = int((self.game.cols * cell_size_double) + cell_size_double)
+
+        self.top_panel_border.set_border_size(border_width, cell_size_double * 3)
+        self.board_border.set_border_size(border_width, int(self.game.rows * cell_size_double))
+        self.face_button.set_state('smile')
+        self.resize_geometry()
+
     def resize_geometry(self):
         """Recalculates and resizes the window based on current content."""
         scale_factor = self.zoom_level / 100
@@ -162,7 +235,9 @@ class MainWindow(QtWidgets.QMainWindow):
 
         top_panel_height = self.top_panel_border.height() # Fixed height
         total_width = board_width + cell_size_double
-        total_height = board_height + top_panel_height + (cell_size * 3)
+        # Board, top panel, the bottom border's lower edge and the (unscaled) menu and status bars
+        total_height = (board_height + top_panel_height + cell_size
+                        + self.menuBar().sizeHint().height() + self.statusBar().sizeHint().height())
 
         self.board_widget.setFixedSize(board_width, board_height)
         self.setFixedSize(total_width, total_height)
@@ -170,7 +245,6 @@ class MainWindow(QtWidgets.QMainWindow):
     def new_game(self):
         """Starts a new game."""
         self.timer.stop()
-        self.elapsed_time = 0
         self.timer_counter.set_value(0)
         self.face_button.set_state('smile') # Reset face
 
@@ -181,18 +255,15 @@ class MainWindow(QtWidgets.QMainWindow):
              rows, cols, mines = self.game.rows, self.game.cols, self.game.mines
 
         self.set_difficulty(rows, cols, mines)
-        self.timer.start(1000)
 
     def update_all_borders(self, scale_factor):
         """This function is called when the zoom level changes."""
-        cell_size = int(16 * scale_factor)
-
         for widget in self.findChildren(BorderWidget):
             widget.update_scale(scale_factor)
-            #widget.setContentsMargins(cell_size, 0, cell_size, cell_size)
 
-    def set_difficulty(self, rows, cols, mines):
-        """Sets the game difficulty."""
+    def set_difficulty(self, rows, cols, mines, game=None):
+        """Sets the game difficulty, starting a new game or the given unstarted one."""
+        self.clear_hint()
         cell_size = int(32 * (self.zoom_level / 100))
 
         # Uncheck all difficulty actions, then check the correct one.
@@ -208,83 +279,220 @@ class MainWindow(QtWidgets.QMainWindow):
             self.difficulty_actions["Custom"].setChecked(True)
             self.selected_difficulty = "Custom"
 
-        self.game = MinesweeperGame(rows, cols, mines, self)
-        self.game.reset_board()
+        if game is not None:
+            self.game = game
+            self.game.main_window = self
+        elif self.game is not None and (self.game.rows, self.game.cols, self.game.mines) == (rows, cols, mines):
+            if self.autosave is not None:
+                self.autosave.detach()  # Attached again below, so the reset need not mark every cell
+            self.game.reset_board()  # Same dimensions: restart on the existing board without allocating
+        else:
+            self.game = MinesweeperGame(rows, cols, mines, self)
+            self.game.reset_board()
 
         if self.board_widget:
             self.board_widget.game = self.game  # Update game
-            self.board_widget.set_cell_size(cell_size)
-            self.board_widget.update()
+            self.reconfigure_widgets()  # Keep the widget tree, only geometry and values change
         else:
             self.board_widget = MinesweeperWidget(self.game, cell_size, self)  # Pass MainWindow
-
-        self.create_widgets() # Recreate to apply changes
+            self.create_widgets()
         self.update_mines_display()
         self.reset_timer()
+        self.update_status()
+        self.update_heatmap(reset=True)
+        self.attach_autosave()
         self.setFixedSize(self.minimumSize())  # Lock size after creation (key change)
 
+    def copy_board_code(self):
+        """Copies a code that reproduces the current board to the clipboard."""
+        from game.board_code import board_code
+
+        QtWidgets.QApplication.clipboard().setText(board_code(self.game))
+        self.statusBar().showMessage("Board code copied.", 3000)
+
+    def paste_board_code(self):
+        """Starts the board described by a code, offering the clipboard contents."""
+        from game.board_code import game_from_code
+
+        code, ok = QtWidgets.QInputDialog.getText(self, "Play Board Code", "Board code:",
+                                                  text=QtWidgets.QApplication.clipboard().text().strip())
+        if not ok or not code:
+            return
+        try:
+            game = game_from_code(code)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "Invalid Board Code", str(e))
+            return
+        self.set_difficulty(game.rows, game.cols, game.mines, game=game)
+
     def show_custom_dialog(self):
         """Shows the custom field dialog."""
+        from gui.custom_game_dialog import CustomGameDialog  # Deferred until first use
+
         dialog = CustomGameDialog(self)
         if dialog.exec():
             height, width, mines = dialog.getValues()
             self.set_difficulty(height, width, mines)
 
     def set_zoom(self, zoom_level):
-        """Sets the zoom level."""
-        for action in self.zoom_actions.values():
-            action.setChecked(False)
-        self.zoom_actions[zoom_level].setChecked(True)
+        """Sets the zoom level by resizing the existing widgets; sprites come from the LRU sprite cache."""
+        for zoom, action in self.zoom_actions.items():
+            action.setChecked(zoom == zoom_level)
         self.zoom_level = zoom_level
         scale_factor = zoom_level / 100
+        cell_size = int(16 * scale_factor)
 
-        # Scale Minesweeper board
-        if self.board_widget:
-            new_cell_size = int(32 * scale_factor)
-            self.board_widget.set_cell_size(new_cell_size)
-
-        # Scale Face Button
-        new_face_size = int(50 * scale_factor)
-        self.face_button.setFixedSize(new_face_size, new_face_size)
-
-        # Scale Counters
-        new_counter_width = int(3 * 26 * scale_factor)
-        new_counter_height = int(50 * scale_factor)
-        self.mines_counter.setFixedSize(new_counter_width, new_counter_height)
-        self.timer_counter.setFixedSize(new_counter_width, new_counter_height)
-
-        # Scale borders (example, you might need to adjust)
-        new_border_width = int(self.board_widget.width() + 32 * scale_factor)
-         # Adjust height as needed
-        new_border_height = int(96 * scale_factor)
-        self.top_panel_border.setFixedSize(new_border_width, new_border_height)
+        self.board_widget.set_cell_size(int(32 * scale_factor))
+        self.face_button.set_scale(scale_factor)
+        self.mines_counter.set_cell_size(scale_factor)
+        self.timer_counter.set_cell_size(scale_factor)
+        self.board_layout.setContentsMargins(cell_size, 0, cell_size, cell_size)
 
-        self.resize_geometry()
-        self.setFixedSize(self.minimumSize())  # Lock size after zoom (key change)
         # Emit signal to update all widgets
-        print(scale_factor)
         self.scaleChanged.emit(scale_factor)
+        self.resize_geometry()
 
     def start_timer(self):
         """Starts the game timer."""
-        if not self.timer.isActive():
-            self.elapsed_time = 0
-            self.timer_counter.set_value(0)
-            self.timer.start(1000)
+        self.timer_counter.set_value(0)
+        self.update_timer()
 
     def update_timer(self):
-        """Updates the timer display."""
-        if not self.game.game_over and self.game.game_started:
-            self.elapsed_time += 1
-            self.timer_counter.set_value(self.elapsed_time)
+        """Shows the whole seconds elapsed and schedules the next tick for when that number changes."""
+        if not self.game.game_started:
+            return
+        elapsed_ms = self.game.elapsed_ms()
+        self.timer_counter.set_value(min(elapsed_ms // 1000, MAX_DISPLAYED_TIME))
+        self.update_status()
+        if not self.game.game_over:
+            self.timer.start(1000 - elapsed_ms % 1000)
 
     def reset_timer(self):
         """Resets the timer."""
         self.timer.stop()
-        self.elapsed_time = 0
         self.timer_counter.set_value(0)
         if self.game.game_started: # Restart timer only if game started
-          self.timer.start(1000)
+            self.update_timer()
+
+    def board_changed_callback(self):
+        """Called by the game after every action that reached the board."""
+        self.clear_hint()
+        self.update_status()
+        self.update_heatmap()
+        self.actions_since_autosave += 1
+        first_action = self.autosave is not None and not self.autosave.opened  # Opens the journal for this game
+        if self.actions_since_autosave >= AUTOSAVE_EVERY_ACTIONS or first_action:
+            self.autosave_snapshot()
+
+    def show_hint(self):
+        """Highlights a safe cell, or the one least likely to be a mine, found on a worker thread."""
+        from game.solver import board_snapshot
+
+        if self.game.game_over:
+            return
+        self.clear_hint()
+        if not self.game.mines_placed:  # Mines go around the first click, so any cell is safe
+            self.finish_hint(((self.game.rows // 2) * self.game.cols + self.game.cols // 2, 0.0))
+            return
+        # Snapshot on the UI thread; the worker never reads the live board
+        task = HintTask(board_snapshot(self.game), self.game.rows, self.game.cols, self.game.mines)
+        task.signals.finished.connect(lambda hint: self.finish_hint(hint) if task is self.hint_task else None)
+        self.hint_task = task
+        self.statusBar().showMessage("Looking for a safe cell...")
+        task.start()
+
+    def finish_hint(self, hint):
+        self.hint_task = None
+        if hint is None:
+            self.statusBar().showMessage("No hint: the flags do not fit the numbers.", 3000)
+            return
+        index, probability = hint
+        self.board_widget.set_hint(index, probability)
+        row, col = divmod(index, self.game.cols)
+        if probability == 0:
+            self.statusBar().showMessage(f"Row {row + 1}, column {col + 1} is safe.", 3000)
+        else:
+            self.statusBar().showMessage(f"No safe cell: row {row + 1}, column {col + 1} "
+                                         f"has the lowest chance of a mine ({probability:.0%}).", 5000)
+
+    def clear_hint(self):
+        """Drops a hint that no longer fits the board, and stops any search for one."""
+        if self.hint_task is not None:
+            self.hint_task.cancel()
+            self.hint_task = None
+            self.statusBar().clearMessage()
+        if self.board_widget is not None:
+            self.board_widget.set_hint(None)
+
+    def update_heatmap(self, reset=False):
+        """Recomputes the mine probability overlay on a worker thread, if it is shown.
+
+        Until the new probabilities arrive, the old ones stay on the cells that are still hidden.
+        `reset` drops everything computed for the previous board.
+        """
+        from game.solver import board_snapshot
+
+        if self.probability_task is not None:
+            self.probability_task.cancel()
+            self.probability_task = None
+        if reset and self.probability_cache:
+            self.probability_cache = {}
+        if not self.heatmap_action.isChecked() or self.game.game_over:
+            self.board_widget.set_probabilities(None)
+            return
+        grid = board_snapshot(self.game)
+        if not reset and self.board_widget.probabilities is not None:
+            self.board_widget.set_probabilities(self.board_widget.probabilities, grid)
+        task = ProbabilityTask(grid, self.game.rows, self.game.cols, self.game.mines, self.probability_cache)
+        task.signals.finished.connect(
+            lambda probabilities: self.finish_heatmap(probabilities, grid) if task is self.probability_task else None)
+        self.probability_task = task
+        task.start()
+
+    def finish_heatmap(self, probabilities, grid):
+        self.probability_task = None
+        self.board_widget.set_probabilities(probabilities, grid)
+
+    def start_autosave(self):
+        """Opens the autosave journal, offering to resume an unfinished game from a previous session."""
+        from game.autosave import AutosaveJournal, load_journal
+
+        path = app_data_path("autosave.journal", self.data_directory)
+        state = load_journal(path)
+        self.autosave = AutosaveJournal(path)
+        if state and state.get("game_started") and not state.get("game_over"):
+            answer = QtWidgets.QMessageBox.question(self, "Resume Game",
+                                                    "Resume the unfinished game from your last session?")
+            if answer == QtWidgets.QMessageBox.StandardButton.Yes:
+                from game.serialization import decode_game
+
+                self.apply_loaded_game(state, decode_game(state))  # Also attaches the journal
+                self.autosave_timer.start(AUTOSAVE_INTERVAL_MS)
+                return
+        self.attach_autosave()
+        self.autosave_timer.start(AUTOSAVE_INTERVAL_MS)
+
+    def attach_autosave(self):
+        """Restarts the journal for the current game; a new game is written from its first action."""
+        self.actions_since_autosave = 0
+        if self.autosave is not None:
+            self.autosave.attach(self.game, selected_difficulty=self.selected_difficulty, zoom_level=self.zoom_level)
+
+    def autosave_snapshot(self):
+        """Appends the cells changed since the last snapshot to the journal."""
+        self.actions_since_autosave = 0
+        if self.autosave is not None:
+            self.autosave.snapshot()
+
+    def update_status(self):
+        """Shows 3BV progress, 3BV/s, clicks and efficiency in the status bar."""
+        if not self.game.game_started:
+            self.status_label.setText("3BV: -")
+            return
+        stats = self.game.stats()
+        self.status_label.setText(
+            f"3BV: {stats['bbbv_solved']}/{stats['bbbv']}  3BV/s: {stats['bbbv_per_second']:.2f}  "
+            f"Clicks: {stats['clicks']}  Eff: {stats['efficiency']:.0%}")
 
     def update_mines_display(self):
         """Updates the mines counter display."""
@@ -293,12 +501,59 @@ class MainWindow(QtWidgets.QMainWindow):
     def game_over_callback(self):
         """Handles the game over event."""
         self.timer.stop()
+        self.update_timer()  # Show the final time
         self.face_button.set_state('lose')
+        self.record_result(won=False)
+        if self.autosave is not None:
+            self.autosave.clear()  # Nothing left to recover
 
     def win_game_callback(self):
         """Handles the win game event."""
         self.timer.stop()
+        self.update_timer()  # Show the final time
         self.face_button.set_state('win')
+        self.record_result(won=True)
+        if self.autosave is not None:
+            self.autosave.clear()  # Nothing left to recover
+
+    def open_statistics(self):
+        """Opens the statistics store; its writes happen off the UI thread."""
+        from game.statistics import StatisticsStore
+
+        if self.statistics is None:
+            self.statistics = StatisticsStore(app_data_path("statistics.sqlite3", self.data_directory))
+
+    def record_result(self, won):
+        """Queues the finished game for the statistics store; does not touch the disk."""
+        self.open_statistics()
+        stats = self.game.stats()
+        self.statistics.record(self.selected_difficulty, self.game.rows, self.game.cols, self.game.mines,
+                               won, self.game.elapsed_ms(), bbbv=stats['bbbv'], clicks=stats['clicks'],
+                               efficiency=stats['efficiency'], seed=self.game.seed)
+
+    def show_statistics(self):
+        """Displays best times, median time and recent win rate per difficulty."""
+        self.open_statistics()
+        lines = []
+        for difficulty in (*DIFFICULTIES, "Custom"):
+            played, won = self.statistics.summary(difficulty)
+            if not played:
+                continue
+            best = self.statistics.best_times(difficulty, limit=1)
+            median = self.statistics.percentile(difficulty, 50)
+            win_rate = self.statistics.win_rate(difficulty, last=100)
+            lines.append(f"{difficulty}: {won}/{played} won, last 100: {win_rate:.0%}")
+            if best:
+                lines.append(f"    best {best[0][0] / 1000:.3f}s, median {median / 1000:.3f}s")
+        QtWidgets.QMessageBox.information(self, "Statistics", "\n".join(lines) or "No games played yet.")
+
+    def closeEvent(self, event):
+        """Flushes pending statistics and the autosave journal before the window closes."""
+        if self.statistics is not None:
+            self.statistics.close()
+        if self.autosave is not None:
+            self.autosave.close()  # An unfinished game stays in the journal for the next start
+        super().closeEvent(event)
 
     def left_mouse_press_callback(self):
         """Handles left mouse press events (for the face button)."""
@@ -310,78 +565,83 @@ class MainWindow(QtWidgets.QMainWindow):
         if not self.game.game_over:
             self.face_button.set_state('smile')
     def export_game(self):
-        """Exports the current game state to a JSON file."""
-        def encode_cell(cell):
-            if cell["mine"]: return "M"
-            if cell["revealed"]: return "R"
-            if cell["flagged"]: return "F"
-            if cell["neighbor"] > 0: return f"N{cell['neighbor']}"
-            return "E"  # Empty
-
-        compressed_board = [[encode_cell(cell) for cell in row] for row in self.game.board]
-
-        game_state = {
-            "rows": self.game.rows,
-            "cols": self.game.cols,
-            "mines": self.game.mines,
-            "board": compressed_board,
-            "game_over": self.game.game_over,
-            "game_started": self.game.game_started,
-            "mines_left": self.game.mines_left,
-            "elapsed_time": self.elapsed_time,
-            "selected_difficulty": self.selected_difficulty,
-            "zoom_level": self.zoom_level
-        }
-
-        filename, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Game", "", "JSON Files (*.json)")
-        if filename:
-            with open(filename, "w") as f:
-                json.dump(game_state, f)
-            QtWidgets.QMessageBox.information(self, "Export Successful", "Game saved successfully.")
+        """Exports the current game state; encoding and writing happen on a worker thread."""
+        from game import serialization
 
-    def import_game(self):
-        """Imports a game state from a JSON file."""
-        filename, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load Game", "", "JSON Files (*.json)")
-        if filename:
-            with open(filename, "r") as f:
-                game_state = json.load(f)
-
-            def decode_cell(symbol):
-                if symbol == "M":
-                    return {"mine": True, "revealed": False, "flagged": False, "neighbor": 0}
-                if symbol == "R":
-                    return {"mine": False, "revealed": True, "flagged": False, "neighbor": 0}
-                if symbol == "F":
-                    return {"mine": False, "revealed": False, "flagged": True, "neighbor": 0}
-                if symbol.startswith("N"):
-                    return {"mine": False, "revealed": False, "flagged": False, "neighbor": int(symbol[1:])}
-                return {"mine": False, "revealed": False, "flagged": False, "neighbor": 0}
-            self.game = MinesweeperGame(game_state["rows"], game_state["cols"], game_state["mines"])
-            self.game.board = [[decode_cell(cell) for cell in row] for row in game_state["board"]]
-            self.game.calculate_neighbors()  # Recalculate
-            self.game.game_over = game_state["game_over"]
-            self.game.game_started = game_state.get("game_started", False)  # Default
-            self.game.mines_left = game_state.get("mines_left", self.game.mines)
-            self.elapsed_time = game_state.get("elapsed_time", 0)  # Default
-
-            difficulty = game_state.get("selected_difficulty", "Custom")
-            self.selected_difficulty = difficulty
-            for action in self.difficulty_actions.values():
-                 action.setChecked(False)
-            if difficulty in self.difficulty_actions:
-                self.difficulty_actions[difficulty].setChecked(True)
-
-            zoom_level = game_state.get("zoom_level", 100)
-            self.set_zoom(zoom_level)
-            self.board_widget.game = self.game
-            self.create_widgets()
-            self.update_mines_display()  # update mine counter
-            self.timer_counter.set_value(self.elapsed_time)  # set correct time
+        filename, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Game", "", SAVE_FILE_FILTER)
+        if not filename:
+            return
 
-            if self.game.game_started:
-                self.timer.start(1000)  # start timer if already stated
+        # Snapshot on the UI thread so the worker never reads a board that is being played
+        game_state = serialization.encode_game(self.game, selected_difficulty=self.selected_difficulty,
+                                               zoom_level=self.zoom_level)
+        task = FileTask(serialization.save, filename, game_state, serialization.compression_for_path(filename))
+        task.signals.finished.connect(lambda _: self.finish_file_task("Game saved."))
+        task.signals.failed.connect(lambda error: self.fail_file_task("Export Failed", error))
+        self.start_file_task(task, "Saving game...")
 
-            QtWidgets.QMessageBox.information(self, "Import Successful", "Game loaded successfully.")
+    def import_game(self):
+        """Imports a game state; reading and decoding happen on a worker thread."""
+        from game import serialization
+
+        filename, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load Game", "", SAVE_FILE_FILTER)
+        if not filename:
+            return
+
+        def load_game(path):
+            game_state = serialization.load(path)
+            return game_state, serialization.decode_game(game_state)
+
+        task = FileTask(load_game, filename)
+        task.signals.finished.connect(self.finish_import)
+        task.signals.failed.connect(lambda error: self.fail_file_task("Import Failed", error))
+        self.start_file_task(task, "Loading game...")
+
+    def start_file_task(self, task, label):
+        """Runs a save/load task in the thread pool behind a busy indicator."""
+        self.file_progress = QtWidgets.QProgressDialog(label, None, 0, 0, self)  # Busy indicator, no cancel
+        self.file_progress.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        self.file_progress.setMinimumDuration(300)  # Only appears for slow files
+        self.file_task = task  # Keep the signals alive until the task reports back
+        task.start()
+
+    def finish_file_task(self, message):
+        self.file_progress.reset()
+        self.file_task = None
+        self.statusBar().showMessage(message, 3000)
+
+    def fail_file_task(self, title, error):
+        self.file_progress.reset()
+        self.file_task = None
+        QtWidgets.QMessageBox.warning(self, title, error)
+
+    def finish_import(self, result):
+        self.apply_loaded_game(*result)
+        self.finish_file_task("Game loaded.")
+
+    def apply_loaded_game(self, game_state, game):
+        """Swaps a fully decoded game into the window."""
+        self.clear_hint()
+        self.timer.stop()
+        self.game = game
+        self.game.main_window = self
+
+        difficulty = game_state.get("selected_difficulty", "Custom")
+        self.selected_difficulty = difficulty
+        for action in self.difficulty_actions.values():
+             action.setChecked(False)
+        if difficulty in self.difficulty_actions:
+            self.difficulty_actions[difficulty].setChecked(True)
+
+        zoom_level = game_state.get("zoom_level", 100)
+        self.set_zoom(zoom_level)
+        self.board_widget.game = self.game
+        self.reconfigure_widgets()
+        self.update_mines_display()  # update mine counter
+        self.reset_timer()  # Show the restored time, and keep counting if the game is running
+        self.update_status()
+        self.update_heatmap(reset=True)
+        self.attach_autosave()
 
     def about(self):
         """Displays the about dialog."""
@@ -0,0 +1,144 @@
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from PyQt6 import QtCore, QtGui, QtSvg
+from gui.bundle import ResourceBundle, DEFAULT_BUNDLE_PATH
+
+BASE_PATH = Path(__file__).resolve().parent.parent.parent  # Repository root, resolved once
+SVG_PREFIX = "resources/svg/"
+
+
+@lru_cache(maxsize=None)
+def get_bundle():
+    """Returns the packed resource bundle, or None to fall back to the loose SVG files."""
+    path = Path(os.environ.get('MINESWEEPER_RESOURCE_BUNDLE', DEFAULT_BUNDLE_PATH))
+    if not path.is_file():
+        return None
+    try:
+        return ResourceBundle(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: could not open resource bundle {path}: {e}")
+        return None
+
+
+def bundle_name(relative_path):
+    """Maps "resources/svg/cells/cellup.svg" to its bundle name "cells/cellup.svg"."""
+    return relative_path[len(SVG_PREFIX):] if relative_path.startswith(SVG_PREFIX) else relative_path
+
+
+@lru_cache(maxsize=None)
+def load_svg_renderer(relative_path):
+    """Loads an SVG renderer from the bundle or the given path. Renderers are shared between widgets."""
+    bundle = get_bundle()
+    if bundle is not None:
+        data = bundle.get(bundle_name(relative_path))
+        if data is not None:
+            return QtSvg.QSvgRenderer(QtCore.QByteArray(data.tobytes()))
+
+    full_path = BASE_PATH / relative_path
+
+    if not full_path.exists():
+        print(f"Error: {full_path} does not exist.")
+        return None
+    return QtSvg.QSvgRenderer(str(full_path))
+
+
+def load_prerendered_pixmap(relative_path, scale):
+    """Returns the bundled PNG tier for `scale`, or None if the bundle has no such tier."""
+    bundle = get_bundle()
+    if bundle is None:
+        return None
+    name = bundle_name(relative_path)
+    data = bundle.get(f"png/{scale:g}/{name[:-4]}.png") if name.endswith(".svg") else None
+    if data is None:
+        return None
+    pixmap = QtGui.QPixmap()
+    pixmap.loadFromData(data.tobytes(), "PNG")
+    return pixmap
+
+
+def render_pixmap(relative_path, width, height, ratio=1.0, scale=None):
+    """Rasterizes a sprite at the given logical size and device pixel ratio.
+
+    A matching pre-rendered PNG tier from the resource bundle is used when available.
+    """
+    pixel_size = QtCore.QSize(int(round(width * ratio)), int(round(height * ratio)))
+    if scale is not None:
+        pixmap = load_prerendered_pixmap(relative_path, scale * ratio)
+        if pixmap is not None and pixmap.size() == pixel_size:
+            pixmap.setDevicePixelRatio(ratio)
+            return pixmap
+
+    renderer = load_svg_renderer(relative_path)
+    if renderer is None:
+        return None
+    pixmap = QtGui.QPixmap(pixel_size)
+    pixmap.fill(QtCore.Qt.GlobalColor.transparent)
+    with QtGui.QPainter(pixmap) as painter:
+        renderer.render(painter, QtCore.QRectF(0, 0, pixel_size.width(), pixel_size.height()))
+    pixmap.setDevicePixelRatio(ratio)
+    return pixmap
+
+
+class SpriteCache:
+    """LRU of sprite tiers. A tier holds every sprite rendered at one pixel size."""
+    def __init__(self, max_tiers=16):
+        self.max_tiers = max_tiers
+        self.tiers = OrderedDict()
+
+    def tier(self, width, height, ratio):
+        """Returns the sprites rendered at this size, marking the tier as recently used."""
+        key = (width, height, ratio)
+        tier = self.tiers.get(key)
+        if tier is None:
+            tier = self.tiers[key] = {}
+            if len(self.tiers) > self.max_tiers:
+                self.tiers.popitem(last=False)  # Drop the least recently used zoom level
+        else:
+            self.tiers.move_to_end(key)
+        return tier
+
+    def get(self, relative_path, width, height, ratio=1.0, scale=None):
+        """Returns the sprite at the given size, rendering it on a cache miss."""
+        tier = self.tier(width, height, ratio)
+        try:
+            return tier[relative_path]
+        except KeyError:
+            pixmap = tier[relative_path] = render_pixmap(relative_path, width, height, ratio, scale)
+            return pixmap
+
+
+sprite_cache = SpriteCache()  # Shared by all widgets
+
+
+class LazyRenderers:
+    """Maps resource keys to SVG renderers, parsing each file on first use."""
+    def __init__(self, paths):
+        self.paths = paths
+        self.loaded = {}
+
+    def get(self, key):
+        """Returns the renderer for `key`, or None if it is unknown or failed to load."""
+        try:
+            return self.loaded[key]
+        except KeyError:
+            path = self.paths.get(key)
+            renderer = load_svg_renderer(path) if path else None
+            self.loaded[key] = renderer
+            return renderer
+
+    def pixmap(self, key, width, height, ratio=1.0, scale=None):
+        """Returns the sprite for `key` rasterized at the given size, or None."""
+        path = self.paths.get(key)
+        return sprite_cache.get(path, width, height, ratio, scale) if path else None
+
+    def prerender(self, width, height, ratio=1.0, scale=None, keys=None):
+        """Rasterizes the given keys (all by default) at a size before they are painted."""
+        for key in self.paths if keys is None else keys:
+            self.pixmap(key, width, height, ratio, scale)
+
+    def preload(self, keys=None):
+        """Loads the given keys (all by default) immediately."""
+        for key in self.paths if keys is None else keys:
+            self.get(key)
@@ -1,12 +1,21 @@
+import atexit
+import os
 import sys
 from PyQt6 import QtWidgets
+from game.profiling import profiler, configure as configure_profiling
 from gui.main_window import MainWindow
 
 def main():
+    # MINESWEEPER_PROFILE=stdout,jsonl:run.jsonl,pstats:run.prof enables the game profiler
+    profile_spec = os.environ.get('MINESWEEPER_PROFILE')
+    if profile_spec:
+        configure_profiling(profile_spec)
+        atexit.register(profiler.disable)
+
     app = QtWidgets.QApplication(sys.argv)
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
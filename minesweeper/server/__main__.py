@@ -0,0 +1,54 @@
+"""Runs the headless game server from the `minesweeper` directory:
+
+    python -m server --port 8765
+
+As a worker behind `server.router` it listens on a Unix socket and, when
+stopped with SIGTERM, hands its games to its successor through a snapshot:
+
+    python -m server --unix /tmp/worker-0.sock --snapshot /tmp/worker-0.snapshot
+"""
+import argparse
+import asyncio
+import signal
+from server.game_server import GameServer
+
+
+async def serve(host, port, unix=None, snapshot=None):
+    game_server = GameServer(routed=unix is not None)
+    if snapshot:
+        restored = game_server.load_snapshot(snapshot)
+        if restored:
+            print(f"Restored {restored} games from {snapshot}", flush=True)
+    if unix:
+        server = await game_server.start_unix(unix)
+        addresses = unix
+    else:
+        server = await game_server.start(host, port)
+        addresses = ", ".join("%s:%d" % socket.getsockname()[:2] for socket in server.sockets)
+    print(f"Listening on {addresses}", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(stop_signal, stop.set)
+    async with server:
+        await stop.wait()
+        if snapshot:
+            game_server.save_snapshot(snapshot)  # Before connections close and their games are dropped
+        game_server.disconnect_all()
+        while game_server.connections:
+            await asyncio.sleep(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Minesweeper game server (JSON lines over TCP).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help="0 picks a free port")
+    parser.add_argument('--unix', help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--snapshot', help="restore games from this file at start, save them to it on SIGTERM")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.unix, args.snapshot))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""Headless game server over TCP, one JSON object per line.
+
+Requests (client to server):
+
+    {"op": "new", "rows": 16, "cols": 30, "mines": 99, "seed": 1}   seed is optional; game, the id, is
+                                                                     given only by `server.router`
+    {"op": "join", "game": 7}                                        play an existing game
+    {"op": "watch", "game": 7}                                       spectate, read only
+    {"op": "action", "game": 7, "action": "reveal", "row": 3, "col": 4}   reveal, flag or chord
+    {"op": "leave", "game": 7}
+    {"op": "hello", "format": "binary"}   switch this connection to binary frames
+    {"op": "ping"}                        answered with "pong" once earlier requests are done
+
+Replies and pushes (server to client):
+
+    {"op": "created", "game": 7, "rows": 16, "cols": 30, "mines": 99, "seed": 1}
+    {"op": "state", "game": 7, "seq": 12, "grid": "99990...", ...}   full board on join/watch
+    {"op": "delta", "game": 7, "seq": 13, "cells": [[index, code], ...], "game_over": false, ...}
+    {"op": "error", "error": "..."}
+
+Grid and cell codes are those of `game.automation` (0-8 numbers, 9 hidden, ...);
+the grid is one hex digit per cell. Every player and spectator of a game
+receives each delta, so only the changed cells cross the wire.
+
+After "hello" with format "binary", everything the server sends is a
+length-prefixed frame of `server.protocol`: deltas and keyframes instead of
+"delta" and "state", other replies as JSON message frames. Requests stay JSON.
+"""
+import asyncio
+import itertools
+import json
+import os
+from game import serialization
+from game.automation import GameEnv, ACTION_NAMES
+from server.protocol import DeltaStream, encode_message, LENGTH
+
+MAX_SIZE = 100
+MAX_GAME_ID = 2**32 - 1  # Game ids are uint32 in binary frames
+IDLE_GAMES_PER_SIZE = 1000  # Finished games kept per board size for reuse
+GRID_DIGITS = "0123456789abcdef"
+
+
+def encode(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b"\n"
+
+
+class HostedGame:
+    """A game held in memory with the connections that follow it."""
+    def __init__(self, game_id, env, seq=0):
+        self.id = game_id
+        self.env = env
+        self.lock = asyncio.Lock()  # Serializes actions and the order of their deltas
+        self.stream = DeltaStream(game_id, env, seq=seq)  # Binary frames; its sequence number counts the deltas sent
+        self.players = set()
+        self.spectators = set()
+
+    def state(self):
+        game = self.env.game
+        return {"op": "state", "game": self.id, "seq": self.stream.seq, "rows": game.rows, "cols": game.cols,
+                "mines": game.mines, "mines_left": game.mines_left, "game_over": game.game_over,
+                "won": self.env.won, "grid": "".join(GRID_DIGITS[code] for code in self.env.grid)}
+
+
+class Connection:
+    def __init__(self, writer):
+        self.writer = writer
+        self.games = {}  # Game id -> HostedGame this connection plays or watches
+        self.binary = False
+
+    def send(self, message):
+        if self.binary:
+            self.send_frame(encode_message(message.get("game", 0), message))
+        else:
+            self.writer.write(encode(message))
+
+    def send_frame(self, frame):
+        self.writer.write(LENGTH.pack(len(frame)) + frame)
+
+
+class GameServer:
+    """Hosts any number of games for any number of connections in one event loop.
+
+    With `routed`, as a worker behind `server.router`, "new" requests carry the id the router assigned.
+    """
+    def __init__(self, routed=False):
+        self.routed = routed
+        self.games = {}
+        self.ids = itertools.count(1)
+        self.idle = {}  # (rows, cols, mines) -> GameEnvs of ended games, restarted in place for new ones
+        self.connections = set()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def start_unix(self, path):
+        """Listens on a Unix socket, e.g. as a worker behind `server.router`."""
+        return await asyncio.start_unix_server(self.handle, path)
+
+    def save_snapshot(self, path):
+        """Writes every hosted game with the state serializer, so a restarted server can take them over."""
+        states = [serialization.encode_game(game.env.game, id=game.id, seq=game.stream.seq)
+                  for game in self.games.values()]
+        serialization.save(path, {"games": states})
+
+    def load_snapshot(self, path):
+        """Restores the games of a snapshot and removes it. Returns the number of games restored."""
+        if not os.path.exists(path):
+            return 0
+        states = serialization.load(path)["games"]
+        for state in states:
+            env = GameEnv.from_game(serialization.decode_game(state))
+            self.games[state["id"]] = HostedGame(state["id"], env, state["seq"])
+        os.remove(path)
+        return len(states)
+
+    def disconnect_all(self):
+        """Closes every connection, e.g. to shut down without cancelling their handlers."""
+        for connection in self.connections:
+            connection.writer.close()
+
+    async def handle(self, reader, writer):
+        connection = Connection(writer)
+        self.connections.add(connection)
+        try:
+            async for line in reader:
+                try:
+                    await self.dispatch(connection, json.loads(line))
+                except KeyError as e:
+                    connection.send({"op": "error", "error": f"Missing field {e}"})
+                except (ValueError, TypeError) as e:
+                    connection.send({"op": "error", "error": str(e)})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game in list(connection.games.values()):
+                self.leave(connection, game)
+            self.connections.discard(connection)
+            writer.close()
+
+    async def dispatch(self, connection, message):
+        op = message["op"]
+        if op == "hello":
+            if message["format"] not in ("json", "binary"):
+                raise ValueError(f"Unknown format: {message['format']!r}")
+            connection.binary = message["format"] == "binary"
+            connection.send({"op": "hello", "format": message["format"]})
+            return
+        if op == "ping":
+            connection.send({"op": "pong"})
+            return
+        if op == "new":
+            if "game" in message and not self.routed:
+                raise ValueError("Game ids are assigned by the server")
+            self.create(connection, int(message["rows"]), int(message["cols"]), int(message["mines"]),
+                        message.get("seed"), message.get("game"))
+            return
+        game = self.games.get(message["game"])
+        if game is None:
+            raise ValueError(f"No game {message['game']}")
+        if op == "action":
+            if connection not in game.players:
+                raise ValueError(f"Not a player of game {game.id}")
+            action = ACTION_NAMES.get(message["action"])
+            if action is None:
+                raise ValueError(f"Unknown action: {message['action']!r}")
+            await self.act(game, action, int(message["row"]), int(message["col"]))
+        elif op in ("join", "watch"):
+            (game.players if op == "join" else game.spectators).add(connection)
+            connection.games[game.id] = game
+            if connection.binary:
+                for frame in game.stream.catch_up():
+                    connection.send_frame(frame)
+            else:
+                connection.send(game.state())
+        elif op == "leave":
+            self.leave(connection, game)
+        else:
+            raise ValueError(f"Unknown op: {op!r}")
+
+    def create(self, connection, rows, cols, mines, seed=None, game_id=None):
+        """Starts a game; `game_id` is given by a router that assigns ids across servers."""
+        if not (1 <= rows <= MAX_SIZE and 1 <= cols <= MAX_SIZE and 0 < mines < rows * cols):
+            raise ValueError(f"Invalid board: {rows}x{cols} with {mines} mines")
+        if game_id is None:
+            game_id = next(self.ids)
+            while game_id in self.games:  # Taken by a restored game
+                game_id = next(self.ids)
+        elif game_id.__class__ is not int or not 0 <= game_id <= MAX_GAME_ID:
+            raise ValueError(f"Invalid game id: {game_id!r}")
+        elif game_id in self.games:
+            raise ValueError(f"Game {game_id} already exists")
+        idle = self.idle.get((rows, cols, mines))
+        if idle:
+            env = idle.pop()
+            env.reset(seed)
+        else:
+            env = GameEnv(rows, cols, mines, seed)
+        game = HostedGame(game_id, env)
+        self.games[game.id] = game
+        game.players.add(connection)
+        connection.games[game.id] = game
+        connection.send({"op": "created", "game": game.id, "rows": rows, "cols": cols, "mines": mines,
+                         "seed": game.env.game.seed})
+
+    async def act(self, game, action, row, col):
+        """Applies an action and sends the changed cells to everyone following the game."""
+        async with game.lock:
+            env = game.env
+            cells = env.apply_actions(((action, row, col),))
+            frame = game.stream.delta(cells)
+            message = None
+            followers = game.players | game.spectators
+            for connection in followers:
+                # Encoded once for every follower
+                if connection.binary:
+                    connection.send_frame(frame)
+                    continue
+                if message is None:
+                    message = encode({"op": "delta", "game": game.id, "seq": game.stream.seq, "cells": cells,
+                                      "game_over": env.done, "won": env.won, "mines_left": env.game.mines_left})
+                connection.writer.write(message)
+            if len(followers) > 1:
+                # Players of the same game wait for slow followers instead of queueing deltas without bound;
+                # the acting connection itself is drained after its request
+                await asyncio.gather(*(connection.writer.drain() for connection in followers))
+
+    def leave(self, connection, game):
+        game.players.discard(connection)
+        game.spectators.discard(connection)
+        connection.games.pop(game.id, None)
+        if not game.players and not game.spectators:
+            del self.games[game.id]  # Nobody left to play or watch it
+            game_env = game.env.game
+            idle = self.idle.setdefault((game_env.rows, game_env.cols, game_env.mines), [])
+            if len(idle) < IDLE_GAMES_PER_SIZE:
+                idle.append(game.env)
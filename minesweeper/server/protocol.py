@@ -0,0 +1,225 @@
+"""Compact binary frames for keeping remote copies of a board in sync.
+
+Every frame starts with kind, game id and sequence number. A keyframe holds
+the whole visible board, one 4-bit cell code (see `game.automation`) per
+cell. A delta holds the cells changed by one action, as runs of consecutive
+cells or as a bitset over the board, whichever is smaller, followed by
+their codes. Delta n applies to the state after frame n - 1; a client that
+misses one waits for the next keyframe. On a stream, frames are prefixed
+with their length.
+"""
+import json
+import struct
+
+KEYFRAME = 0
+DELTA = 1
+MESSAGE = 2  # A JSON reply on a binary connection
+
+HEADER = struct.Struct('<BII')  # kind, game id, sequence number
+STATUS = struct.Struct('<hB')  # mines left, status bits
+DIMENSIONS = struct.Struct('<BB')  # rows, cols
+LENGTH = struct.Struct('<I')  # Frame length prefix on a stream
+GAME_OVER = 1
+WON = 2
+RUNS = 0
+BITSET = 1
+LOW_NIBBLE = bytes(byte & 15 for byte in range(256))
+HIGH_NIBBLE = bytes(byte >> 4 for byte in range(256))
+TO_HIGH_NIBBLE = bytes((byte << 4) & 0xff for byte in range(256))
+
+
+class OutOfSync(ValueError):
+    """A delta does not follow the state it would be applied to."""
+
+
+def pack_codes(codes):
+    """Packs cell codes (0-15) two to a byte, the first in the low nibble."""
+    codes = bytes(codes)
+    low = codes[::2]
+    high = codes[1::2].translate(TO_HIGH_NIBBLE).ljust(len(low), b'\0')
+    # Nibbles never overlap, so one OR of the two as big integers combines every byte
+    return (int.from_bytes(low, 'little') | int.from_bytes(high, 'little')).to_bytes(len(low), 'little')
+
+
+def unpack_codes(data, count):
+    codes = bytearray(2 * len(data))
+    codes[::2] = data.translate(LOW_NIBBLE)
+    codes[1::2] = data.translate(HIGH_NIBBLE)
+    return codes[:count]
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def status_bits(game_over, won):
+    return (GAME_OVER if game_over else 0) | (WON if won else 0)
+
+
+def encode_keyframe(game_id, seq, rows, cols, grid, mines_left, game_over=False, won=False):
+    """Encodes the whole visible board."""
+    return b''.join((HEADER.pack(KEYFRAME, game_id, seq), STATUS.pack(mines_left, status_bits(game_over, won)),
+                     DIMENSIONS.pack(rows, cols), pack_codes(grid)))
+
+
+def encode_delta(game_id, seq, cells, size, mines_left, game_over=False, won=False):
+    """Encodes the (index, code) pairs changed by one action, sorted by index, on a board of `size` cells."""
+    codes = pack_codes(code for _, code in cells)
+
+    runs = bytearray([RUNS])
+    spans = []
+    for index, _ in cells:
+        if spans and spans[-1][1] == index:
+            spans[-1][1] += 1
+        else:
+            spans.append([index, index + 1])
+    write_varint(runs, len(spans))
+    end = 0
+    for start, stop in spans:
+        write_varint(runs, start - end)  # Gap since the previous run
+        write_varint(runs, stop - start)
+        end = stop
+
+    if len(runs) > (size + 7) // 8 + 1:
+        bits = bytearray((size + 7) // 8)
+        for index, _ in cells:
+            bits[index >> 3] |= 1 << (index & 7)
+        body = bytes([BITSET]) + bits
+    else:
+        body = bytes(runs)
+    return b''.join((HEADER.pack(DELTA, game_id, seq), STATUS.pack(mines_left, status_bits(game_over, won)),
+                     body, codes))
+
+
+def encode_message(game_id, message):
+    return HEADER.pack(MESSAGE, game_id, 0) + json.dumps(message, separators=(',', ':')).encode()
+
+
+def decode_frame(frame, size=None):
+    """Decodes a frame into a dict. Deltas need the board `size` (rows * cols).
+
+    Raises ValueError for a truncated or malformed frame.
+    """
+    try:
+        kind, game_id, seq = HEADER.unpack_from(frame, 0)
+        if kind == MESSAGE:
+            return {"kind": kind, "game": game_id, "message": json.loads(frame[HEADER.size:])}
+        mines_left, status = STATUS.unpack_from(frame, HEADER.size)
+        decoded = {"kind": kind, "game": game_id, "seq": seq, "mines_left": mines_left,
+                   "game_over": bool(status & GAME_OVER), "won": bool(status & WON)}
+        position = HEADER.size + STATUS.size
+        if kind == KEYFRAME:
+            rows, cols = DIMENSIONS.unpack_from(frame, position)
+            position += DIMENSIONS.size
+            if len(frame) - position != (rows * cols + 1) // 2:
+                raise ValueError("Keyframe size does not match its board")
+            decoded.update(rows=rows, cols=cols, grid=unpack_codes(frame[position:], rows * cols))
+            return decoded
+        if kind != DELTA:
+            raise ValueError(f"Unknown frame kind {kind}")
+        if size is None:
+            raise ValueError("Decoding a delta needs the board size")
+
+        encoding = frame[position]
+        position += 1
+        if encoding == RUNS:
+            count, position = read_varint(frame, position)
+            indices = []
+            end = 0
+            for _ in range(count):
+                gap, position = read_varint(frame, position)
+                length, position = read_varint(frame, position)
+                if end + gap + length > size:
+                    raise ValueError("Delta run past the end of its board")
+                indices.extend(range(end + gap, end + gap + length))
+                end += gap + length
+        elif encoding == BITSET:
+            bits = frame[position:position + (size + 7) // 8]
+            if len(bits) != (size + 7) // 8:
+                raise ValueError("Truncated bitset")
+            position += len(bits)
+            indices = [offset * 8 + bit for offset, byte in enumerate(bits) if byte
+                       for bit in range(8) if byte >> bit & 1]
+            if indices and indices[-1] >= size:
+                raise ValueError("Delta bit past the end of its board")
+        else:
+            raise ValueError(f"Unknown delta encoding {encoding}")
+        if len(frame) - position != (len(indices) + 1) // 2:
+            raise ValueError("Delta does not match its board")
+        decoded["cells"] = list(zip(indices, unpack_codes(frame[position:], len(indices))))
+        return decoded
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Truncated frame: {e}")
+
+
+class BoardReplica:
+    """A client's copy of one board, kept current by applying frames."""
+    def __init__(self):
+        self.seq = None  # None until the first keyframe
+        self.rows = self.cols = 0
+        self.grid = bytearray()
+        self.mines_left = 0
+        self.game_over = self.won = False
+
+    def apply(self, frame):
+        """Applies an encoded frame. Raises OutOfSync for a delta that does not follow the current state."""
+        decoded = decode_frame(frame, self.rows * self.cols)
+        if decoded["kind"] == KEYFRAME:
+            self.rows, self.cols, self.grid = decoded["rows"], decoded["cols"], decoded["grid"]
+        elif decoded["kind"] == DELTA:
+            if self.seq is None or decoded["seq"] != self.seq + 1:
+                raise OutOfSync(f"Delta {decoded['seq']} does not follow state {self.seq}")
+            grid = self.grid
+            for index, code in decoded["cells"]:
+                grid[index] = code
+        else:
+            return decoded
+        self.seq = decoded["seq"]
+        self.mines_left, self.game_over, self.won = decoded["mines_left"], decoded["game_over"], decoded["won"]
+        return decoded
+
+
+class DeltaStream:
+    """The frames of one game: a keyframe every `keyframe_interval` deltas, so late joiners can catch up."""
+    def __init__(self, game_id, env, keyframe_interval=64, seq=0):
+        self.game_id = game_id
+        self.env = env
+        self.keyframe_interval = keyframe_interval
+        self.seq = seq  # Continues from a restored game's last delta
+        self.frames = []  # The latest keyframe and the deltas after it
+        self.keyframe()
+
+    def keyframe(self):
+        env = self.env
+        frame = encode_keyframe(self.game_id, self.seq, env.game.rows, env.game.cols, env.grid,
+                                env.game.mines_left, env.done, env.won)
+        self.frames = [frame]
+        return frame
+
+    def delta(self, cells):
+        """Encodes the cells changed by an action and returns the frame."""
+        env = self.env
+        self.seq += 1
+        frame = encode_delta(self.game_id, self.seq, cells, len(env.grid), env.game.mines_left, env.done, env.won)
+        self.frames.append(frame)
+        if len(self.frames) > self.keyframe_interval:
+            self.keyframe()  # Same state as the delta, for clients that join from here on
+        return frame
+
+    def catch_up(self):
+        """Frames that bring a new client to the current state."""
+        return list(self.frames)
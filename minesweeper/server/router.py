@@ -0,0 +1,330 @@
+"""Spreads games over several server processes behind one TCP address.
+
+The router starts --workers `python -m server` processes, each listening on
+a Unix socket and owning the games whose ids hash to it on a consistent
+hash ring. Clients speak the protocol of `server.game_server` to the router,
+which assigns game ids, forwards each request to the game's worker and
+relays the replies unparsed. SIGHUP restarts the workers one at a time:
+each saves its games with the state serializer, its successor restores
+them, and the router rejoins the games its clients were following. Run it
+from the `minesweeper` directory:
+
+    python -m server.router --workers 4 --port 8765
+"""
+import argparse
+import asyncio
+import bisect
+import hashlib
+import itertools
+import json
+import os
+import signal
+import sys
+import tempfile
+from game import serialization
+from server.game_server import encode
+from server.protocol import encode_message, HEADER, LENGTH, MESSAGE
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JSON_REPLY = b'{"op'  # How every JSON reply starts; as a frame length prefix it would be 1.8 GB
+HELLO_REPLY = b'{"op":"hello"'
+PONG_REPLY = b'{"op":"pong"'
+RETRY_SECONDS = 0.1
+SYNC_SECONDS = 5.0  # How long a restart waits for a worker to answer the requests it was sent
+
+
+def ring_hash(key):
+    return int.from_bytes(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), 'little')
+
+
+class HashRing:
+    """Consistent hashing: adding or removing a node only moves the keys next to its points."""
+    def __init__(self, nodes, replicas=64):
+        points = sorted((ring_hash(f"{node}:{replica}"), node) for node in nodes for replica in range(replicas))
+        self.hashes = [point for point, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def node_for(self, key):
+        return self.nodes[bisect.bisect(self.hashes, ring_hash(key)) % len(self.hashes)]
+
+
+class Worker:
+    """One server process and the socket and snapshot file it uses."""
+    def __init__(self, index, directory):
+        self.index = index
+        self.path = os.path.join(directory, f"worker-{index}.sock")
+        self.snapshot = os.path.join(directory, f"worker-{index}.snapshot")
+        self.process = None
+        self.ready = asyncio.Event()  # Cleared while the process is (re)starting
+
+
+class Upstream:
+    """A client session's connection to one worker, reopened whenever the worker restarts."""
+    def __init__(self, session, worker):
+        self.session = session
+        self.worker = worker
+        self.writer = None
+        self.ready = asyncio.Event()
+        self.hellos = 0  # Replies to "hello" that the router answered itself and drops
+        self.pongs = []  # Futures for the replies to the router's own pings
+        self.following = {}  # Game id -> "join" or "watch", to rejoin after a restart
+        self.task = asyncio.create_task(self.run())
+
+    async def send(self, data):
+        if not self.ready.is_set():
+            await self.ready.wait()
+        self.writer.write(data)
+
+    def hello(self, binary):
+        self.hellos += 1
+        self.writer.write(encode({"op": "hello", "format": "binary" if binary else "json"}))
+
+    async def sync(self):
+        """Waits until the worker has answered everything sent before; call with `ready` cleared."""
+        pong = asyncio.get_running_loop().create_future()
+        self.pongs.append(pong)
+        self.writer.write(encode({"op": "ping"}))
+        try:
+            await asyncio.wait_for(pong, SYNC_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self):
+        while True:
+            await self.worker.ready.wait()
+            try:
+                reader, self.writer = await asyncio.open_unix_connection(self.worker.path)
+            except OSError:
+                await asyncio.sleep(RETRY_SECONDS)  # Died before the router noticed
+                continue
+            if not self.worker.ready.is_set():  # Connected to a worker that is being stopped
+                self.writer.close()
+                continue
+            self.hellos = 0
+            self.pongs.clear()
+            if self.session.binary:
+                self.hello(True)
+            for game_id, op in self.following.items():
+                self.writer.write(encode({"op": op, "game": game_id}))
+            self.ready.set()
+            try:
+                await self.relay(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                pass
+            self.ready.clear()
+            self.writer.close()
+
+    async def relay(self, reader):
+        """Copies whole replies to the client until the worker goes away.
+
+        A worker answers "hello" in the new format, so each reply is told apart by its first bytes.
+        """
+        client = self.session.writer
+        while True:
+            prefix = await reader.readexactly(LENGTH.size)
+            if prefix == JSON_REPLY:
+                reply = message = prefix + await reader.readuntil(b"\n")
+            else:
+                frame = await reader.readexactly(LENGTH.unpack(prefix)[0])
+                reply = prefix + frame
+                message = frame[HEADER.size:] if frame[0] == MESSAGE else None
+            if message is not None and (self.hellos or self.pongs):
+                if self.hellos and message.startswith(HELLO_REPLY):
+                    self.hellos -= 1
+                    continue
+                if self.pongs and message.startswith(PONG_REPLY):
+                    self.pongs.pop(0).set_result(None)
+                    continue
+            client.write(reply)
+            await client.drain()
+
+    def close(self):
+        self.task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+
+class Session:
+    """A client connection and its upstream connections, opened on first use."""
+    def __init__(self, writer):
+        self.writer = writer
+        self.binary = False
+        self.upstreams = {}  # Worker index -> Upstream
+
+    def send(self, message):
+        if self.binary:
+            frame = encode_message(message.get("game", 0), message)
+            self.writer.write(LENGTH.pack(len(frame)) + frame)
+        else:
+            self.writer.write(encode(message))
+
+    def upstream(self, worker):
+        upstream = self.upstreams.get(worker.index)
+        if upstream is None:
+            upstream = self.upstreams[worker.index] = Upstream(self, worker)
+        return upstream
+
+    def close(self):
+        for upstream in self.upstreams.values():
+            upstream.close()
+
+
+class Router:
+    """Runs the workers and routes every client request to the worker that owns its game."""
+    def __init__(self, workers, directory):
+        self.directory = directory
+        self.workers = [Worker(index, directory) for index in range(workers)]
+        self.ring = HashRing(range(workers))
+        self.ids = itertools.count(self.restored_ids() + 1)
+        self.sessions = set()
+        self.restarting = None
+        self.stopping = False
+
+    def restored_ids(self):
+        """The highest game id in the workers' snapshots, so new games do not reuse restored ids."""
+        highest = 0
+        for worker in self.workers:
+            if os.path.exists(worker.snapshot):
+                highest = max([highest] + [state["id"] for state in serialization.load(worker.snapshot)["games"]])
+        return highest
+
+    def worker_for(self, game_id):
+        return self.workers[self.ring.node_for(game_id)]
+
+    async def start(self, host="127.0.0.1", port=8765):
+        await asyncio.gather(*(self.spawn(worker) for worker in self.workers))
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def spawn(self, worker):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, '-m', 'server', '--unix', worker.path, '--snapshot', worker.snapshot,
+            cwd=PACKAGE_DIR, stdout=asyncio.subprocess.PIPE)
+        while True:
+            line = (await process.stdout.readline()).decode()
+            if not line:
+                raise RuntimeError(f"Worker {worker.index} exited during startup")
+            if line.startswith("Listening on"):
+                break
+            print(f"worker {worker.index}: {line.rstrip()}", flush=True)
+        worker.process = process
+        worker.ready.set()
+        asyncio.create_task(self.supervise(worker, process))
+
+    async def supervise(self, worker, process):
+        """Replaces a worker that exits on its own; its games are lost unless it saved a snapshot."""
+        await process.wait()
+        if worker.process is process and not self.stopping:
+            print(f"worker {worker.index} exited with {process.returncode}, restarting", flush=True)
+            worker.ready.clear()
+            await self.spawn(worker)
+
+    async def stop_worker(self, worker):
+        process, worker.process = worker.process, None
+        worker.ready.clear()
+        # Hold new requests in the router and let the worker answer the ones it has, so none are lost
+        upstreams = [session.upstreams[worker.index] for session in self.sessions
+                     if worker.index in session.upstreams and session.upstreams[worker.index].ready.is_set()]
+        for upstream in upstreams:
+            upstream.ready.clear()
+        await asyncio.gather(*(upstream.sync() for upstream in upstreams))
+        if process is not None and process.returncode is None:
+            process.terminate()  # The worker saves its snapshot on SIGTERM
+            await process.wait()
+
+    async def restart(self):
+        """Restarts the workers one at a time; only the games of the restarting worker wait."""
+        for worker in self.workers:
+            await self.stop_worker(worker)
+            await self.spawn(worker)
+            print(f"worker {worker.index} restarted", flush=True)
+
+    def request_restart(self):
+        if self.restarting is None or self.restarting.done():
+            self.restarting = asyncio.create_task(self.restart())
+
+    async def stop(self):
+        self.stopping = True
+        await asyncio.gather(*(self.stop_worker(worker) for worker in self.workers))
+        for session in self.sessions:
+            session.writer.close()
+        while self.sessions:
+            await asyncio.sleep(0)
+
+    async def handle(self, reader, writer):
+        session = Session(writer)
+        self.sessions.add(session)
+        try:
+            async for line in reader:
+                try:
+                    await self.route(session, line)
+                except KeyError as e:
+                    session.send({"op": "error", "error": f"Missing field {e}"})
+                except (ValueError, TypeError) as e:
+                    session.send({"op": "error", "error": str(e)})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(session)
+            session.close()
+            writer.close()
+
+    async def route(self, session, line):
+        message = json.loads(line)
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        op = message["op"]
+        if op == "hello":
+            if message["format"] not in ("json", "binary"):
+                raise ValueError(f"Unknown format: {message['format']!r}")
+            session.binary = message["format"] == "binary"
+            for upstream in session.upstreams.values():
+                if upstream.ready.is_set():
+                    upstream.hello(session.binary)
+            session.send({"op": "hello", "format": message["format"]})
+            return
+        if op == "new":
+            message["game"] = next(self.ids)
+            line = encode(message)
+        game_id = message["game"]
+        upstream = session.upstream(self.worker_for(game_id))
+        await upstream.send(line)
+        if op in ("new", "join", "watch"):  # After sending, so a reconnection does not join before "new"
+            upstream.following[game_id] = "watch" if op == "watch" else "join"
+        elif op == "leave":
+            upstream.following.pop(game_id, None)
+
+
+async def serve(host, port, workers, directory):
+    router = Router(workers, directory)
+    server = await router.start(host, port)
+    addresses = ", ".join("%s:%d" % socket.getsockname()[:2] for socket in server.sockets)
+    print(f"Listening on {addresses}", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGHUP, router.request_restart)
+    for stop_signal in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(stop_signal, stop.set)
+    async with server:
+        await stop.wait()
+        await router.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Routes game server requests to several worker processes.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help="0 picks a free port")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--directory', help="worker sockets and snapshots; keeps games across router restarts "
+                                            "(default: a new temporary directory)")
+    args = parser.parse_args()
+    if args.directory:
+        asyncio.run(serve(args.host, args.port, args.workers, args.directory))
+    else:
+        with tempfile.TemporaryDirectory(prefix="minesweeper-router-") as directory:
+            asyncio.run(serve(args.host, args.port, args.workers, directory))
+
+
+if __name__ == '__main__':
+    main()
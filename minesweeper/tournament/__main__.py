@@ -0,0 +1,51 @@
+"""Runs a tournament from the `minesweeper` directory:
+
+    python -m tournament --seeds 1-100 --policies random single-point --replays submitted.jsonl
+
+Every policy plays every board and every submitted replay is verified, in
+a process pool. Results are written to --results as they finish, one JSON
+line per game, and the ranking is printed at the end.
+"""
+import argparse
+import time
+from game.replay import load_replays, HUMAN_LIMITS
+from game.minesweeper_game import DIFFICULTIES
+from tournament.common import parse_seeds
+from tournament.policies import POLICIES
+from tournament.runner import RANKINGS, rank, run_tournament, tournament_board
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays bot policies and verifies replays on the same boards.")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert')
+    parser.add_argument('--seeds', type=parse_seeds, default=parse_seeds('1-100'), help="e.g. 1-100,250")
+    parser.add_argument('--policies', nargs='*', choices=POLICIES, default=list(POLICIES))
+    parser.add_argument('--replays', nargs='*', default=[], help="submitted replays: .json or .jsonl files")
+    parser.add_argument('--results', default='tournament-results.jsonl')
+    parser.add_argument('--save-replays', metavar='PATH', help="write the bots' replays to this .jsonl file")
+    parser.add_argument('--rank-by', choices=RANKINGS, default='time_ms', help="order among equal win counts")
+    parser.add_argument('--processes', type=int, help="default: one per CPU")
+    parser.add_argument('--no-input-limits', action='store_true',
+                        help="accept submitted replays with inputs faster than a person can make")
+    args = parser.parse_args()
+
+    rows, cols, mines = DIFFICULTIES[args.difficulty]
+    boards = [(seed, tournament_board(rows, cols, mines, seed)) for seed in args.seeds]
+    replays = [replay for path in args.replays for replay in load_replays(path)]
+    start = time.perf_counter()
+    results = run_tournament(boards, args.policies, replays, args.results, args.save_replays, args.processes,
+                             None if args.no_input_limits else HUMAN_LIMITS)
+    elapsed = time.perf_counter() - start
+
+    rejected = [result for result in results if "error" in result]
+    print(f"{len(results)} games in {elapsed:.1f}s ({len(results) / elapsed:.0f}/s), "
+          f"{len(rejected)} replays rejected; results in {args.results}")
+    print(f"{'rank':>4} {'player':20} {'boards':>6} {'wins':>5} {'time (s)':>9} {'3BV/s':>7} {'efficiency':>10}")
+    for position, player in enumerate(rank(results, args.rank_by), 1):
+        seconds = f"{player['time_ms'] / 1000:9.2f}" if player['time_ms'] is not None else f"{'-':>9}"
+        print(f"{position:4d} {str(player['player']):20} {player['boards']:6d} {player['wins']:5d} {seconds} "
+              f"{player['bbbv_per_second']:7.1f} {player['efficiency']:10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Rates how hard boards are, from the `minesweeper` directory:
+
+    python -m tournament.classify --seeds 1-10000 --output expert.csv
+    python -m tournament.classify --saves saved-games/ 16x30x99-m... --output boards.csv
+
+Each board gets its 3BV, its openings, the guesses a reference solver needs
+to clear it and the largest frontier component the solver meets, written
+as one CSV row per board in input order; a board that cannot be read
+gets a row with only its source and the error. Seed boards have their mines
+placed around the center cell, as in a tournament. Boards are rated in a
+pool of worker processes, with no Qt.
+"""
+import argparse
+import csv
+import multiprocessing
+import time
+from pathlib import Path
+from game.automation import HIDDEN, FLAGGED
+from game.board_code import board_code, encode_seed_code
+from game.minesweeper_game import DIFFICULTIES, neighbor_table
+from game.replay import prepare_game
+from game.solver import frontier_components, mine_probabilities
+from game import serialization
+from tournament.common import parse_seeds
+from tournament.policies import center
+
+COLUMNS = ("source", "board", "rows", "cols", "mines", "bbbv", "openings", "guesses", "largest_component", "error")
+SAVE_SUFFIXES = (".json", ".z", ".xz")
+_games = {}  # Games reused by the boards one worker process rates
+
+
+def reference_solve(numbers, mines, rows, cols, start):
+    """Clears a board the way a careful player would and returns (guesses, largest frontier component).
+
+    `numbers` holds each cell's mine count, or None for a mine. Opens `start`, then applies single-point
+    deductions, then the exact probabilities of `game.solver`. When nothing is certain it counts a guess
+    and opens the least likely cell that is actually safe, so every board is cleared.
+    """
+    neighbors = neighbor_table(rows, cols)
+    grid = bytearray([HIDDEN]) * (rows * cols)
+    hidden_safe = sum(1 for number in numbers if number is not None)
+    pending = []  # Revealed numbers to look at again
+    queued = bytearray(rows * cols)
+    guesses = largest = 0
+    cache = {}
+
+    def recheck(i):
+        for j in neighbors[i]:
+            if grid[j] <= 8 and not queued[j]:
+                queued[j] = 1
+                pending.append(j)
+
+    def reveal(i):
+        nonlocal hidden_safe
+        grid[i] = numbers[i]
+        hidden_safe -= 1
+        stack = [i]
+        while stack:
+            j = stack.pop()
+            recheck(j)
+            if numbers[j] == 0:
+                for k in neighbors[j]:
+                    if grid[k] == HIDDEN:
+                        grid[k] = numbers[k]
+                        hidden_safe -= 1
+                        stack.append(k)
+
+    reveal(start)
+    while hidden_safe:
+        while pending:
+            i = pending.pop()
+            queued[i] = 0
+            hidden = [j for j in neighbors[i] if grid[j] == HIDDEN]
+            if not hidden:
+                continue
+            flagged = sum(1 for j in neighbors[i] if grid[j] == FLAGGED)
+            if flagged == grid[i]:
+                for j in hidden:
+                    if grid[j] == HIDDEN:
+                        reveal(j)
+            elif flagged + len(hidden) == grid[i]:
+                for j in hidden:
+                    grid[j] = FLAGGED
+                    recheck(j)
+        if not hidden_safe:
+            break
+
+        snapshot = bytes(grid)
+        components = frontier_components(snapshot, rows, cols)
+        largest = max(largest, max((len(cells) for cells, _ in components), default=0))
+        probabilities = mine_probabilities(snapshot, rows, cols, mines, cache=cache, components=components)
+        certain = False
+        for i, probability in probabilities.items():
+            if grid[i] != HIDDEN:  # Opened by an earlier cell's cascade
+                continue
+            if probability == 0:
+                reveal(i)
+                certain = True
+            elif probability == 1:
+                grid[i] = FLAGGED
+                recheck(i)
+                certain = True
+        if not certain:
+            guesses += 1
+            reveal(min((i for i in probabilities if numbers[i] is not None), key=lambda i: (probabilities[i], i)))
+    return guesses, largest
+
+
+def classify_game(game):
+    """Rates the board of a game whose mines are placed; returns the row without its source."""
+    game.compute_bbbv()
+    numbers = [None if cell['mine'] else cell['neighbor'] for cell in game.cells]
+    start = center(game.rows, game.cols)
+    if numbers[start] is None:  # Not a tournament board: open the first safe cell instead
+        start = numbers.index(0) if 0 in numbers else next(i for i, number in enumerate(numbers) if number is not None)
+    guesses, largest = reference_solve(numbers, game.mines, game.rows, game.cols, start)
+    return {"board": board_code(game), "rows": game.rows, "cols": game.cols, "mines": game.mines,
+            "bbbv": game.bbbv, "openings": game.openings, "guesses": guesses, "largest_component": largest}
+
+
+def classify(task):
+    """Rates one board in a worker process: ("code", code) or ("save", path). Errors become a row too."""
+    kind, source = task
+    try:
+        if kind == "code":
+            game = prepare_game(source, _games)
+        else:
+            game = serialization.decode_game(serialization.load(source))
+        if not game.mines_placed:  # A seed names a tournament board
+            game.place_mines(*divmod(center(game.rows, game.cols), game.cols))
+        return {"source": str(source), **classify_game(game)}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return {"source": str(source), "error": str(e)}
+
+
+def save_files(directory):
+    """The saved games in a directory and its subdirectories, in a stable order."""
+    return sorted(str(path) for path in Path(directory).rglob('*')
+                  if path.is_file() and path.name.endswith(SAVE_SUFFIXES))
+
+
+def classify_boards(tasks, output_path, processes=None):
+    """Rates the boards of `tasks` in a process pool and writes them as CSV; returns how many were rated."""
+    chunksize = max(1, min(64, len(tasks) // (4 * (processes or multiprocessing.cpu_count()))))
+    count = 0
+    with open(output_path, 'w', newline='') as out, multiprocessing.Pool(processes) as pool:
+        writer = csv.DictWriter(out, COLUMNS, restval="")
+        writer.writeheader()
+        for row in pool.imap(classify, tasks, chunksize):  # In input order
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rates boards by 3BV, openings, guesses and frontier size.")
+    parser.add_argument('codes', nargs='*', help="board codes")
+    parser.add_argument('--seeds', type=parse_seeds, default=[], help="seed boards, e.g. 1-10000")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='expert', help="size of the seed boards")
+    parser.add_argument('--saves', nargs='*', default=[], help="saved games, or directories of them")
+    parser.add_argument('--output', default='boards.csv')
+    parser.add_argument('--processes', type=int, help="default: one per CPU")
+    args = parser.parse_args()
+
+    rows, cols, mines = DIFFICULTIES[args.difficulty]
+    tasks = [("code", code) for code in args.codes]
+    tasks += [("code", encode_seed_code(rows, cols, mines, seed)) for seed in args.seeds]
+    for path in args.saves:
+        tasks += [("save", file) for file in (save_files(path) if Path(path).is_dir() else [path])]
+    if not tasks:
+        parser.error("no boards: give codes, --seeds or --saves")
+
+    start = time.perf_counter()
+    count = classify_boards(tasks, args.output, args.processes)
+    elapsed = time.perf_counter() - start
+    print(f"{count} boards in {elapsed:.1f}s ({count / elapsed:.0f}/s); written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
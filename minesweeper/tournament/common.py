@@ -0,0 +1,10 @@
+"""Seed ranges shared by the tournament command-line tools."""
+
+
+def parse_seeds(text):
+    """Parses "1-100,250,300-310" into a list of seeds."""
+    seeds = []
+    for part in text.split(','):
+        first, _, last = part.partition('-')
+        seeds.extend(range(int(first), int(last or first) + 1))
+    return seeds
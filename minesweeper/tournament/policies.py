@@ -0,0 +1,62 @@
+"""Bot policies for tournaments.
+
+A policy sees only the visible board: it is called with the observation
+grid of `game.automation`, the board size, the number of mines not yet
+flagged and a random generator, and returns the actions to take next.
+Actions the earlier ones in the list made pointless are skipped. Every
+tournament board keeps its center cell free of mines.
+"""
+from game.automation import REVEAL, FLAG, CHORD, HIDDEN, FLAGGED
+from game.minesweeper_game import neighbor_table
+
+
+def center(rows, cols):
+    return (rows // 2) * cols + cols // 2
+
+
+def guess(grid, rng):
+    hidden = [i for i, code in enumerate(grid) if code == HIDDEN]
+    return hidden[rng.randrange(len(hidden))]
+
+
+def random_policy(grid, rows, cols, mines_left, rng):
+    """Opens the center, then reveals hidden cells at random."""
+    if all(code == HIDDEN for code in grid):
+        return [(REVEAL, *divmod(center(rows, cols), cols))]
+    return [(REVEAL, *divmod(guess(grid, rng), cols))]
+
+
+def single_point_policy(grid, rows, cols, mines_left, rng):
+    """Flags and chords around numbers whose mines are all known; guesses when stuck."""
+    if all(code == HIDDEN for code in grid):
+        return [(REVEAL, *divmod(center(rows, cols), cols))]
+    hidden_count = grid.count(HIDDEN)
+    if hidden_count == mines_left:
+        return [(FLAG, *divmod(i, cols)) for i, code in enumerate(grid) if code == HIDDEN]
+
+    actions = []
+    to_flag = set()
+    for i, code in enumerate(grid):
+        if code > 8:
+            continue
+        hidden = []
+        flagged = 0
+        for j in neighbor_table(rows, cols)[i]:
+            if grid[j] == HIDDEN:
+                hidden.append(j)
+            elif grid[j] == FLAGGED:
+                flagged += 1
+        if not hidden:
+            continue
+        if flagged == code:
+            actions.append((CHORD, *divmod(i, cols)))
+        elif flagged + len(hidden) == code:
+            to_flag.update(hidden)
+    actions.extend((FLAG, *divmod(j, cols)) for j in sorted(to_flag))
+    return actions or [(REVEAL, *divmod(guess(grid, rng), cols))]
+
+
+POLICIES = {
+    "random": random_policy,
+    "single-point": single_point_policy,
+}
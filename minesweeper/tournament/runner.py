@@ -0,0 +1,147 @@
+"""Plays bot policies and checks submitted replays on a fixed set of boards.
+
+Boards come from seeds: the mines of each are placed from its seed around
+the center cell, so the center is safe and every participant faces the
+same mines wherever they click first. Bots and submitted replays are
+scored the same way, by playing their replay again with `game.replay`.
+"""
+import json
+import multiprocessing
+import random
+from game.board_code import board_code
+from game.minesweeper_game import MinesweeperGame, neighbor_table
+from game.automation import REVEAL, FLAG, HIDDEN
+from game.replay import ReplayRecorder, ReplayError, prepare_env, verify_replay
+from tournament.policies import POLICIES, center
+
+RANKINGS = {  # Metric -> sort direction among players with the same number of wins
+    "time_ms": 1,
+    "bbbv_per_second": -1,
+    "efficiency": -1,
+}
+_envs = {}  # GameEnvs and games reused by the tasks of one worker process
+_games = {}
+_boards = frozenset()  # The tournament's boards and input limits, in each worker process
+_limits = None
+
+
+def tournament_board(rows, cols, mines, seed):
+    """The mine code of a tournament board."""
+    game = MinesweeperGame(rows, cols, mines, seed=seed)
+    game.place_mines(*divmod(center(rows, cols), cols))
+    return board_code(game)
+
+
+def worthwhile(env, action, row, col):
+    """Whether an action would still change the board; skips what earlier actions made pointless."""
+    index = row * env.game.cols + col
+    code = env.grid[index]
+    if action == REVEAL:
+        return code == HIDDEN
+    if action == FLAG:
+        return code == HIDDEN and env.game.mines_left > 0
+    return code <= 8 and any(env.grid[j] == HIDDEN for j in neighbor_table(env.game.rows, env.game.cols)[index])
+
+
+def play(policy_name, board, seed):
+    """Plays a board with a policy and returns the replay."""
+    env = prepare_env(board, _envs)
+    rows, cols = env.game.rows, env.game.cols
+    policy = POLICIES[policy_name]
+    rng = random.Random(seed)
+    recorder = ReplayRecorder(env, board, policy_name)
+    while not env.done:
+        applied = False
+        for action, row, col in policy(env.grid, rows, cols, env.game.mines_left, rng):
+            if env.done:
+                break
+            if worthwhile(env, action, row, col):
+                recorder.apply(action, row, col)
+                applied = True
+        if not applied and not env.done:  # A policy that only repeats itself gets a guess
+            hidden = [i for i, code in enumerate(env.grid) if code == HIDDEN]
+            recorder.apply(REVEAL, *divmod(hidden[rng.randrange(len(hidden))], cols))
+    return recorder.replay()
+
+
+def _init_worker(boards, limits):
+    global _boards, _limits
+    _boards = boards
+    _limits = limits
+
+
+def run_task(task):
+    """Runs one task in a worker process: ("play", policy, board, seed) or ("verify", replay).
+
+    Returns the result and, for a bot, its replay.
+    """
+    if task[0] == "play":
+        replay = play(*task[1:])
+        return verify_replay(replay, _games), replay
+    replay = task[1]
+    try:
+        if replay.get("board") not in _boards:
+            raise ReplayError("Not played on a board of this tournament")
+        return verify_replay(replay, _games, _limits), None
+    except ReplayError as e:
+        return {"player": replay.get("player"), "board": replay.get("board"), "error": str(e)}, None
+
+
+def run_tournament(boards, policies, replays, results_path, replays_path=None, processes=None, limits=None):
+    """Scores every policy on every (seed, board) and every submitted replay in a process pool.
+
+    Submitted replays must keep to the input `limits` of `game.replay.verify_replay`, if given.
+    Results are appended to `results_path` as JSON lines as they finish, bot replays to `replays_path`.
+    Returns all results.
+    """
+    tasks = [("play", policy, board, seed) for seed, board in boards for policy in policies]
+    results = []
+    played = {(policy, board) for _, board in boards for policy in policies}
+    for replay in replays:
+        key = (replay.get("player"), replay.get("board"))
+        if key in played:  # Only a player's first replay of a board counts
+            results.append({"player": key[0], "board": key[1], "error": "Board already played by this player"})
+        else:
+            played.add(key)
+            tasks.append(("verify", replay))
+    chunksize = max(1, len(tasks) // (4 * (processes or multiprocessing.cpu_count())))
+    replays_file = open(replays_path, 'w') if replays_path else None
+    try:
+        with open(results_path, 'w', buffering=1) as results_file, \
+                multiprocessing.Pool(processes, _init_worker, (frozenset(board for _, board in boards), limits)) as pool:
+            for result in results:
+                results_file.write(json.dumps(result, separators=(',', ':')) + "\n")
+            for result, replay in pool.imap_unordered(run_task, tasks, chunksize):
+                results_file.write(json.dumps(result, separators=(',', ':')) + "\n")
+                if replay is not None and replays_file:
+                    replays_file.write(json.dumps(replay, separators=(',', ':')) + "\n")
+                results.append(result)
+    finally:
+        if replays_file:
+            replays_file.close()
+    return results
+
+
+def rank(results, metric="time_ms"):
+    """Ranks players by wins, then by `metric`: mean time and 3BV/s of their wins, or mean efficiency."""
+    players = {}
+    for result in results:
+        if "error" in result:
+            continue
+        player = players.setdefault(result["player"], {"player": result["player"], "boards": 0, "wins": 0,
+                                                      "time_ms": 0, "bbbv_per_second": 0.0, "efficiency": 0.0})
+        player["boards"] += 1
+        player["efficiency"] += result["efficiency"]
+        if result["won"]:
+            player["wins"] += 1
+            player["time_ms"] += result["time_ms"]
+            player["bbbv_per_second"] += result["bbbv_per_second"]
+    for player in players.values():
+        player["efficiency"] /= player["boards"]
+        if player["wins"]:
+            player["time_ms"] /= player["wins"]
+            player["bbbv_per_second"] /= player["wins"]
+        else:
+            player["time_ms"] = None  # Ranked after every player with a win anyway
+    direction = RANKINGS[metric]
+    return sorted(players.values(), key=lambda player: (-player["wins"], direction * (player[metric] or 0)))
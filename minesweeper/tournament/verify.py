@@ -0,0 +1,101 @@
+"""Verifies submitted replays in bulk, from the `minesweeper` directory:
+
+    python -m tournament.verify submitted.jsonl --results verified.jsonl
+
+Each replay is played again on a freshly seeded game by `game.replay` in a
+pool of worker processes, with no Qt. Lines are handed to the workers in
+batches and parsed there, and a line per replay is written, in input
+order, as its batch finishes: the replay's scores, or why it was rejected.
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import re
+import time
+from game.replay import ReplayError, HUMAN_LIMITS, verify_replay
+
+BATCH_SIZE = 256  # Replays per task; large enough that pickling and scheduling cost little
+_games = {}  # Games reused by the replays one worker process verifies
+_limits = None
+
+
+def _init_worker(limits):
+    global _limits
+    _limits = limits
+
+
+def verify_lines(lines):
+    """Verifies a batch of JSON lines; returns a result or an error dict for each."""
+    results = []
+    for line in lines:
+        replay = None
+        try:
+            replay = json.loads(line)
+            if not isinstance(replay, dict):
+                raise ReplayError("A replay must be a JSON object")
+            results.append(verify_replay(replay, _games, _limits))
+        except ValueError as e:  # ReplayError and malformed JSON
+            if not isinstance(replay, dict):
+                replay = {}
+            results.append({"player": replay.get("player"), "board": replay.get("board"), "error": str(e)})
+    return results
+
+
+def summarize(error):
+    """An error message without its numbers and details, to count rejections by reason."""
+    return re.sub(r'\d+', 'N', re.sub(r' \([^)]*\)|: .*', '', error))
+
+
+def batches(paths):
+    batch = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    batch.append(line)
+                    if len(batch) == BATCH_SIZE:
+                        yield batch
+                        batch = []
+    if batch:
+        yield batch
+
+
+def verify_files(paths, results_path, processes=None, limits=HUMAN_LIMITS):
+    """Verifies every replay of the .jsonl files and writes the results as JSON lines; returns the counts."""
+    counts = collections.Counter()
+    reasons = collections.Counter()
+    with open(results_path, 'w') as out, multiprocessing.Pool(processes, _init_worker, (limits,)) as pool:
+        for results in pool.imap(verify_lines, batches(paths)):  # In input order, one line per replay
+            for result in results:
+                out.write(json.dumps(result, separators=(',', ':')) + "\n")
+                if "error" in result:
+                    counts["rejected"] += 1
+                    reasons[summarize(result["error"])] += 1
+                else:
+                    counts["accepted"] += 1
+            out.flush()
+    return counts, reasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays submitted replays again and rejects impossible ones.")
+    parser.add_argument('replays', nargs='+', help=".jsonl files, one replay per line")
+    parser.add_argument('--results', default='verified.jsonl')
+    parser.add_argument('--processes', type=int, help="default: one per CPU")
+    parser.add_argument('--no-input-limits', action='store_true', help="accept inputs faster than a person's")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts, reasons = verify_files(args.replays, args.results, args.processes,
+                                   None if args.no_input_limits else HUMAN_LIMITS)
+    elapsed = time.perf_counter() - start
+    total = counts["accepted"] + counts["rejected"]
+    print(f"{total} replays in {elapsed:.1f}s ({total / elapsed * 60:.0f} per minute): "
+          f"{counts['accepted']} accepted, {counts['rejected']} rejected; results in {args.results}")
+    for reason, count in reasons.most_common(10):
+        print(f"{count:8d}  {reason}")
+
+
+if __name__ == '__main__':
+    main()
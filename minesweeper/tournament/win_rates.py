@@ -0,0 +1,140 @@
+"""Tables of the exact win rate of optimal play by first click, from the `minesweeper` directory:
+
+    python -m tournament.win_rates 4x4x1-4 5x5x3 --checkpoint win-rates.jsonl
+
+Every mine layout of each board is enumerated by `game.optimal`, once per
+first click up to the symmetries of the board, in a pool of worker
+processes. Each finished first click is appended to the checkpoint file,
+and a run given the same file skips what it already holds, so a long run
+can be stopped and resumed. Before the search, `--check` plays random
+layouts with `MinesweeperGame` to confirm the enumeration follows its rules.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import time
+from pathlib import Path
+from game.minesweeper_game import MinesweeperGame
+from game.optimal import HIDDEN, MAX_LAYOUTS, OptimalPlayer, first_clicks, layout_count
+from tournament.common import parse_seeds
+
+_players = {}  # Optimal players, and their memos, kept by each worker process across first clicks
+
+
+def parse_boards(text):
+    """Parses "5x5x3" or "5x5x1-4" into [(rows, cols, mines), ...]."""
+    rows, cols, mines = text.split('x')
+    return [(int(rows), int(cols), count) for count in parse_seeds(mines)]
+
+
+def solve_first_click(task):
+    """Counts the layouts won with one first click in a worker process; returns the checkpoint record."""
+    rows, cols, mines, cell = task
+    player = _players.get((rows, cols, mines))
+    if player is None:
+        player = _players[(rows, cols, mines)] = OptimalPlayer(rows, cols, mines)
+    start = time.perf_counter()
+    wins = player.first_click_wins(cell)
+    return {"rows": rows, "cols": cols, "mines": mines, "cell": cell, "wins": wins,
+            "layouts": layout_count(rows, cols, mines), "seconds": round(time.perf_counter() - start, 3)}
+
+
+def load_checkpoint(path):
+    """{(rows, cols, mines, cell): record} of a checkpoint file; a line cut off by a crash is ignored."""
+    done = {}
+    if Path(path).exists():
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                done[(record["rows"], record["cols"], record["mines"], record["cell"])] = record
+    return done
+
+
+def check_rules(rows, cols, mines, samples, rng):
+    """Plays random layouts with MinesweeperGame and the enumeration side by side; raises AssertionError on a mismatch."""
+    player = OptimalPlayer(rows, cols, mines)
+    for _ in range(samples):
+        start = rng.randrange(rows * cols)
+        indices = rng.sample([i for i in range(rows * cols) if i != start], mines)
+        layout = sum(1 << i for i in indices)
+        game = MinesweeperGame(rows, cols, mines)
+        game.set_mines(indices)
+        board = bytearray([HIDDEN]) * (rows * cols)
+        cell = start
+        while True:
+            game.reveal_cell(*divmod(cell, cols))
+            for i, number in player.open(layout, (cell,), board):
+                board[i] = number
+            visible = bytes(square['neighbor'] if square['revealed'] else HIDDEN for square in game.cells)
+            assert visible == bytes(board), f"{rows}x{cols} layout {indices}: opening {cell} differs from the game"
+            safe = [i for i, value in enumerate(board) if value == HIDDEN and not layout >> i & 1]
+            if not safe:
+                break
+            cell = rng.choice(safe)
+        assert not game.game_over and game.hidden_safe == 0  # Won once the mines are flagged
+
+
+def run(boards, checkpoint_path, processes=None):
+    """Solves every first click of every board not yet in the checkpoint; returns all records."""
+    done = load_checkpoint(checkpoint_path)
+    tasks = [(rows, cols, mines, cell) for rows, cols, mines in boards for cell in first_clicks(rows, cols)
+             if (rows, cols, mines, cell) not in done]
+    if tasks:
+        print(f"{len(tasks)} first clicks to solve, {len(done)} from the checkpoint")
+        with open(checkpoint_path, 'a') as checkpoint, multiprocessing.Pool(processes) as pool:
+            if checkpoint.tell() and not Path(checkpoint_path).read_bytes().endswith(b"\n"):
+                checkpoint.write("\n")  # Keep new records off the line a crash cut short
+            for record in pool.imap_unordered(solve_first_click, tasks):
+                checkpoint.write(json.dumps(record) + "\n")
+                checkpoint.flush()
+                done[(record["rows"], record["cols"], record["mines"], record["cell"])] = record
+                print(f"  {record['rows']}x{record['cols']}x{record['mines']} cell {record['cell']}: "
+                      f"{record['wins'] / record['layouts']:.4f} in {record['seconds']:.1f}s", flush=True)
+    return done
+
+
+def print_table(rows, cols, mines, done):
+    """Prints the win rate of each first click, laid out like the board."""
+    rates = [None] * (rows * cols)
+    for cell, orbit in first_clicks(rows, cols).items():
+        for i in orbit:
+            rates[i] = done[(rows, cols, mines, cell)]["wins"] / layout_count(rows, cols, mines)
+    best = max(range(rows * cols), key=lambda i: rates[i])
+    print(f"{rows}x{cols} with {mines} mines ({layout_count(rows, cols, mines)} layouts per first click); "
+          f"best first click {divmod(best, cols)} wins {rates[best]:.2%}")
+    for r in range(rows):
+        print("  " + " ".join(f"{rates[r * cols + c]:6.2%}" for c in range(cols)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact win rates of optimal play for each first click on small boards.")
+    parser.add_argument('boards', nargs='+', type=parse_boards, help="RxCxM, e.g. 5x5x3 or 6x6x1-4")
+    parser.add_argument('--checkpoint', default='win-rates.jsonl', help="results so far; resumed if it exists")
+    parser.add_argument('--processes', type=int, help="default: one per CPU")
+    parser.add_argument('--check', type=int, default=0, metavar='N',
+                        help="first compare N random games per board with MinesweeperGame")
+    args = parser.parse_args()
+
+    boards = [board for group in args.boards for board in group]
+    for rows, cols, mines in boards:
+        if not 0 < mines < rows * cols or layout_count(rows, cols, mines) > MAX_LAYOUTS:
+            parser.error(f"{rows}x{cols} with {mines} mines is not a board that can be enumerated")
+    if args.check:
+        rng = random.Random(1)
+        for rows, cols, mines in boards:
+            check_rules(rows, cols, mines, args.check, rng)
+        print(f"{args.check} random games per board agree with MinesweeperGame")
+
+    start = time.perf_counter()
+    done = run(boards, args.checkpoint, args.processes)
+    print(f"done in {time.perf_counter() - start:.1f}s; results in {args.checkpoint}")
+    for board in boards:
+        print_table(*board, done)
+
+
+if __name__ == '__main__':
+    main()